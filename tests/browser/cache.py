@@ -0,0 +1,243 @@
+# Copyright(C) 2023 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from woob.browser import Browser
+from woob.browser.cache import CacheEntry, CacheMixin, SQLiteCache
+
+
+def make_response(url, status_code=200, content=b'', headers=None):
+    response = Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content
+    return response
+
+
+class FakeServerBrowser(Browser):
+    """Browser which answers requests without network access."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.server = {}
+        self.sent = []
+
+    def open(self, url, **kwargs):
+        request = self.build_request(url, **kwargs)
+        self.sent.append(request)
+        etag = self.server[request.url].headers.get('ETag')
+        if etag and request.headers.get('If-None-Match') == etag:
+            return make_response(request.url, 304)
+        return self.server[request.url]
+
+
+class CacheBrowser(CacheMixin, FakeServerBrowser):
+    pass
+
+
+def test_sqlite_cache_persistence(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    url = 'https://example.org/data.json'
+
+    browser = CacheBrowser()
+    browser.cache = SQLiteCache(path)
+    browser.server[url] = make_response(url, content=b'{"a": 1}', headers={'ETag': '"v1"'})
+    assert browser.open_with_cache(url).content == b'{"a": 1}'
+    browser.cache.close()
+
+    # New run: the entry is revalidated and reused.
+    browser = CacheBrowser()
+    browser.cache = SQLiteCache(path)
+    browser.server[url] = make_response(url, content=b'{"a": 1}', headers={'ETag': '"v1"'})
+    response = browser.open_with_cache(url)
+    assert response.content == b'{"a": 1}'
+    assert response.json() == {'a': 1}
+    assert browser.sent[-1].headers['If-None-Match'] == '"v1"'
+
+
+def test_sqlite_cache_response(tmp_path):
+    url = 'https://example.org/data.json'
+    browser = CacheBrowser()
+    browser.cache = SQLiteCache(str(tmp_path / 'cache.sqlite'))
+    response = make_response(url, content=b'{"a": 1}', headers={'ETag': '"v1"'})
+    response.request = browser.build_request(url + '?page=1', method='POST')
+    browser.cache['key'] = CacheEntry(response)
+
+    response = browser.cache['key'].response
+    assert response.request.method == 'POST'
+    assert response.request.url == url + '?page=1'
+    assert response.history == []
+    assert response.elapsed.total_seconds() == 0
+
+    # entries stored without a request
+    browser.cache['key'] = CacheEntry(make_response(url))
+    assert browser.cache['key'].response.request.url == url
+    assert browser.cache['key'].response.request.method == 'GET'
+
+
+def test_sqlite_cache_eviction(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite'), max_size=3900, policy='lfu')
+    for i in range(3):
+        cache['k%d' % i] = CacheEntry(make_response('https://example.org/%d' % i, content=os.urandom(1000)))
+    assert len(cache) == 3
+
+    for i in range(3):
+        cache['k0'], cache['k2']
+
+    cache['k3'] = CacheEntry(make_response('https://example.org/3', content=os.urandom(1000)))
+    assert 'k0' in cache
+    assert 'k3' in cache
+    assert 'k1' not in cache
+    assert cache['k0'].response.url == 'https://example.org/0'
+
+
+def test_sqlite_cache_size(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = SQLiteCache(path, max_size=3900)
+    queries = []
+    cache.db.set_trace_callback(queries.append)
+
+    for i in range(6):
+        cache['k%d' % (i % 4)] = CacheEntry(make_response('https://example.org/%d' % i, content=os.urandom(1000)))
+    del cache['k3']
+    # the total size is not computed again on every insertion
+    assert not any('SUM' in query for query in queries)
+    assert len(cache) == 2
+    assert cache.size == cache.db.execute('SELECT SUM(size) FROM entries').fetchone()[0]
+
+    cache.close()
+    cache = SQLiteCache(path)
+    assert cache.size == cache.db.execute('SELECT SUM(size) FROM entries').fetchone()[0]
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_sqlite_cache_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite'), ttl=-1)
+    cache['key'] = CacheEntry(make_response('https://example.org/'))
+    assert 'key' not in cache
+    assert len(cache) == 0
+
+
+def test_freshness():
+    url = 'https://example.org/static.json'
+    browser = CacheBrowser()
+    browser.server[url] = make_response(url, content=b'1', headers={'Cache-Control': 'max-age=3600', 'ETag': '"v1"'})
+
+    assert browser.open_with_cache(url).content == b'1'
+    assert browser.open_with_cache(url).content == b'1'
+    # Fresh response is served without any request.
+    assert len(browser.sent) == 1
+    assert (browser.cache_hits, browser.cache_misses, browser.cache_revalidations) == (1, 1, 0)
+
+    # Request asks to revalidate.
+    assert browser.open_with_cache(url, headers={'Cache-Control': 'no-cache'}).content == b'1'
+    assert len(browser.sent) == 2
+
+    # Stale response is revalidated.
+    for entry in browser.cache.values():
+        entry.stored_at -= 7200
+    assert browser.open_with_cache(url).content == b'1'
+    assert browser.sent[-1].headers['If-None-Match'] == '"v1"'
+    assert browser.cache_revalidations == 1
+    # And fresh again after the 304.
+    browser.open_with_cache(url)
+    assert len(browser.sent) == 3
+
+
+def test_not_updatable():
+    url = 'https://example.org/page'
+    browser = CacheBrowser()
+    browser.cache_is_updatable = False
+
+    # An error is not stored, as it would never be requested again.
+    browser.server[url] = make_response(url, 404, headers={'Cache-Control': 'max-age=3600', 'ETag': '"v0"'})
+    assert browser.open_with_cache(url).status_code == 404
+    browser.server[url] = make_response(url, content=b'page', headers={'Cache-Control': 'max-age=3600'})
+    assert browser.open_with_cache(url).content == b'page'
+    # Nor a response without validators.
+    browser.server[url] = make_response(url, content=b'page', headers={'ETag': '"v1"'})
+    assert browser.open_with_cache(url).content == b'page'
+    assert len(browser.sent) == 3
+
+    browser.server[url] = make_response(url, content=b'new page', headers={'ETag': '"v2"'})
+    assert browser.open_with_cache(url).content == b'page'
+    assert len(browser.sent) == 3
+
+
+def test_freshness_headers():
+    now = 'Mon, 02 Jan 2023 00:00:00 GMT'
+
+    def entry(**headers):
+        headers.setdefault('Date', now)
+        return CacheEntry(make_response('https://example.org/', headers=headers), stored_at=1672617600)
+
+    assert entry(**{'Cache-Control': 'max-age=60'}).freshness_lifetime() == 60
+    assert entry(Expires='Mon, 02 Jan 2023 01:00:00 GMT').freshness_lifetime() == 3600
+    assert entry(Expires='0').freshness_lifetime() == 0
+    assert entry(**{'Last-Modified': 'Sun, 01 Jan 2023 00:00:00 GMT'}).freshness_lifetime() == 8640
+    assert not entry(**{'Cache-Control': 'no-store', 'ETag': '"a"'}).is_storable()
+    assert not entry(Vary='*', ETag='"a"').is_storable()
+    assert not entry().is_storable()
+    assert not entry(**{'Cache-Control': 'no-cache, max-age=60'}).is_fresh(now=1672617600)
+
+
+def test_vary():
+    url = 'https://example.org/page'
+    browser = CacheBrowser()
+    browser.cache_key_headers = ()
+    browser.server[url] = make_response(
+        url, content=b'page', headers={'Cache-Control': 'max-age=3600', 'Vary': 'Accept-Language'}
+    )
+
+    browser.open_with_cache(url, headers={'Accept-Language': 'fr'})
+    browser.open_with_cache(url, headers={'Accept-Language': 'en'})
+    assert len(browser.sent) == 2
+    browser.open_with_cache(url, headers={'Accept-Language': 'fr'})
+    browser.open_with_cache(url, headers={'Accept-Language': 'en'})
+    assert len(browser.sent) == 2
+
+
+def test_cache_key():
+    url = 'https://example.org/api'
+    browser = CacheBrowser()
+    browser.server[url] = make_response(url, content=b'api', headers={'Cache-Control': 'max-age=3600'})
+    browser.server[url + '?page=2'] = make_response(url, content=b'page2', headers={'Cache-Control': 'max-age=3600'})
+
+    browser.open_with_cache(url, headers={'X-Nonce': '1'})
+    browser.open_with_cache(url, headers={'X-Nonce': '2'})
+    assert len(browser.sent) == 1
+
+    # Query parameters given apart from the URL are part of the key.
+    assert browser.open_with_cache(url + '?page=2').content == b'page2'
+    assert browser.open_with_cache(url, params={'page': 2}).content == b'page2'
+    assert len(browser.sent) == 2
+    assert all(isinstance(key, str) for key in browser.cache)
+
+    # Responses are not shared by requests with different credentials.
+    for name in ('Authorization', 'X-Auth-Token', 'X-API-Key'):
+        assert browser.open_with_cache(url, headers={name: 'alice'}).content == b'api'
+        assert browser.open_with_cache(url, headers={name: 'alice', 'X-Nonce': '3'}).content == b'api'
+        browser.server[url] = make_response(url, content=b'bob', headers={'Cache-Control': 'max-age=3600'})
+        assert browser.open_with_cache(url, headers={name: 'bob'}).content == b'bob'
+        browser.server[url] = make_response(url, content=b'api', headers={'Cache-Control': 'max-age=3600'})
+    assert len(browser.sent) == 8
@@ -15,13 +15,23 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
-from unittest import TestCase
+from copy import deepcopy
+from decimal import Decimal
+from io import BytesIO
+import pickle
+from unittest import TestCase, mock
 
-from woob.browser.elements import DictElement, ItemElement, method
+import lxml.html
+import requests
+
+from woob.browser.elements import DictElement, ElementEnv, ItemElement, ListElement, TableElement, method
 from woob.browser.filters.json import Dict
-from woob.browser.filters.standard import CleanText, Eval
-from woob.browser.pages import JsonPage
-from woob.capabilities.base import BaseObject, StringField
+from woob.browser.filters.html import TableCell
+from woob.browser.filters.standard import (
+    CleanDecimal, CleanText, Env, Eval, Format, NumberFormatError, Regexp,
+)
+from woob.browser.pages import HTMLPage, JsonPage, RecordsPage, XMLPage
+from woob.capabilities.base import BaseObject, DecimalField, StringField
 from woob.tools.json import json
 
 
@@ -153,3 +163,391 @@ class iter_other_objects(DictElement):
 
         objects = list(page.iter_other_objects())
         assert len(objects) == 0
+
+    def test_element_plan(self):
+        """Nested elements, loaders and columns are found once per class."""
+        class MyObject(BaseObject):
+            label = StringField('Label of the object')
+            kind = StringField('Kind of the object')
+
+        class MyPage:
+            logger = None
+            params = {}
+            doc = lxml.html.fromstring(
+                '<table><tr><th>Id</th><th>Label</th></tr>'
+                + '<tr><td>1</td><td>hello</td></tr><tr><td>2</td><td>world</td></tr></table>'
+            )
+
+        class MyTableElement(TableElement):
+            head_xpath = '//th'
+            item_xpath = '//tr[td]'
+
+            col_id = 'Id'
+            col_label = ['Label', 'Name']
+
+            class item(ItemElement):
+                klass = MyObject
+
+                load_kind = Env('kind')
+
+                obj_id = CleanText(TableCell('id'))
+                obj_label = CleanText(TableCell('label'))
+
+                def obj_kind(self):
+                    return self.loaders['kind']
+
+        class MyListElement(ListElement):
+            item_xpath = '//tr[td]'
+
+            @property
+            def item(self):
+                return self.env.get('item_class')
+
+        plan = MyTableElement.get_plan()
+        assert plan.elements == ['item']
+        assert plan.columns == [('id', 'col_id'), ('label', 'col_label')]
+        assert MyTableElement.item.get_plan().loaders == [('kind', 'load_kind')]
+        assert MyTableElement.get_plan() is plan
+        assert ListElement.get_plan() is not plan
+
+        objects = list(MyTableElement(MyPage)(kind='test'))
+        assert [(obj.id, obj.label, obj.kind) for obj in objects] == [
+            ('1', 'hello', 'test'), ('2', 'world', 'test'),
+        ]
+
+        assert list(MyListElement(MyPage)()) == []
+
+        class MyItemElement(ItemElement):
+            klass = MyObject
+
+            obj_id = CleanText('./td[1]')
+
+        objects = list(MyListElement(MyPage)(item_class=MyItemElement))
+        assert [obj.id for obj in objects] == ['1', '2']
+
+    def test_element_env(self):
+        params = {'account': {'id': '1'}, 'label': 'foo', 'other': 'bar'}
+        env = ElementEnv(params)
+        child = ElementEnv(env)
+
+        assert child['label'] == 'foo'
+        child['label'] = 'baz'
+        child['new'] = 1
+        del child['other']
+        child['account']['id'] = '2'
+
+        assert child['account'] == {'id': '2'}
+        assert dict(child) == {'label': 'baz', 'new': 1, 'account': {'id': '2'}}
+        assert 'other' not in child
+        assert dict(env) == {'account': {'id': '1'}, 'label': 'foo', 'other': 'bar'}
+        assert params == {'account': {'id': '1'}, 'label': 'foo', 'other': 'bar'}
+
+        snapshot = child.snapshot()
+        snapshot['account']['id'] = '3'
+        assert child['account'] == {'id': '2'}
+
+        with self.assertRaises(KeyError):
+            child['other']
+        with self.assertRaises(KeyError):
+            del child['other']
+
+    def test_element_env_parent_changes(self):
+        env = ElementEnv({'account': {'id': '1'}, 'label': 'foo', 'other': 'bar'})
+        child = ElementEnv(env)
+        grandchild = ElementEnv(child)
+
+        # changes of the parent after the children have been created are
+        # not visible by them
+        env['label'] = 'baz'
+        env['new'] = 1
+        del env['other']
+        env['account']['id'] = '2'
+
+        for e in (child, grandchild):
+            assert dict(e) == {'account': {'id': '1'}, 'label': 'foo', 'other': 'bar'}
+            assert 'new' not in e
+        assert dict(env) == {'account': {'id': '2'}, 'label': 'baz', 'new': 1}
+        assert dict(ElementEnv(env)) == dict(env)
+
+        # values sharing references keep sharing them
+        shared = {'id': '1'}
+        env = ElementEnv({'a': shared, 'b': [shared]})
+        child = ElementEnv(env)
+        assert child['a'] is child['b'][0]
+        assert env['a'] is env['b'][0]
+        env['a']['id'] = '2'
+        assert env['b'][0]['id'] == '2'
+        assert child['b'][0]['id'] == '1'
+
+        # many children of one environment, which can be pickled and copied
+        env = ElementEnv({'account': {'id': '1'}})
+        children = [ElementEnv(env) for _ in range(10000)]
+        for i, child in enumerate(children):
+            child['account']['id'] = str(i)
+            env['account']['id'] = 'parent'
+        assert [child['account']['id'] for child in children] == [str(i) for i in range(10000)]
+        for other in (pickle.loads(pickle.dumps(children[1])), deepcopy(children[1])):
+            assert dict(other) == {'account': {'id': '1'}}
+            other['account']['id'] = '3'
+            assert children[1]['account']['id'] == '1'
+
+        class MyPage:
+            logger = None
+            params = {'label': 'foo'}
+            doc = None
+
+        element = ListElement(MyPage)
+        MyPage.params['label'] = 'bar'
+        assert element.env['label'] == 'foo'
+
+    def test_stream_list_element(self):
+        class MyObject(BaseObject):
+            pass
+
+        class MyPage:
+            logger = None
+            params = {}
+            doc = lxml.html.fromstring(
+                '<ul><li>1</li><li>2</li><li>1</li><li>3</li><li>2</li></ul>'
+            )
+
+        built = []
+
+        class MyListElement(ListElement):
+            item_xpath = '//li'
+            ignore_duplicate = True
+
+            class item(ItemElement):
+                klass = MyObject
+
+                def load_id(self):
+                    built.append(self.el.text)
+
+                obj_id = CleanText('.')
+
+        objects = MyListElement(MyPage)()
+        assert next(objects).id == '1'
+        assert built == ['1', '2', '1', '3', '2']
+        assert [obj.id for obj in objects] == ['2', '3']
+
+        class MyStreamListElement(MyListElement):
+            stream = True
+            objects_history = 1
+
+        del built[:]
+        objects = MyStreamListElement(MyPage)()
+        assert next(objects).id == '1'
+        assert built == ['1']
+        # only the last object is remembered to ignore duplicates
+        assert [obj.id for obj in objects] == ['2', '1', '3', '2']
+
+    def test_compiled_filters(self):
+        class MyObject(BaseObject):
+            label = StringField('Label of the object')
+            amount = DecimalField('Amount')
+
+        class MyPage:
+            logger = None
+            params = {'currency': 'EUR'}
+            doc = lxml.html.fromstring(
+                '<table><tr><td> foo </td><td>1 234,50</td></tr>'
+                + '<tr><td>bar</td><td>12</td></tr></table>'
+            )
+
+        class MyListElement(ListElement):
+            item_xpath = '//tr'
+
+            class item(ItemElement):
+                klass = MyObject
+
+                obj_id = Regexp(CleanText('./td[2]'), r'(\d+)$')
+                obj_label = Format('%s (%s)', CleanText('./td[1]'), Env('currency'))
+                obj_amount = CleanDecimal.French('./td[2]')
+                obj_url = Regexp(CleanText('./td[1]'), r'(\d+)', default=None)
+
+        objects = [obj.to_dict() for obj in MyListElement(MyPage)()]
+        assert objects == [
+            {'id': '50', 'label': 'foo (EUR)', 'amount': Decimal('1234.50'), 'url': None},
+            {'id': '12', 'label': 'bar (EUR)', 'amount': Decimal('12'), 'url': None},
+        ]
+
+        class MyUncompiledListElement(MyListElement):
+            class item(MyListElement.item):
+                compile_filters = False
+
+        assert [obj.to_dict() for obj in MyUncompiledListElement(MyPage)()] == objects
+
+    def test_table_cells(self):
+        class MyObject(BaseObject):
+            label = StringField('Label of the object')
+            amount = StringField('Amount')
+
+        class MyPage:
+            logger = None
+            params = {}
+            doc = lxml.html.fromstring(
+                '<table><tr><th>Id</th><th colspan="2">Label</th><th>Amount</th></tr>'
+                + '<tr><th>1</th><td colspan="2">hello</td><td>10</td></tr>'
+                + '<tr><th>2</th><td>world</td><td>!</td><td>20</td></tr>'
+                + '<tr><th>3</th><td>short</td></tr></table>'
+            )
+
+        class SlowTableCell(TableCell):
+            def __init__(self, *names, **kwargs):
+                super().__init__(*names, **kwargs)
+                # not known to be the xpath of a single cell
+                self.td = self.td.replace('./', '')
+
+        def make_table(cell):
+            class MyTableElement(TableElement):
+                head_xpath = '//tr[1]/th'
+                item_xpath = '//tr[td]'
+
+                col_id = 'Id'
+                col_label = 'Label'
+                col_amount = 'Amount'
+
+                class item(ItemElement):
+                    klass = MyObject
+
+                    obj_id = CleanText(cell('id', support_th=True))
+                    obj_label = CleanText(cell('label', support_th=True))
+                    obj_amount = CleanText(cell('amount', support_th=True))
+
+            return MyTableElement
+
+        objects = [(obj.id, obj.label, obj.amount) for obj in make_table(TableCell)(MyPage)()]
+        assert objects == [('1', 'hello', '10'), ('2', 'world', '20'), ('3', 'short', '')]
+        assert [(obj.id, obj.label, obj.amount) for obj in make_table(SlowTableCell)(MyPage)()] == objects
+
+    def test_table_column_batch(self):
+        class MyObject(BaseObject):
+            label = StringField('Label of the object')
+            amount = DecimalField('Amount')
+            comment = StringField('Comment')
+
+        class MyPage:
+            logger = None
+            params = {}
+            doc = lxml.html.fromstring(
+                '<table><tr><th>Id</th><th colspan="2">Label</th><th>Amount</th></tr>'
+                + '<tr><td>1</td><td colspan="2">hello</td><td>10</td></tr>'
+                + '<tr><td>2</td><td>world</td><td>!</td><td>20,5</td></tr>'
+                + '<tr><td>3</td><td>skipped</td><td></td><td>0</td></tr>'
+                + '<tr><td>4</td><td>short</td></tr></table>'
+            )
+
+        def make_table(column_batch, amount):
+            class MyTableElement(TableElement):
+                head_xpath = '//tr[1]/th'
+                item_xpath = '//tr[td]'
+
+                col_id = 'Id'
+                col_label = 'Label'
+                col_amount = 'Amount'
+
+                class item(ItemElement):
+                    klass = MyObject
+
+                    def condition(self):
+                        return CleanText('./td[2]')(self) != 'skipped'
+
+                    obj_id = CleanText(TableCell('id'))
+                    obj_label = CleanText(TableCell('label'))
+                    obj_amount = amount
+
+                    def obj_comment(self):
+                        return '%s %s' % (self.obj.id, self.obj.label)
+
+            MyTableElement.column_batch = column_batch
+            return MyTableElement
+
+        def parse(column_batch, amount):
+            return [
+                (obj.id, obj.label, obj.amount, obj.comment)
+                for obj in make_table(column_batch, amount)(MyPage)()
+            ]
+
+        amount = CleanDecimal.French(TableCell('amount'), default=None)
+        objects = parse(False, amount)
+        assert objects == [
+            ('1', 'hello', Decimal('10'), '1 hello'),
+            ('2', 'world', Decimal('20.5'), '2 world'),
+            ('4', 'short', None, '4 short'),
+        ]
+        # cells are not looked for by TableCell, but by column
+        with mock.patch.object(TableCell, '__call__', side_effect=AssertionError):
+            assert parse(True, amount) == objects
+
+        # errors are raised when the field of their row is parsed
+        with self.assertRaises(NumberFormatError):
+            parse(True, CleanDecimal.French(TableCell('amount')))
+
+    def test_records_page(self):
+        class MyObject(BaseObject):
+            label = StringField('Label of the object')
+
+        class MyBrowser:
+            logger = None
+
+        response = requests.Response()
+        response.url = 'https://example.org/export'
+        response.headers['Content-Type'] = 'application/xml'
+        response.raw = BytesIO(
+            b'<?xml version="1.0" encoding="utf-8"?><export>'
+            + b''.join(b'<record><id>%d</id><label>r\xc3\xa9cord %d</label></record>' % (i, i) for i in range(1000))
+            + b'</export>'
+        )
+
+        class MyPage(RecordsPage, XMLPage):
+            CHUNK_SIZE = 100
+
+            @method
+            class iter_objects(ListElement):
+                record_tag = 'record'
+
+                class item(ItemElement):
+                    klass = MyObject
+
+                    obj_id = CleanText('./id')
+                    obj_label = CleanText('./label')
+
+                    def parse(self, el):
+                        # records already parsed have been cleared
+                        assert el.getprevious() is None or not len(el.getprevious())
+
+        page = MyPage(MyBrowser(), response)
+        assert page.doc is None
+
+        objects = page.iter_objects()
+        obj = next(objects)
+        assert (obj.id, obj.label) == ('0', 'récord 0')
+        assert not response.raw.closed and response.raw.tell() < 1000
+
+        objects = list(objects)
+        assert len(objects) == 999
+        assert (objects[-1].id, objects[-1].label) == ('999', 'récord 999')
+
+    def test_records_html_page(self):
+        class MyBrowser:
+            logger = None
+
+        response = requests.Response()
+        response.url = 'https://example.org/export'
+        response.headers['Content-Type'] = 'text/html; charset=latin-1'
+        response.raw = BytesIO(
+            b'<html><head><meta http-equiv="refresh" content="0; url=/other"></head><body><ul>'
+            + b''.join(b'<li><a href="/r/%d">r\xe9cord %d</a></li>' % (i, i) for i in range(100))
+            + b'</ul></body></html>'
+        )
+
+        class MyPage(RecordsPage, HTMLPage):
+            CHUNK_SIZE = 100
+            REFRESH_MAX = 1
+            ABSOLUTE_LINKS = True
+
+        page = MyPage(MyBrowser(), response)
+        page.on_load()
+        records = [(el.text, el.get('href')) for el in page.iter_records('a')]
+        assert len(records) == 100
+        assert records[-1] == ('récord 99', 'https://example.org/r/99')
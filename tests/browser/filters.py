@@ -19,6 +19,7 @@
 import datetime
 from decimal import Decimal
 
+from dateutil.parser import parse as parse_date
 from dateutil.tz import gettz
 from lxml.html import fromstring
 
@@ -29,6 +30,7 @@
     RawText, DateTime, CleanText, Currency, CleanDecimal, Date,
     NumberFormatError,
 )
+from woob.tools.date import parse_french_date
 from woob.tools.test import TestCase
 
 
@@ -145,6 +147,8 @@ def test_CleanText():
     assert CleanText(normalize='NFD').filter('\u3053\u3099') == '\u3053\u3099'
     assert CleanText(normalize='NFD').filter('\u3054') == '\u3053\u3099'
     assert CleanText(normalize=False).filter('\u3053\u3099') == '\u3053\u3099'
+    assert CleanText(newlines=False, normalize=False).filter(' \u3053\u3099 \n\t\u3054') == '\u3054\n\u3054'
+    assert CleanText(newlines=False, normalize='NFKC').filter(' a  …\n b ') == 'a ...\nb'
     # None value
     assert_raises(FilterError, CleanText().filter, None)
 
@@ -238,3 +242,30 @@ def test_DateTime():
     assert Date(yearfirst=False).filter('20-7-15') == datetime.date(2015, 7, 20)
     assert Date(yearfirst=True).filter('1789-7-15') == datetime.date(1789, 7, 15)
     assert Date(yearfirst=True, strict=False).filter('7-15') == datetime.date(today.year, 7, 15)
+
+
+def test_DateTime_strict_memo():
+    calls = []
+
+    def parse_func(txt, **kwargs):
+        calls.append(txt)
+        return parse_date(txt, **kwargs)
+
+    date = Date(strict=True, parse_func=parse_func)
+    assert date.filter('2023-03-15') == datetime.date(2023, 3, 15)
+    # a complete date is only parsed once
+    assert calls == ['2023-03-15']
+    assert date.filter('2023-03-15') == datetime.date(2023, 3, 15)
+    assert calls == ['2023-03-15']
+
+    # components equal to the default ones are checked with another default
+    assert date.filter('2100-10-10') == datetime.date(2100, 10, 10)
+    assert calls == ['2023-03-15', '2100-10-10', '2100-10-10']
+    assert_raises(FilterError, date.filter, '2100-10')
+    assert_raises(FilterError, date.filter, '2100-10')
+    assert len(calls) == 7
+
+    assert_raises(FilterError, DateTime(strict=True).filter, '2023-03-15')
+    assert DateTime(strict=True).filter('2023-03-15 01:01:01') == datetime.datetime(2023, 3, 15, 1, 1, 1)
+
+    assert parse_french_date('15 févr. 2023') == datetime.datetime(2023, 2, 15)
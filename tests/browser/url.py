@@ -18,9 +18,13 @@
 
 from unittest import TestCase
 
+from requests import Request
+
 from woob.browser import PagesBrowser, URL
 from woob.browser.pages import Page
-from woob.browser.url import BrowserParamURL, UrlNotResolvable, normalize_url
+from woob.browser.url import (
+    BrowserParamURL, UrlNotResolvable, literal_prefix, normalize_url, request_fingerprint,
+)
 
 
 class MyMockBrowserWithoutBrowser(object):
@@ -317,3 +321,90 @@ def test_normalize_url():
     ]
     for todo, expected in tests:
         assert normalize_url(todo) == expected
+
+
+def test_request_fingerprint():
+    base = request_fingerprint(Request('GET', 'https://foo/bar?a=1&b=2', headers={'Accept': 'text/html'}))
+
+    same = [
+        Request('get', 'https://FOO:443/bar?b=2&a=1#baz', headers={'accept': 'text/html'}),
+        Request('GET', 'https://foo/bar', params={'a': '1', 'b': 2}, headers={'Accept': 'text/html'}),
+        Request('GET', 'https://foo/bar?a=1&b=2', headers={'Accept': 'text/html', 'X-Nonce': '1234'}),
+        Request('GET', 'https://foo/bar?a=1&b=2', headers={'Accept': 'text/html'}).prepare(),
+    ]
+    for request in same:
+        assert request_fingerprint(request) == base
+
+    different = [
+        Request('POST', 'https://foo/bar?a=1&b=2', headers={'Accept': 'text/html'}),
+        Request('GET', 'https://foo/bar?a=1&b=3', headers={'Accept': 'text/html'}),
+        Request('GET', 'https://foo/bar?a=1&b=2', headers={'Accept': 'application/json'}),
+        Request('GET', 'https://foo/bar?a=1&b=2', headers={'Accept': 'text/html'}, data={'c': 3}),
+    ]
+    for request in different:
+        assert request_fingerprint(request) != base
+
+    # the body is hashed the same way, whether the request is prepared or not
+    request = Request('POST', 'https://foo/bar', data={'c': 3, 'd': 'é'})
+    assert request_fingerprint(request) == request_fingerprint(request.prepare())
+    request = Request('POST', 'https://foo/bar', json={'c': 3})
+    assert request_fingerprint(request) != request_fingerprint(Request('POST', 'https://foo/bar', json={'c': 4}))
+
+    # headers outside of the allowlist can be taken into account
+    assert (
+        request_fingerprint(Request('GET', 'https://foo/', headers={'X-Nonce': '1'}), headers=['X-Nonce'])
+        != request_fingerprint(Request('GET', 'https://foo/', headers={'X-Nonce': '2'}), headers=['X-Nonce'])
+    )
+
+
+def test_literal_prefix():
+    tests = [
+        (r'https://woob\.tech/news', 'https://woob.tech/news'),
+        (r'/list-(?P<id>\d+)\.html', '/list-'),
+        (r'/items?/', '/item'),
+        (r'/a{2}', '/'),
+        (r'/\d+', '/'),
+        (r'^/foo', '/foo'),
+        (r'/foo|/bar', ''),
+        (r'/(foo|bar)', '/'),
+        (r'/[|]', '/'),
+    ]
+    for regex, expected in tests:
+        assert literal_prefix(regex) == expected
+
+
+class DispatchBrowser(PagesBrowser):
+    BASEURL = 'https://woob.tech/'
+
+    news = URL(r'/news/(?P<id>\d+)', MyMockPage)
+    news_list = URL(r'/news', r'/list', MyMockPage)
+    other = URL(r'https://example\.org/', MyMockPage)
+    anything = URL(r'.*', MyMockPage)
+    no_page = URL(r'/news/1')
+
+
+def test_url_dispatcher():
+    browser = DispatchBrowser()
+    dispatcher = browser.get_url_dispatcher()
+
+    def candidates(url):
+        return list(browser.get_url_dispatcher().candidates(url))
+
+    assert candidates('https://woob.tech/news/1') == [browser.news, browser.news_list, browser.anything]
+    assert candidates('https://woob.tech/list') == [browser.news_list, browser.anything]
+    assert candidates('https://example.org/') == [browser.other]
+    assert browser.get_url_dispatcher() is dispatcher
+
+    browser.BASEURL = 'https://example.org/'
+    assert browser.get_url_dispatcher() is not dispatcher
+    assert candidates('https://woob.tech/news/1') == []
+    assert candidates('https://example.org/news/1') == [
+        browser.news, browser.news_list, browser.other, browser.anything,
+    ]
+
+    browser.more = URL(r'/news/more', MyMockPage)
+    assert candidates('https://example.org/news/more') == [
+        browser.news, browser.news_list, browser.other, browser.anything, browser.more,
+    ]
+    del browser.more
+    assert candidates('https://example.org/news/more')[-1] is browser.anything
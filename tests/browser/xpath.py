@@ -0,0 +1,99 @@
+# Copyright(C) 2023 woob project
+# Copyright(C) 2021 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+
+from threading import Thread, local
+
+from lxml.etree import FunctionNamespace, XPathEvalError, fromstring as xml_fromstring
+from lxml.html import fromstring
+import pytest
+
+from woob.browser.pages import HTMLPage
+from woob.browser.xpath import compile_xpath, get_xpath_cache, xpath
+
+
+def test_xpath_cache():
+    HTMLPage.setup_xpath_functions()
+    root = fromstring('<a><b class="one text">I</b><b class="two text">LOVE</b></a>')
+
+    hits = get_xpath_cache().info().hits
+    assert xpath(root, '//b[has-class("text")]/text()') == ['I', 'LOVE']
+    assert xpath(root, '//b[has-class("text")]/text()') == ['I', 'LOVE']
+    assert get_xpath_cache().info().hits == hits + 1
+    assert compile_xpath('//b[has-class("text")]/text()') is compile_xpath('//b[has-class("text")]/text()')
+
+    assert xpath(root, '//b[text()=$value]/@class', value='LOVE') == ['two text']
+    assert xpath(xml_fromstring('<a><c xmlns="urn:x">CSS</c></a>'), '//x:c/text()', namespaces={'x': 'urn:x'}) == ['CSS']
+    assert xpath(root.getroottree(), 'count(//b)') == 2.
+
+    with pytest.raises(XPathEvalError):
+        xpath(root, '//b[')
+
+
+def test_xpath_fallback():
+    root = fromstring('<a><b>I</b></a>')
+
+    # invalid expressions are not compiled nor cached, lxml raises its
+    # usual error when evaluating them
+    size = len(get_xpath_cache())
+    with pytest.raises(XPathEvalError):
+        xpath(root, '//b[')
+    assert len(get_xpath_cache()) == size
+
+    class Node:
+        def xpath(self, expression, **kwargs):
+            return expression, kwargs
+
+    # other objects evaluate the expression themselves
+    assert xpath(Node(), '//b', namespaces={'x': 'urn:x'}, smart_strings=False, value=1) == (
+        '//b', {'namespaces': {'x': 'urn:x'}, 'smart_strings': False, 'value': 1}
+    )
+
+
+def test_xpath_reentrant():
+    expression = 'count(//b[t:nested()])'
+
+    state = local()
+
+    def nested(context):
+        # evaluate the same expression from an extension function, once
+        if getattr(state, 'nested', False):
+            return True
+        state.nested = True
+        try:
+            return xpath(context.context_node, expression, namespaces={'t': 'urn:woob-test'}) == 2
+        finally:
+            state.nested = False
+
+    FunctionNamespace('urn:woob-test')['nested'] = nested
+
+    results = []
+
+    def run():
+        root = fromstring('<a><b>I</b><b>LOVE</b></a>')
+        for _ in range(50):
+            results.append(xpath(root, expression, namespaces={'t': 'urn:woob-test'}))
+
+    threads = [Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+        assert not thread.is_alive()
+
+    assert results == [2.] * 100
+    # each thread has its own cache
+    assert compile_xpath(expression, {'t': 'urn:woob-test'}) is compile_xpath(expression, {'t': 'urn:woob-test'})
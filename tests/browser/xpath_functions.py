@@ -41,6 +41,19 @@ def test_that_has_class_return_expected_result(self):
         assert len(self.root.xpath('//b[not(has-class("first"))]')) == 2
         assert len(self.root.xpath('//b[has-class("not-exists")]')) == 0
 
+    def test_has_class_whitespaces(self):
+        root = fromstring('<a><b class=" one\tfirst\n text ">I</b><b>LOVE</b><b class="">CSS</b></a>')
+        assert len(root.xpath('//b[has-class("first")]')) == 1
+        # consecutive classes can be matched together, as with contains()
+        assert len(root.xpath('//b[has-class("one first")]')) == 1
+        assert len(root.xpath('//b[has-class("first one")]')) == 0
+        assert len(root.xpath('//b[has-class("fir")]')) == 0
+        assert len(root.xpath('//b[not(has-class("first"))]')) == 2
+
+    def test_matches(self):
+        assert self.root.xpath('//b[matches(text(), "^L.V")]/text()') == ['LOVE']
+        assert self.root.xpath('//b[matches(@class, "t{2}")]/text()') == []
+
 
 class TestDistinctValues(TestCase):
     def setUp(self):
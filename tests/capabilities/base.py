@@ -0,0 +1,209 @@
+# Copyright(C) 2023 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+import warnings
+from copy import deepcopy
+from decimal import Decimal
+
+import pytest
+
+from woob.capabilities.base import (
+    AttributeCreationWarning, BaseObject, ConversionWarning, DecimalField, Field,
+    IntField, NotAvailable, NotLoaded, ObjectBatch, StringField, iter_batches,
+)
+
+
+class MyObject(BaseObject):
+    label = StringField('Label')
+    amount = DecimalField('Amount', default=Decimal('0'))
+    tags = Field('Tags', list, default=[])
+
+
+class MyChildObject(MyObject):
+    count = IntField('Count')
+    label = StringField('Label, again')
+
+
+class UninitializedObject(MyObject):
+    def __init__(self, label=None):
+        # BaseObject.__init__ is not called
+        self._label = label
+
+
+def test_field_values():
+    obj = MyObject('1')
+    assert obj.to_dict() == {
+        'id': '1', 'url': NotLoaded, 'label': NotLoaded, 'amount': Decimal('0'), 'tags': [],
+    }
+    assert '_fields' not in obj.__dict__
+
+    obj.label = 'foo'
+    obj.tags.append('bar')
+    assert obj.label == 'foo'
+    # mutable default values are not shared
+    assert MyObject().tags == []
+
+    with pytest.warns(UserWarning):
+        obj.amount = '12.5'
+    assert obj.amount == Decimal('12.5')
+    with pytest.raises(ValueError):
+        obj.tags = 'baz'
+
+    child = MyChildObject()
+    child.count = 2
+    assert [name for name, value in child.iter_fields()] == ['id', 'url', 'label', 'amount', 'tags', 'count']
+    assert MyChildObject._fields['label'].doc == 'Label, again'
+    assert MyObject._fields['label'].doc == 'Label'
+    assert not hasattr(obj, 'count')
+
+
+def test_delete_field():
+    obj = MyObject()
+    del obj.label
+    assert not hasattr(obj, 'label')
+    assert 'label' not in obj.to_dict()
+    assert MyObject().label is NotLoaded
+
+    obj._other = 1
+    del obj._other
+    with pytest.raises(AttributeError):
+        del obj._other
+
+
+def test_copy_and_pickle():
+    obj = MyObject('1', backend='test')
+    obj.label = 'foo'
+    obj.amount = NotAvailable
+    obj._extra = 'bar'
+
+    for other in (obj.copy(), deepcopy(obj), pickle.loads(pickle.dumps(obj))):
+        assert other.id == '1'
+        assert other.backend == 'test'
+        assert other.label == 'foo'
+        # empty values are not kept as singletons by pickle
+        assert repr(other.to_dict()) == repr(obj.to_dict())
+        assert other._extra == 'bar'
+
+        other.label = 'baz'
+        assert obj.label == 'foo'
+
+
+def test_uninitialized_object():
+    expected = {'url': NotLoaded, 'label': NotLoaded, 'amount': Decimal('0'), 'tags': []}
+    assert UninitializedObject().to_dict() == expected
+    assert dict(UninitializedObject().iter_fields()) == expected
+    assert UninitializedObject().copy().to_dict() == expected
+    other = pickle.loads(pickle.dumps(UninitializedObject('foo')))
+    # empty values are not kept as singletons by pickle
+    assert repr(dict(other.to_dict())) == repr(expected)
+    assert other._label == 'foo'
+
+    obj = UninitializedObject()
+    del obj.label
+    assert 'label' not in obj.to_dict()
+
+
+def test_set_attributes():
+    obj = MyObject()
+    with pytest.warns(AttributeCreationWarning) as records:
+        obj.other = 1
+    assert records[0].filename == __file__
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        obj.other = 2
+        obj.backend = 'test'
+        obj._private = 3
+
+        # attributes added to classes after objects have been created
+        MyObject.added = None
+        BaseObject.added_to_base = None
+        try:
+            obj.added = 4
+            obj.added_to_base = 5
+        finally:
+            del MyObject.added
+            del BaseObject.added_to_base
+
+    with pytest.warns(ConversionWarning) as records:
+        obj.amount = 1
+    assert records[0].filename == __file__
+    assert obj.amount == Decimal('1')
+
+
+def test_from_values():
+    values = {'id': '1', 'label': 'foo', 'amount': Decimal('12.5'), '_extra': 'bar'}
+    obj = MyObject.from_values(values)
+    assert obj.to_dict() == {
+        'id': '1', 'url': NotLoaded, 'label': 'foo', 'amount': Decimal('12.5'), 'tags': [],
+    }
+    assert obj._extra == 'bar'
+
+    with pytest.warns(ConversionWarning) as records:
+        obj = MyObject.from_values({'amount': '1'})
+    assert records[0].filename == __file__
+    assert obj.amount == Decimal('1')
+
+    with pytest.raises(ValueError):
+        MyObject.from_values({'tags': 'foo'})
+
+    other = MyChildObject.from_values(dict(obj.iter_fields()), validate=False)
+    assert other.amount == Decimal('1')
+    assert other.count is NotLoaded
+
+
+def test_object_batch():
+    objects = []
+    for i in range(6):
+        obj = MyObject(str(i), backend='test' if i % 2 else None)
+        obj.label = 'label %d' % (i % 3)
+        obj.amount = Decimal(i % 4)
+        objects.append(obj)
+    objects[1]._extra = 'bar'
+    del objects[2].label
+
+    batch = ObjectBatch(MyObject, objects)
+    assert len(batch) == 6
+    assert batch.column('amount') == [obj.amount for obj in objects]
+    assert list(batch.to_dicts()) == [obj.to_dict() for obj in objects]
+    assert [obj.to_dict() for obj in batch] == [obj.to_dict() for obj in objects]
+    assert batch[1]._extra == 'bar'
+    assert not hasattr(batch[2], 'label')
+    assert batch[-1].id == '5'
+    assert [obj.id for obj in batch[1:3]] == ['1', '2']
+
+    assert batch.filter('amount', lambda amount: amount > 1).ids == ['2', '3']
+    assert batch.sorted('amount', 'id', reverse=True).ids == ['3', '2', '5', '1', '4', '0']
+    assert batch.sorted('amount', key=lambda amount: -amount).ids == ['3', '2', '1', '5', '0', '4']
+    groups = batch.group_by('amount')
+    assert list(groups) == [0, 1, 2, 3]
+    assert groups[Decimal(1)].ids == ['1', '5']
+
+    batch.extend(batch[:2])
+    assert len(batch) == 8
+    with pytest.raises(TypeError):
+        batch.append(MyChildObject())
+
+    with pytest.warns(ConversionWarning):
+        other = ObjectBatch.from_dicts(MyObject, [{'id': '1', 'amount': 2}])
+    assert other[0].amount == Decimal(2)
+
+    batches = list(iter_batches(objects + [MyChildObject()] + objects, size=4))
+    assert [(len(batch), batch.klass) for batch in batches] == [
+        (4, MyObject), (2, MyObject), (1, MyChildObject), (4, MyObject), (2, MyObject),
+    ]
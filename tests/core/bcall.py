@@ -0,0 +1,243 @@
+# Copyright(C) 2023 Romain Bignon
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+import queue
+from threading import Lock, RLock
+import time
+
+import pytest
+
+from woob.core.bcall import AsyncBackendsCall, BackendsCall, CallErrors
+from woob.core.metrics import IMetricsSink, JsonLinesMetricsSink, PrometheusMetricsSink
+from woob.core.pool import WorkerPool
+from woob.core.woob import WoobBase
+
+
+class FakeBackend:
+    def __init__(self, name, module='fake'):
+        self.name = name
+        self.NAME = module
+        self.lock = RLock()
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, t, v, tb):
+        self.lock.release()
+
+    def __repr__(self):
+        return '<FakeBackend %r>' % self.name
+
+    def iter_values(self, count):
+        for i in range(count):
+            yield '%s-%d' % (self.name, i)
+
+    def fail(self):
+        raise ValueError(self.name)
+
+
+def test_results_without_pool():
+    backends = [FakeBackend('b%d' % i) for i in range(5)]
+    results = sorted(BackendsCall(backends, 'iter_values', 2))
+    assert results == sorted('b%d-%d' % (i, j) for i in range(5) for j in range(2))
+
+
+def test_results_with_pool():
+    pool = WorkerPool(max_workers=2)
+    backends = [FakeBackend('b%d' % i) for i in range(10)]
+    results = sorted(BackendsCall(backends, 'iter_values', 3, pool=pool))
+    assert results == sorted('b%d-%d' % (i, j) for i in range(10) for j in range(3))
+    assert len(pool.workers) <= 2
+    pool.shutdown()
+
+
+def test_woob_pool_after_deinit():
+    woob = WoobBase()
+    backends = [FakeBackend('b%d' % i) for i in range(3)]
+    assert sorted(woob.do('iter_values', 1, backends=backends)) == ['b0-0', 'b1-0', 'b2-0']
+    pool = woob.pool
+    woob.deinit()
+    assert pool.shutdown_requested
+
+    # the owned pool is created again
+    assert sorted(woob.do('iter_values', 1, backends=backends)) == ['b0-0', 'b1-0', 'b2-0']
+    assert woob.pool is not pool
+    woob.deinit()
+
+    # a given pool is not shut down
+    pool = WorkerPool()
+    woob = WoobBase(pool=pool)
+    woob.deinit()
+    assert woob.pool is pool and not pool.shutdown_requested
+    pool.shutdown()
+
+
+def test_errors_with_pool():
+    pool = WorkerPool(max_workers=3)
+    backends = [FakeBackend('b%d' % i) for i in range(4)]
+    with pytest.raises(CallErrors) as excinfo:
+        list(BackendsCall(backends, 'fail', pool=pool))
+    assert sorted(backend.name for backend, error, backtrace in excinfo.value) == ['b0', 'b1', 'b2', 'b3']
+    pool.shutdown()
+
+
+def test_module_limit():
+    pool = WorkerPool(max_workers=8, module_limits={'slow': 1})
+    lock = Lock()
+    running = []
+    maximum = []
+
+    def call(backend):
+        with lock:
+            running.append(backend)
+            maximum.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(backend)
+        return backend.name
+
+    backends = [FakeBackend('b%d' % i, 'slow') for i in range(4)]
+    bcall = BackendsCall(backends, call, pool=pool)
+    bcall.wait()
+    assert max(maximum) == 1
+    pool.shutdown()
+
+
+def test_no_polling_delay(monkeypatch):
+    get = queue.Queue.get
+
+    def blocking_get(self, block=True, timeout=None):
+        # Results are read as soon as they are put, not polled.
+        assert block and timeout is None
+        return get(self, block, timeout)
+
+    monkeypatch.setattr(queue.Queue, 'get', blocking_get)
+
+    backends = [FakeBackend('b%d' % i) for i in range(20)]
+    bcall = BackendsCall(backends, 'iter_values', 1)
+    assert len(list(bcall)) == 20
+    # Every backend is over, so iterating again ends immediately.
+    assert list(bcall) == []
+
+
+def test_stop_wakes_reader():
+    def call(backend):
+        time.sleep(0.5)
+        return backend.name
+
+    bcall = BackendsCall([FakeBackend('b0')], call)
+    thread = bcall.callback_thread(None)
+    bcall.stop()
+    thread.join(0.2)
+    assert not thread.is_alive()
+    bcall.wait()
+
+
+def test_async_results():
+    pool = WorkerPool(max_workers=3)
+    backends = [FakeBackend('b%d' % i) for i in range(5)]
+
+    async def read():
+        return [value async for value in AsyncBackendsCall(backends, 'iter_values', 4, pool=pool, maxsize=2)]
+
+    results = asyncio.run(read())
+    assert sorted(results) == sorted('b%d-%d' % (i, j) for i in range(5) for j in range(4))
+    pool.shutdown()
+
+
+def test_async_timeout():
+    def call(backend):
+        yield 'first'
+        if backend.name == 'slow':
+            time.sleep(0.3)
+        yield backend.name
+
+    backends = [FakeBackend('fast'), FakeBackend('slow')]
+    results = []
+
+    async def read():
+        async for value in AsyncBackendsCall(backends, call, timeout=0.1):
+            results.append(value)
+
+    with pytest.raises(CallErrors) as excinfo:
+        asyncio.run(read())
+
+    errors = list(excinfo.value)
+    assert len(errors) == 1
+    assert errors[0][0].name == 'slow'
+    assert isinstance(errors[0][1], asyncio.TimeoutError)
+    assert sorted(results) == ['fast', 'first', 'first']
+
+
+def test_async_cancel():
+    def call(backend):
+        for i in range(1000):
+            yield i
+
+    bcall = AsyncBackendsCall([FakeBackend('b0')], call, maxsize=1)
+
+    async def read():
+        async for value in bcall:
+            if value == 2:
+                raise KeyError(value)
+
+    with pytest.raises(KeyError):
+        asyncio.run(read())
+
+    # The backend thread is released and stops.
+    bcall.wait()
+
+
+def test_stats(tmp_path):
+    sinks = [
+        JsonLinesMetricsSink(str(tmp_path / 'stats.jsonl')),
+        PrometheusMetricsSink(str(tmp_path / 'stats.prom')),
+    ]
+
+    class Sinks(IMetricsSink):
+        def emit(self, stats):
+            for sink in sinks:
+                sink.emit(stats)
+
+    backends = [FakeBackend('b0'), FakeBackend('b1')]
+    bcall = BackendsCall(backends, 'iter_values', 3, metrics=Sinks())
+    assert len(list(bcall)) == 6
+
+    stats = bcall.stats()
+    assert sorted(stats) == ['b0', 'b1']
+    assert stats['b0'].items == 3
+    assert stats['b0'].errors == 0
+    assert stats['b0'].function == 'iter_values'
+    assert 0 <= stats['b0'].time_to_first_result <= stats['b0'].wall_time
+
+    bcall = BackendsCall(backends[:1], 'fail', metrics=Sinks())
+    with pytest.raises(CallErrors):
+        bcall.wait()
+    assert bcall.stats()['b0'].errors == 1
+    assert bcall.stats()['b0'].time_to_first_result is None
+
+    lines = [json.loads(line) for line in (tmp_path / 'stats.jsonl').read_text().splitlines()]
+    assert sorted((line['backend'], line['function'], line['items']) for line in lines) == [
+        ('b0', 'fail', 0), ('b0', 'iter_values', 3), ('b1', 'iter_values', 3),
+    ]
+
+    prom = (tmp_path / 'stats.prom').read_text()
+    assert 'woob_backend_calls_total{backend="b0",module="fake"} 2' in prom
+    assert 'woob_backend_items_total{backend="b1",module="fake"} 3' in prom
+    assert 'woob_backend_errors_total{backend="b0",module="fake"} 1' in prom
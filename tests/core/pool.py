@@ -0,0 +1,125 @@
+# Copyright(C) 2023 Romain Bignon
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from woob.core import WoobBase
+from woob.core.bcall import CallErrors
+from woob.core.pool import ProcessPool, RemoteTraceback
+from woob.tools.storage import StandardStorage
+
+
+MODULE = '''
+import os
+
+from woob.tools.backend import Module, BackendConfig
+from woob.tools.value import Value
+
+
+class PoolTestModule(Module):
+    NAME = 'pooltest'
+    CONFIG = BackendConfig(Value('prefix', default='v'))
+    STORAGE = {'calls': 0}
+
+    def iter_values(self, count):
+        self.storage.set('calls', self.storage.get('calls') + 1)
+        for i in range(count):
+            yield '%s%d' % (self.config['prefix'].get(), i)
+
+    def get_pid(self):
+        return os.getpid()
+
+    def get_calls(self):
+        return self.storage.get('calls')
+
+    def fail(self):
+        raise ValueError('failed in worker')
+
+    def iter_fail(self):
+        yield 'first'
+        raise ValueError('failed in worker iterator')
+'''
+
+
+@pytest.fixture
+def woob(tmp_path):
+    modpath = tmp_path / 'modules' / 'pooltest'
+    modpath.mkdir(parents=True)
+    (modpath / '__init__.py').write_text('from .module import PoolTestModule\n')
+    (modpath / 'module.py').write_text(MODULE)
+
+    woob = WoobBase(str(tmp_path / 'modules'), pool=ProcessPool(processes=2))
+    storage = StandardStorage(str(tmp_path / 'storage'))
+    woob.load_backend('pooltest', 'a', {'prefix': 'a'}, storage)
+    woob.load_backend('pooltest', 'b', {'prefix': 'b'}, storage)
+    yield woob
+    woob.deinit()
+    woob.pool.shutdown()
+
+
+def test_process_pool(woob):
+    assert sorted(woob.do('iter_values', 3)) == ['a0', 'a1', 'a2', 'b0', 'b1', 'b2']
+
+    # Backends are pinned to their own worker process.
+    pids = {pid: backend for backend in ('a', 'b') for pid in woob.do('get_pid', backends=backend)}
+    assert len(pids) == 2
+    for pid, backend in pids.items():
+        assert list(woob.do('get_pid', backends=backend)) == [pid]
+
+    # Storage is kept in worker, and synchronized back to the parent.
+    assert list(woob.do('get_calls', backends='a')) == [1]
+    assert woob['a'].storage.get('calls') == 1
+
+    with pytest.raises(CallErrors) as excinfo:
+        woob.do('fail', backends='a').wait()
+    (backend, error, backtrace), = excinfo.value
+    assert isinstance(error, ValueError)
+    assert isinstance(error.__cause__, RemoteTraceback)
+    assert 'failed in worker' in backtrace
+
+
+def assert_released(woob, name):
+    # The worker process of the backend is not locked by a call.
+    lock = woob.pool.get_process_worker(woob[name]).lock
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_process_pool_stop(woob):
+    call = woob.do('iter_values', 100000, backends='a')
+    results = iter(call)
+    assert next(results) == 'a0'
+    call.stop(wait=True)
+
+    assert_released(woob, 'a')
+    assert list(woob.do('iter_values', 2, backends='a')) == ['a0', 'a1']
+    assert woob['a'].storage.get('calls') == 2
+
+
+def test_process_pool_iterator_error(woob):
+    results = []
+    with pytest.raises(CallErrors) as excinfo:
+        for result in woob.do('iter_fail', backends='a'):
+            results.append(result)
+    assert results == ['first']
+    (backend, error, backtrace), = excinfo.value
+    assert isinstance(error, ValueError)
+    assert isinstance(error.__cause__, RemoteTraceback)
+    assert 'failed in worker iterator' in backtrace
+
+    assert_released(woob, 'a')
+    assert list(woob.do('get_calls', backends='a')) == [0]
@@ -17,13 +17,18 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
+import json
 from tempfile import mkstemp
 from os import remove
 
+from woob.capabilities.base import BaseObject, StringField
+from woob.tools.application.formatters.csv import CSVFormatter
 from woob.tools.application.formatters.json import (
     JsonFormatter, JsonLineFormatter,
 )
-from woob.tools.application.formatters.table import TableFormatter
+from woob.tools.application.formatters.load import FormattersLoader
+from woob.tools.application.formatters.table import StreamTableFormatter, TableFormatter
+from woob.tools.application.repl import ReplApplication
 
 
 def formatter_test_output(Formatter, obj):
@@ -48,6 +53,45 @@ def test_json():
     assert formatter_test_output(JsonLineFormatter, {'foo': 'bar'}) == '{"foo": "bar"}\n'
 
 
+class Thing(BaseObject):
+    label = StringField('Label')
+    comment = StringField('Comment')
+
+    def __init__(self, id, label, comment):
+        super().__init__(id)
+        self.label = label
+        self.comment = comment
+
+
+def test_json_stream():
+    _, name = mkstemp()
+    fmt = JsonFormatter()
+    fmt.outfile = name
+    for i in range(3):
+        fmt.format(Thing(str(i), label='thing %s' % i, comment='x'), selected_fields=('id', 'label'))
+    with open(name) as f:
+        # items are written before the list is flushed
+        assert f.read() == '[{"id": "0", "label": "thing 0"}, {"id": "1", "label": "thing 1"}, {"id": "2", "label": "thing 2"}'
+    fmt.flush()
+    with open(name) as f:
+        assert f.read().endswith('"thing 2"}]\n')
+    remove(name)
+
+
+def test_selected_fields():
+    obj = Thing('1', label='foo', comment='bar')
+    _, name = mkstemp()
+    fmt = CSVFormatter()
+    fmt.outfile = name
+    fmt.format(obj, selected_fields=('label',))
+    fmt.format({'label': 'baz', 'comment': 'qux'}, selected_fields=('label',))
+    with open(name) as f:
+        assert f.read().splitlines() == ['label', 'foo', 'baz']
+    remove(name)
+    # the object is left untouched
+    assert obj.comment == 'bar'
+
+
 def test_table():
     assert formatter_test_output(TableFormatter, {'foo': 'bar'}) == (
         '┌─────┐\n'
@@ -56,3 +100,85 @@ def test_table():
         '│ bar │\n'
         '└─────┘\n'
     )
+
+
+def test_stream_table():
+    _, name = mkstemp()
+    fmt = StreamTableFormatter()
+    fmt.STREAM_WINDOW = 2
+    fmt.interactive = True
+    fmt.outfile = name
+    for i in range(4):
+        fmt.format({'id': str(i), 'label': 'x' * (i + 3), 'empty': None})
+    assert fmt.queue == []
+    fmt.flush()
+    with open(name) as f:
+        assert f.read() == (
+            '┌───┬────┬───────┐\n'
+            '│ # │ Id │ Label │\n'
+            '├───┼────┼───────┤\n'
+            '│ 1 │ 0  │ xxx   │\n'
+            '│ 2 │ 1  │ xxxx  │\n'
+            '│ 3 │ 2  │ xxxxx │\n'
+            '│ 4 │ 3  │ xxxx… │\n'
+            '└───┴────┴───────┘\n'
+        )
+    remove(name)
+
+    # numbers longer than the column start a new table with a wider one
+    _, name = mkstemp()
+    fmt = StreamTableFormatter()
+    fmt.STREAM_WINDOW = 2
+    fmt.interactive = True
+    fmt.outfile = name
+    for i in range(1000):
+        fmt.format({'id': 'x'})
+    fmt.flush()
+    with open(name) as f:
+        lines = f.read().splitlines()
+    remove(name)
+
+    assert [line for line in lines if line.startswith('│ #')] == [
+        '│ # │ Id │', '│ #  │ Id │', '│ #   │ Id │', '│ #    │ Id │',
+    ]
+    assert lines[-3:] == ['├──────┼────┤', '│ 1000 │ x  │', '└──────┴────┘']
+    for line in lines:
+        if line.startswith('┌'):
+            width = len(line)
+        assert len(line) == width
+
+    # short listings are rendered as regular tables
+    assert formatter_test_output(StreamTableFormatter, {'foo': 'bar'}) == formatter_test_output(TableFormatter, {'foo': 'bar'})
+
+
+def test_json_interrupted(capsys):
+    class MyApplication(ReplApplication):
+        APPNAME = 'test'
+        VERSION = '1.0'
+        COPYRIGHT = 'YEAR'
+
+        def set_formatter(self, name):
+            self.formatter = self.formatters_loader.build_formatter(name)
+
+        def do_list(self, line):
+            """
+            list
+            """
+            self.format({'id': 1})
+            self.format({'id': 2})
+            raise KeyboardInterrupt()
+
+    # the application is not initialized, to not load any woob instance
+    app = MyApplication.__new__(MyApplication)
+    app.formatters_loader = FormattersLoader()
+    app.commands_formatters = {}
+    app.DEFAULT_FORMATTER = 'json'
+    app.selected_fields = ['$direct']
+    app.lastcmd = ''
+    capsys.readouterr()
+    app.onecmd('list')
+
+    # the list is closed before the command is reported as aborted
+    output = capsys.readouterr().out
+    assert output == '[{"id": 1}, {"id": 2}]\n\nAborted.\n'
+    assert json.loads(output.split('\n')[0]) == [{'id': 1}, {'id': 2}]
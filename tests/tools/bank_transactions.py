@@ -17,9 +17,14 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
+import datetime
 from decimal import Decimal
 
-from woob.tools.capabilities.bank.transactions import AmericanTransaction
+from woob.capabilities.bank import Transaction
+from woob.capabilities.base import ObjectBatch
+from woob.tools.capabilities.bank.transactions import (
+    AmericanTransaction, merge_iterators, sorted_transactions,
+)
 
 
 def test_american():
@@ -34,3 +39,26 @@ def test_american():
     decimal_amount = AmericanTransaction.decimal_amount
     assert decimal_amount('$12,442.12 USD') == Decimal('12442.12')
     assert decimal_amount('') == Decimal('0')
+
+
+def test_transactions_batch():
+    def transactions(*dates):
+        result = []
+        for n, (date, rdate) in enumerate(dates):
+            tr = Transaction()
+            tr.id = '%s-%d' % (date, n)
+            tr.date = datetime.date(2023, 1, date)
+            tr.rdate = rdate and datetime.date(2023, 1, rdate)
+            result.append(tr)
+        return result
+
+    first = transactions((1, 1), (3, None), (2, 2), (3, 1))
+    second = transactions((2, 2), (5, 5), (1, 1))
+    assert sorted_transactions(ObjectBatch(Transaction, first)).ids == [tr.id for tr in sorted_transactions(first)]
+
+    # missing dates can't be compared when sorting, but may never be when merging
+    for first in (first, first[:1] + first[2:]):
+        first = sorted_transactions(first)
+        second = sorted_transactions(second)
+        merged = merge_iterators(ObjectBatch(Transaction, first), ObjectBatch(Transaction, second))
+        assert [tr.id for tr in merged] == [tr.id for tr in merge_iterators(first, second)]
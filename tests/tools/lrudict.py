@@ -0,0 +1,148 @@
+# Copyright(C) 2023 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Thread
+import time
+
+import pytest
+
+from woob.tools.lrudict import LFUCache, LimitedLRUDict, LRUCache, LRUDict, cached
+
+
+def test_lrudict():
+    d = LRUDict()
+    d['a'] = 1
+    d['b'] = 2
+    d['c'] = 3
+    assert d['a'] == 1
+    d['b'] = 4
+    assert list(d) == ['c', 'a', 'b']
+
+    d = LimitedLRUDict()
+    d.max_entries = 2
+    d['a'] = 1
+    d['b'] = 2
+    d['a']
+    d['c'] = 3
+    assert list(d) == ['a', 'c']
+
+
+def test_lru_cache():
+    cache = LRUCache(max_entries=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache['a'] == 1
+    cache['c'] = 3
+    assert 'b' not in cache
+    assert list(cache) == ['a', 'c']
+    with pytest.raises(KeyError):
+        cache['b']
+    assert cache.get('b', 42) == 42
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.entries) == (1, 2, 1, 2)
+
+
+def test_lru_cache_size():
+    cache = LRUCache(max_size=10, sizeof=len)
+    cache['a'] = b'1234'
+    cache['b'] = b'1234'
+    assert cache.size == 8
+    cache['a'] = b'12'
+    assert cache.size == 6
+    cache['c'] = b'12345'
+    assert list(cache) == ['a', 'c']
+    assert cache.size == 7
+
+    del cache['a']
+    assert cache.size == 5
+
+    # values larger than the budget are not stored
+    cache['d'] = b'x' * 20
+    assert list(cache) == ['c']
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(ttl=0.05)
+    cache['a'] = 1
+    assert cache['a'] == 1
+    time.sleep(0.1)
+    assert 'a' not in cache
+    assert len(cache) == 0
+
+
+def test_lfu_cache():
+    cache = LFUCache(max_entries=3)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['c'] = 3
+    for _ in range(3):
+        cache['a']
+    cache['b']
+    cache['c']
+    cache['b']
+
+    cache['d'] = 4
+    assert sorted(cache) == ['a', 'b', 'd']
+    # new entries are the least frequently used ones
+    cache['e'] = 5
+    assert sorted(cache) == ['a', 'b', 'e']
+
+    del cache['a']
+    del cache['b']
+    cache['f'] = 6
+    cache['g'] = 7
+    assert sorted(cache) == ['e', 'f', 'g']
+
+
+def test_thread_safe():
+    cache = LRUCache(max_entries=50, thread_safe=True)
+
+    def work(n):
+        for i in range(2000):
+            cache[(n, i % 100)] = i
+            cache.get((n, (i + 1) % 100))
+
+    threads = [Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+
+
+def test_cached():
+    calls = []
+
+    @cached(LFUCache(max_entries=10))
+    def add(a, b=0):
+        calls.append((a, b))
+        return a + b
+
+    assert add(1) == 1
+    assert add(1) == 1
+    assert add(1, b=2) == 3
+    assert add(1, b=2) == 3
+    assert calls == [(1, 0), (1, 2)]
+    assert add.cache.info().hits == 2
+
+    @cached(key=lambda obj: obj['id'])
+    def get_id(obj):
+        return obj['id']
+
+    assert get_id({'id': 4}) == 4
+    assert list(get_id.cache) == [4]
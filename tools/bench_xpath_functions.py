@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Copyright(C) 2023 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Micro-benchmark of the XPath functions defined by HTMLPage, compared to
+their previous implementations.
+"""
+
+import re
+import timeit
+
+import lxml.html
+
+from woob.browser.pages import HTMLPage
+
+
+def legacy_has_class(context, *classes):
+    expressions = ' and '.join(["contains(concat(' ', normalize-space(@class), ' '), ' {0} ')".format(c) for c in classes])
+    xpath = 'self::*[@class and {0}]'.format(expressions)
+    return bool(context.context_node.xpath(xpath))
+
+
+def legacy_matches(context, text, pattern):
+    reobj = re.compile(pattern)
+    if not isinstance(text, list):
+        text = [text]
+    return any(reobj.search(t) for t in text)
+
+
+def build_doc(rows):
+    html = ['<table>']
+    for i in range(rows):
+        html.append(
+            '<tr class="row %s"><td class="date">01/02/2023</td><td class="label">Label %d</td></tr>'
+            % ('odd' if i % 2 else 'even', i)
+        )
+    html.append('</table>')
+    return lxml.html.fromstring(''.join(html))
+
+
+def bench(doc, name, legacy, expression, number):
+    ns = lxml.etree.FunctionNamespace(None)
+    HTMLPage.setup_xpath_functions()
+    current = ns[name]
+    xpath = lxml.etree.XPath(expression)
+
+    new_time = min(timeit.repeat(lambda: xpath(doc), number=number, repeat=3))
+    ns[name] = legacy
+    try:
+        old_time = min(timeit.repeat(lambda: xpath(doc), number=number, repeat=3))
+    finally:
+        ns[name] = current
+
+    print('%-45s old: %.3fs  new: %.3fs  speedup: x%.1f' % (expression, old_time, new_time, old_time / new_time))
+
+
+def main():
+    doc = build_doc(2000)
+    bench(doc, 'has-class', legacy_has_class, '//tr[has-class("odd")]', 20)
+    bench(doc, 'has-class', legacy_has_class, '//td[has-class("label")]', 20)
+    bench(doc, 'matches', legacy_matches, '//td[matches(text(), "^Label \\d+5$")]', 20)
+
+    setup_time = min(timeit.repeat(HTMLPage.setup_xpath_functions, number=10000, repeat=3))
+    print('HTMLPage.setup_xpath_functions() x10000: %.3fs' % setup_time)
+
+
+if __name__ == '__main__':
+    main()
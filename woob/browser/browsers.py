@@ -58,7 +58,7 @@
 from .sessions import FuturesSession
 from .profiles import Firefox, Profile
 from .pages import NextPage
-from .url import URL, normalize_url
+from .url import URL, URLDispatcher, normalize_url
 
 
 class Browser:
@@ -187,6 +187,8 @@ def __init__(
         self.responses_dirname = responses_dirname
         self.responses_count = 0
         self.responses_lock = Lock()
+        # Number of requests sent, read by call statistics.
+        self.requests_count = 0
 
         if self.logger.settings['ssl_insecure']:
             self.verify = False
@@ -526,6 +528,7 @@ def inner_callback(future, response):
             return callback(response)
 
         # call python3-requests
+        self.requests_count += 1
         try:
             response = self.session.send(preq,
                                          allow_redirects=allow_redirects,
@@ -928,6 +931,7 @@ class PagesBrowser(DomainBrowser):
     """
 
     _urls = None
+    _url_dispatcher = None
 
     def __init__(self, *args, **kwargs):
         self._urls = OrderedDict()
@@ -962,10 +966,12 @@ def __setattr__(self, key, value):
                 value = copy(value)
                 value.browser = self
                 self._urls[key] = value
+                self._url_dispatcher = None
             elif key in self._urls:
                 # We want to remove the URL from our mapping only.
                 url = self._urls.pop(key)
                 url.browser = None
+                self._url_dispatcher = None
 
         super().__setattr__(key, value)
 
@@ -974,9 +980,23 @@ def __delattr__(self, key):
             if key in self._urls:
                 # We want to remove the URL from our mapping.
                 del self._urls[key]
+                self._url_dispatcher = None
 
         super().__delattr__(key)
 
+    def get_url_dispatcher(self) -> URLDispatcher:
+        """
+        Get the index used to find the :class:`~woob.browser.url.URL`
+        objects which may handle a response.
+
+        It is built again when URLs are added or removed, or when base
+        URLs of the browser change.
+        """
+        dispatcher = self._url_dispatcher
+        if dispatcher is None or dispatcher.key != URLDispatcher.get_key(dispatcher.urls, self):
+            dispatcher = self._url_dispatcher = URLDispatcher(self._urls.values(), self)
+        return dispatcher
+
     def open(self, *args, **kwargs) -> requests.Response:
         """
         Same method than
@@ -998,7 +1018,7 @@ def internal_callback(response):
                 response.page = page_class(self, response)
                 return callback(response)
 
-            for url in self._urls.values():
+            for url in self.get_url_dispatcher().candidates(response.url):
                 response.page = url.handle(response)
                 if response.page is not None:
                     self.logger.debug('Handle %s with %s', response.url, response.page.__class__.__name__)
@@ -15,24 +15,394 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['CacheMixin']
+from collections.abc import MutableMapping
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+import hashlib
+import re
+import sqlite3
+import struct
+from threading import RLock
+import time
+import zlib
+
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+from woob.tools.json import json
+
+from woob.browser.url import FINGERPRINT_HEADERS, request_fingerprint
+
+
+__all__ = ['CacheMixin', 'SQLiteCache']
+
+
+def parse_cache_control(value):
+    """
+    Parse a Cache-Control header.
+
+    :param value: value of the header
+    :type value: :class:`str` or None
+    :returns: directives, with None as value for directives without argument
+    :rtype: :class:`dict`
+    """
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def parse_http_date(value):
+    """
+    Parse a date of a HTTP header.
+
+    :rtype: timestamp as :class:`float`, or None if it is invalid
+    """
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
 
 
 class CacheEntry:
-    def __init__(self, response):
+    """
+    Response stored in cache, with what is needed to know if it is still
+    fresh (RFC 7234), or to revalidate it.
+
+    :param response: stored response
+    :type response: :class:`requests.Response`
+    :param stored_at: timestamp when the response has been received
+    :type stored_at: :class:`float`
+    :param vary: values of request headers listed in the ``Vary`` header
+                 of the response
+    :type vary: :class:`dict`
+    """
+
+    CACHEABLE_STATUS = (200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501)
+    """Statuses which can be stored"""
+
+    HEURISTIC_FRACTION = 0.1
+    """Fraction of the time since last modification used as heuristic freshness lifetime"""
+
+    def __init__(self, response, stored_at=None, vary=None):
         self.response = response
         self.etag = response.headers.get('ETag')
         self.last_modified = response.headers.get('Last-Modified')
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.vary = vary or {}
+        self.cache_control = parse_cache_control(response.headers.get('Cache-Control'))
 
     def has_cache_key(self):
         return (self.etag or self.last_modified)
 
+    def is_storable(self, updatable=True):
+        """
+        Whether the response can be stored in cache.
+
+        :param updatable: whether the entry will be revalidated once stale;
+                          if not, only successful responses with validators
+                          are stored, as they are then returned forever
+        :type updatable: :class:`bool`
+        """
+        if 'no-store' in self.cache_control or self.response.headers.get('Vary', '').strip() == '*':
+            return False
+        if not updatable:
+            return self.response.status_code == 200 and bool(self.has_cache_key())
+        if self.response.status_code not in self.CACHEABLE_STATUS:
+            return False
+        return bool(self.has_cache_key() or self.freshness_lifetime() > 0)
+
+    def freshness_lifetime(self):
+        """Time in seconds during which the response is fresh."""
+        headers = self.response.headers
+        if 'max-age' in self.cache_control:
+            try:
+                return max(int(self.cache_control['max-age']), 0)
+            except (TypeError, ValueError):
+                return 0
+
+        date = parse_http_date(headers.get('Date')) or self.stored_at
+        if 'Expires' in headers:
+            expires = parse_http_date(headers['Expires'])
+            # An invalid date means the response is already expired.
+            return max(expires - date, 0) if expires is not None else 0
+
+        last_modified = parse_http_date(self.last_modified)
+        if last_modified is not None and 'must-revalidate' not in self.cache_control:
+            return max(date - last_modified, 0) * self.HEURISTIC_FRACTION
+
+        return 0
+
+    def age(self, now=None):
+        """Current age in seconds of the response."""
+        if now is None:
+            now = time.time()
+        try:
+            age = max(int(self.response.headers.get('Age', 0)), 0)
+        except ValueError:
+            age = 0
+        return age + max(now - self.stored_at, 0)
+
+    def is_fresh(self, now=None):
+        """Whether the response can be used without contacting the server."""
+        if 'no-cache' in self.cache_control:
+            return False
+        return self.freshness_lifetime() > self.age(now)
+
+    def matches(self, request):
+        """Whether headers listed in ``Vary`` have the same value in request."""
+        headers = CaseInsensitiveDict(request.headers)
+        return all(headers.get(name) == value for name, value in self.vary.items())
+
+    def refresh(self, response):
+        """
+        Update the entry with a 304 Not Modified response.
+
+        :param response: response to the revalidation request
+        :type response: :class:`requests.Response`
+        """
+        for name, value in response.headers.items():
+            if name.lower() not in ('content-length', 'content-encoding', 'transfer-encoding'):
+                self.response.headers[name] = value
+
+        self.etag = self.response.headers.get('ETag')
+        self.last_modified = self.response.headers.get('Last-Modified')
+        self.cache_control = parse_cache_control(self.response.headers.get('Cache-Control'))
+        self.stored_at = time.time()
+
     def update_request(self, request):
         if self.last_modified:
             request.headers['If-Modified-Since'] = self.last_modified
         if self.etag:
             request.headers['If-None-Match'] = self.etag
 
+    def dump(self):
+        """
+        Serialize the entry.
+
+        Only what is needed to rebuild the response is kept.
+
+        :rtype: :class:`bytes`
+        """
+        response = self.response
+        request = response.request
+        meta = json.dumps({
+            'method': request.method if request is not None else 'GET',
+            'request_url': request.url if request is not None else response.url,
+            'status_code': response.status_code,
+            'url': response.url,
+            'reason': response.reason,
+            'encoding': response.encoding,
+            'headers': list(response.headers.items()),
+            'stored_at': self.stored_at,
+            'vary': self.vary,
+        }).encode('utf-8')
+        return struct.pack('>I', len(meta)) + meta + (response.content or b'')
+
+    @classmethod
+    def load(cls, data):
+        """
+        Build an entry from what :func:`dump` returned.
+
+        :param data: serialized entry
+        :type data: :class:`bytes`
+        :rtype: :class:`CacheEntry`
+        """
+        length, = struct.unpack('>I', data[:4])
+        meta = json.loads(data[4:4 + length].decode('utf-8'))
+
+        response = Response()
+        response.status_code = meta['status_code']
+        response.url = meta['url']
+        response.reason = meta['reason']
+        response.encoding = meta['encoding']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response._content = data[4 + length:]
+        response.history = []
+        response.elapsed = timedelta(0)
+
+        # only what identifies the request is kept
+        request = PreparedRequest()
+        request.method = meta.get('method', 'GET')
+        request.url = meta.get('request_url', response.url)
+        request.headers = CaseInsensitiveDict()
+        response.request = request
+        return cls(response, meta.get('stored_at'), meta.get('vary'))
+
+
+class SQLiteCache(MutableMapping):
+    """
+    Persistent cache store for :class:`CacheMixin`, in a SQLite database.
+
+    Keys are the ones built by :func:`CacheMixin.make_cache_key`, values are
+    :class:`CacheEntry` objects, which are stored compressed.
+
+    The store behaves as a dict, and can be used as the ``cache`` attribute
+    of a browser::
+
+        class MyBrowser(CacheMixin, PagesBrowser):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.cache = SQLiteCache('/path/to/cache.sqlite', max_size=50 * 1024 * 1024)
+
+    :param path: path of the database file
+    :type path: :class:`str`
+    :param max_size: maximum size in bytes of stored entries; when it is
+                     exceeded, entries are evicted according to *policy*
+                     (None means no limit)
+    :type max_size: :class:`int`
+    :param ttl: time to live in seconds of an entry (None means no limit)
+    :type ttl: :class:`float`
+    :param policy: eviction policy, 'lru' (least recently used) or 'lfu'
+                   (least frequently used)
+    :type policy: :class:`str`
+    :param compress_level: zlib compression level
+    :type compress_level: :class:`int`
+    """
+
+    POLICIES = {
+        'lru': 'accessed',
+        'lfu': 'hits, accessed',
+    }
+
+    def __init__(self, path, max_size=None, ttl=None, policy='lru', compress_level=6):
+        if policy not in self.POLICIES:
+            raise ValueError('Unknown eviction policy %r' % policy)
+
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.policy = policy
+        self.compress_level = compress_level
+        self.lock = RLock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value BLOB, size INTEGER, '
+            'created REAL, accessed REAL, hits INTEGER)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_created ON entries (created)')
+
+        # The total size of entries is kept up to date by triggers, instead
+        # of being summed up on every insertion. Replaced entries are deleted
+        # by a "DELETE" trigger only with recursive triggers.
+        self.db.execute('PRAGMA recursive_triggers = ON')
+        self.db.executescript(
+            'BEGIN IMMEDIATE;'
+            'CREATE TABLE IF NOT EXISTS total (size INTEGER NOT NULL);'
+            'INSERT INTO total (size) SELECT COALESCE(SUM(size), 0) FROM entries '
+            'WHERE NOT EXISTS (SELECT * FROM total);'
+            'CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries '
+            'BEGIN UPDATE total SET size = size + new.size; END;'
+            'CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries '
+            'BEGIN UPDATE total SET size = size - old.size; END;'
+            'COMMIT;'
+        )
+
+    def _hash_key(self, key):
+        if isinstance(key, str):
+            return key
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created, now):
+        return self.ttl is not None and created + self.ttl < now
+
+    def __getitem__(self, key):
+        hkey = self._hash_key(key)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT value, created FROM entries WHERE key = ?', (hkey,)).fetchone()
+            if row is None:
+                raise KeyError(key)
+
+            value, created = row
+            if self._is_expired(created, now):
+                self.db.execute('DELETE FROM entries WHERE key = ?', (hkey,))
+                raise KeyError(key)
+
+            self.db.execute('UPDATE entries SET accessed = ?, hits = hits + 1 WHERE key = ?', (now, hkey))
+
+        return CacheEntry.load(zlib.decompress(value))
+
+    def __contains__(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT created FROM entries WHERE key = ?', (self._hash_key(key),)).fetchone()
+        return row is not None and not self._is_expired(row[0], now)
+
+    def __setitem__(self, key, entry):
+        value = zlib.compress(entry.dump(), self.compress_level)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, created, accessed, hits) VALUES (?, ?, ?, ?, ?, 0)',
+                (self._hash_key(key), value, len(value), now, now),
+            )
+            self.evict()
+
+    def __delitem__(self, key):
+        with self.lock:
+            cursor = self.db.execute('DELETE FROM entries WHERE key = ?', (self._hash_key(key),))
+            if not cursor.rowcount:
+                raise KeyError(key)
+
+    def __iter__(self):
+        # Original keys are not stored, only their hashes are available.
+        with self.lock:
+            keys = [row[0] for row in self.db.execute('SELECT key FROM entries')]
+        return iter(keys)
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def size(self):
+        """Total size in bytes of stored entries."""
+        with self.lock:
+            return self.db.execute('SELECT size FROM total').fetchone()[0]
+
+    def evict(self):
+        """
+        Remove expired entries, and then remove entries according to the
+        eviction policy until the size limit is respected.
+        """
+        with self.lock:
+            if self.ttl is not None:
+                self.db.execute('DELETE FROM entries WHERE created < ?', (time.time() - self.ttl,))
+
+            if self.max_size is None:
+                return
+
+            excess = self.size - self.max_size
+            if excess <= 0:
+                return
+
+            to_delete = []
+            query = 'SELECT key, size FROM entries ORDER BY %s' % self.POLICIES[self.policy]
+            for hkey, size in self.db.execute(query):
+                to_delete.append((hkey,))
+                excess -= size
+                if excess <= 0:
+                    break
+
+            self.db.executemany('DELETE FROM entries WHERE key = ?', to_delete)
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM entries')
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            self.db.close()
+
 
 class CacheMixin:
     """Mixin to inherit in a Browser"""
@@ -44,14 +414,34 @@ class CacheMixin:
     If `False`, once a request has been successfully executed, its response
     will always be returned.
 
-    If `True`, the `ETag` and `Last-Modified` of the response will be
-    stored along with the cache. When the request is re-executed, instead
-    of simply returning the previous response, the server is queried to
-    check if a newer version of the page exists.
+    If `True`, the freshness of a stored response is computed from its
+    `Cache-Control`, `Expires`, `Date` and `Last-Modified` headers, and a
+    fresh response is returned without contacting the server. Otherwise,
+    the `ETag` and `Last-Modified` of the stored response are used to ask
+    the server if a newer version of the page exists.
     If a newer page exists, it is returned instead and overwrites the
     obsolete page in the cache.
     """
 
+    cache_key_headers = FINGERPRINT_HEADERS
+
+    """Headers taken into account to make cache keys
+
+    Other headers, like a per-request nonce, don't prevent to get a stored
+    response. Headers used to negotiate the content should be listed by the
+    server in the ``Vary`` header of its responses anyway.
+    """
+
+    cache_key_credentials = re.compile(r'auth|token|api-?key|secret|session|password|credential', re.IGNORECASE)
+
+    """Pattern of the names of headers carrying credentials
+
+    Headers whose name matches it, like ``X-Auth-Token``, are taken into
+    account to make cache keys in addition to :attr:`cache_key_headers`, so
+    that responses are never shared by requests made with different
+    credentials. Set it to None to only use :attr:`cache_key_headers`.
+    """
+
     def __init__(self, *args, **kwargs):
         super(CacheMixin, self).__init__(*args, **kwargs)
 
@@ -59,38 +449,101 @@ def __init__(self, *args, **kwargs):
 
         """Cache store object
 
-        To limit the size of the cache, a :class:`woob.tools.lrudict.LimitedLRUDict`
-        instance can be used.
+        To limit the size of the cache, a :class:`woob.tools.lrudict.LRUCache`
+        instance can be used. To keep the cache across runs, a
+        :class:`SQLiteCache` instance can be used.
         """
 
+        self.cache_hits = 0
+        """Number of responses served from cache without network request"""
+
+        self.cache_misses = 0
+        """Number of responses which have been downloaded"""
+
+        self.cache_revalidations = 0
+        """Number of stored responses reused after a 304 Not Modified response"""
+
     def make_cache_key(self, request):
-        """Make a key for the cache corresponding to the request."""
+        """Make a key for the cache corresponding to the request.
+
+        The key is the fingerprint of the request computed by
+        :func:`woob.browser.url.request_fingerprint`, taking into account the
+        headers listed in :attr:`cache_key_headers` and the ones matching
+        :attr:`cache_key_credentials`.
+        """
+
+        headers = list(self.cache_key_headers)
+        if self.cache_key_credentials is not None:
+            known = {name.lower() for name in headers}
+            headers.extend(
+                name for name in (request.headers or {})
+                if name.lower() not in known and self.cache_key_credentials.search(name)
+            )
+        return request_fingerprint(request, headers)
 
-        body = getattr(request, 'body', None)
-        headers = tuple(request.headers.values())
-        return (request.method, request.url, body, headers)
+    def make_vary_key(self, key, names, request):
+        """Make the key of a variant of a response, from headers listed in its ``Vary`` header."""
+        headers = CaseInsensitiveDict(request.headers)
+        variant = hashlib.sha256()
+        for name in sorted(names):
+            variant.update(('%s: %s\0' % (name, headers.get(name))).encode('utf-8'))
+        return '%s:%s' % (key, variant.hexdigest())
+
+    def get_cache_entry(self, key, request):
+        """Get the stored entry corresponding to the request, or None."""
+        entry = self.cache.get(key)
+        if entry is not None and not entry.matches(request):
+            # Another variant of the response is stored at the primary key.
+            entry = self.cache.get(self.make_vary_key(key, entry.vary, request))
+            if entry is not None and not entry.matches(request):
+                entry = None
+        return entry
+
+    def store_cache_entry(self, key, entry, request):
+        """Store an entry in cache."""
+        self.logger.debug('storing %r response in cache', request.url)
+        self.cache[key] = entry
+        if entry.vary:
+            self.cache[self.make_vary_key(key, entry.vary, request)] = entry
 
     def open_with_cache(self, url, **kwargs):
         """Perform a request using the cache if possible."""
         request = self.build_request(url, **kwargs)
+        request_cache_control = parse_cache_control(request.headers.get('Cache-Control'))
 
         key = self.make_cache_key(request)
-        if key in self.cache:
-            if not self.cache_is_updatable:
+        entry = None
+        if 'no-cache' not in request_cache_control and 'no-store' not in request_cache_control:
+            entry = self.get_cache_entry(key, request)
+
+        if entry is not None:
+            if not self.cache_is_updatable or entry.is_fresh():
                 self.logger.debug('cache HIT for %r', request.url)
-                return self.cache[key].response
-            else:
-                self.cache[key].update_request(request)
+                self.cache_hits += 1
+                return entry.response
+
+            entry.update_request(request)
 
         response = super(CacheMixin, self).open(request, **kwargs)
-        if response.status_code == 304:
-            self.logger.debug('cache HIT for %r', request.url)
-            return self.cache[key].response
-        elif response.status_code == 200:
-            entry = CacheEntry(response)
-            if entry.has_cache_key():
-                self.logger.debug('storing %r response in cache', request.url)
-                self.cache[key] = entry
+        if response.status_code == 304 and entry is not None:
+            self.logger.debug('cache HIT for %r (revalidated)', request.url)
+            self.cache_revalidations += 1
+            entry.refresh(response)
+            self.store_cache_entry(key, entry, request)
+            return entry.response
+
+        if 'no-store' not in request_cache_control:
+            vary = {}
+            headers = CaseInsensitiveDict(request.headers)
+            for name in response.headers.get('Vary', '').split(','):
+                name = name.strip().lower()
+                if name and name != '*':
+                    vary[name] = headers.get(name)
+
+            new_entry = CacheEntry(response, vary=vary)
+            if new_entry.is_storable(self.cache_is_updatable):
+                self.store_cache_entry(key, new_entry, request)
 
         self.logger.debug('cache MISS for %r', request.url)
+        self.cache_misses += 1
         return response
@@ -18,11 +18,15 @@
 from __future__ import annotations
 
 from typing import Callable, Any, Type
+import datetime
+import decimal
 import importlib
 import os
 import re
 import sys
+from bisect import bisect_left
 from collections import OrderedDict
+from collections.abc import MutableMapping
 from copy import deepcopy
 import traceback
 import warnings
@@ -31,10 +35,12 @@
 
 from woob.tools.log import getLogger, DEBUG_FILTERS
 from woob.browser.pages import NextPage
+from woob.browser.xpath import xpath
 from woob.capabilities.base import FetchError
 
-from .filters.standard import _Filter, CleanText
-from .filters.html import AttributeNotFound, XPathNotFound
+from .filters.base import _undebugged
+from .filters.standard import _Filter, CleanText, Filter
+from .filters.html import AttributeNotFound, TableCell, XPathNotFound
 from .filters.json import Dict
 
 
@@ -42,6 +48,7 @@
     'AbstractElement',
     'DataError',
     'DictElement',
+    'ElementEnv',
     'ItemElement',
     'ItemElementFromAbstractPage',
     'ListElement',
@@ -54,6 +61,9 @@
 ]
 
 
+_filters_logger = getLogger('woob.browser.b2filters')
+
+
 def generate_table_element(doc, head_xpath, cleaner=CleanText):
     """
     Prints generated base code for TableElement/TableCell usage.
@@ -107,6 +117,128 @@ def inner(self, *args, **kwargs):
     return inner
 
 
+class ElementEnv(MutableMapping):
+    """
+    Environment of an element, copied from the environment of its parent.
+
+    Only references to values of the parent are copied, instead of copying
+    the whole parent environment for every element. A mutable value is
+    copied when it is got, as it may then be modified in place, and got
+    again if another environment has been copied from this one since, so
+    modifying a value never affects the parent nor the children. As with a
+    deep copy, changes to the environment of an element never affect its
+    parent, and changes to the parent after an element has been created
+    are not seen by this element.
+
+    :param parent: environment of the parent element, or page parameters,
+                   which are deeply copied
+    :type parent: :class:`dict` or :class:`ElementEnv`
+    """
+
+    IMMUTABLE_TYPES = frozenset((
+        type(None), bool, int, float, complex, str, bytes, decimal.Decimal,
+        datetime.date, datetime.datetime, datetime.time, datetime.timedelta,
+    ))
+
+    def __init__(self, parent=None):
+        # number of environments copied from this one
+        self.copies = 0
+        # keys of values copied by this environment, with the number of
+        # copies of the environment at that time, and the memo of deepcopy()
+        # used to copy values which keep references between them
+        self.copied = {}
+        self.memo = None
+        self.memo_copies = 0
+
+        if isinstance(parent, ElementEnv):
+            parent.copies += 1
+            self.values = dict(parent.values)
+        else:
+            self.values = deepcopy(dict(parent or {}))
+            self.copied = dict.fromkeys(self.values, 0)
+
+    def peek(self, key):
+        """Get a value without copying it. It must not be modified."""
+        return self.values[key]
+
+    def __getitem__(self, key):
+        value = self.values[key]
+        if type(value) not in self.IMMUTABLE_TYPES and self.copied.get(key) != self.copies:
+            # the value may be shared with the parent or with children
+            if self.memo is None or self.memo_copies != self.copies:
+                # values copied since the last copy of the environment keep
+                # sharing references, as with a deep copy of all values
+                self.memo = {}
+                self.memo_copies = self.copies
+            value = self.values[key] = deepcopy(value, self.memo)
+            self.copied[key] = self.copies
+        return value
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+        self.copied[key] = self.copies
+
+    def __delitem__(self, key):
+        del self.values[key]
+        self.copied.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['memo'] = None
+        return state
+
+    def snapshot(self):
+        """
+        Get a copy of the whole environment.
+
+        :rtype: :class:`dict`
+        """
+        return deepcopy(self.values)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.values)
+
+
+class _ElementPlan:
+    """
+    Attributes of an element class which are looked up by name, computed
+    once per class instead of scanning ``dir()`` for every parsed element.
+    """
+
+    def __init__(self, klass):
+        # names of nested element classes, and of properties which may return one
+        self.elements = []
+        # (name, attribute name) of load_* and col_* attributes
+        self.loaders = []
+        self.columns = []
+
+        for attrname in dir(klass):
+            try:
+                attr = getattr(klass, attrname)
+            except AttributeError:
+                continue
+
+            if isinstance(attr, property) or (isinstance(attr, type) and issubclass(attr, AbstractElement)):
+                self.elements.append(attrname)
+
+            m = re.match('load_(.*)', attrname)
+            if m:
+                self.loaders.append((m.group(1), attrname))
+
+            m = re.match('col_(.*)', attrname)
+            if m:
+                self.columns.append((m.group(1), attrname))
+
+
 class AbstractElement:
     _creation_counter = 0
 
@@ -126,6 +258,18 @@ class AbstractElement:
       element object directly.
     """
 
+    compile_filters: bool = True
+    """Whether filters are evaluated through the functions they compile to.
+
+    This is faster and gives the same results, but is only done when filter
+    debugging and HTML elements highlighting are disabled.
+    """
+
+    _compiled_filters = False
+    # values of fields of this item, parsed by its table with the other
+    # cells of their column (see TableElement.column_batch)
+    _batch_values = None
+
     def __new__(cls, *args, **kwargs):
         """ Accept any arguments, necessary for ItemElementFromAbstractPage __new__
         override.
@@ -160,15 +304,33 @@ def __init__(self, page, parent=None, el=None):
 
         self.loaders = {}
 
+        self._compiled_filters = self.compile_filters and self._can_compile_filters()
+
+    def _can_compile_filters(self) -> bool:
+        # compiled filters neither log debug information nor highlight elements
+        if _filters_logger.isEnabledFor(DEBUG_FILTERS):
+            return False
+        try:
+            return not self.page.browser.highlight_el
+        except AttributeError:
+            return True
+
     def use_selector(
         self,
         func: _Filter | 'ItemElement' | 'ListElement' | Callable[[], Any],
         key: str | None = None
     ):
         if isinstance(func, _Filter):
-            func._obj = self
-            func._key = key
-            value = func(self)
+            if self._batch_values is not None and key in self._batch_values:
+                value = self._batch_values[key]
+                if isinstance(value, _ColumnError):
+                    raise value.error
+            elif self._compiled_filters:
+                value = func.compile()(self, self, key)
+            else:
+                func._obj = self
+                func._key = key
+                value = func(self)
         elif isinstance(func, type) and issubclass(func, ItemElement):
             value = func(self.page, self, self.el)()
         elif isinstance(func, type) and issubclass(func, ListElement):
@@ -180,6 +342,20 @@ def use_selector(
 
         return value
 
+    @classmethod
+    def get_plan(cls) -> _ElementPlan:
+        """
+        Get the nested elements, loaders and columns of this class.
+
+        It is computed when first used, so attributes added to the class
+        afterwards are ignored.
+        """
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = _ElementPlan(cls)
+            cls._plan = plan
+        return plan
+
     def parse(self, obj):
         pass
 
@@ -187,14 +363,10 @@ def cssselect(self, *args, **kwargs):
         return self.el.cssselect(*args, **kwargs)
 
     def xpath(self, *args, **kwargs):
-        return self.el.xpath(*args, **kwargs)
+        return xpath(self.el, *args, **kwargs)
 
     def handle_loaders(self):
-        for attrname in dir(self):
-            m = re.match('load_(.*)', attrname)
-            if not m:
-                continue
-            name = m.group(1)
+        for name, attrname in self.get_plan().loaders:
             if name in self.loaders:
                 continue
             loader = getattr(self, attrname)
@@ -202,9 +374,9 @@ def handle_loaders(self):
 
     def fill_env(self, page, parent=None):
         if parent is not None:
-            self.env = deepcopy(parent.env)
+            self.env = ElementEnv(parent.env)
         else:
-            self.env = deepcopy(page.params)
+            self.env = ElementEnv(page.params)
 
     def check_condition(self):
         """Get whether our condition is respected or not."""
@@ -220,7 +392,7 @@ def check_condition(self):
                 return True
         else:
             assert isinstance(self.condition, str)
-            if self.el.xpath(self.condition):
+            if xpath(self.el, self.condition):
                 return True
 
         return False
@@ -232,6 +404,32 @@ class ListElement(AbstractElement):
     flush_at_end = False
     ignore_duplicate = False
 
+    stream: bool = False
+    """Whether to build and parse items one at a time.
+
+    By default, all items of the list are built, and their conditions and
+    loaders evaluated, before the first object is returned. When streaming,
+    each object is returned as soon as it is parsed, which lowers memory
+    usage and lets the caller stop early on big lists.
+    """
+
+    objects_history: int | None = None
+    """Maximum number of objects remembered to detect duplicates.
+
+    It is only used with :attr:`ignore_duplicate`, and when objects are not
+    flushed at end, to avoid keeping all objects of big lists in memory.
+    Only duplicates of the last objects are then ignored.
+    """
+
+    record_tag: str | None = None
+    """Tag of the records to parse, on pages parsed while they are read.
+
+    The items are then built from the elements given by
+    :meth:`woob.browser.pages.RecordsPage.iter_records`, instead of
+    :attr:`item_xpath`, and are always streamed, as a record is cleared once
+    the next one is read.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.objects = OrderedDict()
@@ -248,12 +446,14 @@ def find_elements(self):
         This method can be overridden if xpath filters are not
         sufficient.
         """
-        if self.item_xpath is not None:
-            element_list = self.el.xpath(self.item_xpath)
+        if self.record_tag is not None:
+            yield from self.page.iter_records(self.record_tag)
+        elif self.item_xpath is not None:
+            element_list = xpath(self.el, self.item_xpath)
             if element_list:
                 for el in element_list:
                     yield el
-            elif self.empty_xpath is not None and not self.el.xpath(self.empty_xpath):
+            elif self.empty_xpath is not None and not xpath(self.el, self.empty_xpath):
                 # Send a warning if no item_xpath node was found and an empty_xpath is defined
                 self.logger.warning('No element matched the item_xpath and the defined empty_xpath was not found!')
         else:
@@ -265,17 +465,9 @@ def __iter__(self):
 
         self.parse(self.el)
 
-        items = []
-        for el in self.find_elements():
-            for attrname in dir(self):
-                attr = getattr(self, attrname)
-                if isinstance(attr, type) and issubclass(attr, AbstractElement) and attr != type(self):
-                    item = attr(self.page, self, el)
-                    if not item.check_condition():
-                        continue
-
-                    item.handle_loaders()
-                    items.append(item)
+        items = self.iter_items()
+        if not self.stream and self.record_tag is None:
+            items = list(items)
 
         for item in items:
             for obj in item:
@@ -289,6 +481,28 @@ def __iter__(self):
 
         self.check_next_page()
 
+    def iter_items(self):
+        """
+        Build the item elements to parse for the nodes found by
+        :meth:`find_elements`.
+        """
+        for el in self.find_elements():
+            yield from self.build_items(el)
+
+    def build_items(self, el):
+        """
+        Build the item elements to parse for a node.
+        """
+        for attrname in self.get_plan().elements:
+            attr = getattr(self, attrname)
+            if isinstance(attr, type) and issubclass(attr, AbstractElement) and attr != type(self):
+                item = attr(self.page, self, el)
+                if not item.check_condition():
+                    continue
+
+                item.handle_loaders()
+                yield item
+
     def flush(self):
         for obj in self.objects.values():
             yield obj
@@ -318,6 +532,9 @@ def store(self, obj):
                 else:
                     raise DataError('There are two objects with the same ID! %s' % obj.id)
             self.objects[obj.id] = obj
+            if self.objects_history is not None and self.ignore_duplicate and not self.flush_at_end:
+                while len(self.objects) > self.objects_history:
+                    self.objects.popitem(last=False)
         return obj
 
 
@@ -421,7 +638,7 @@ def reroot_element(self, el: Any) -> Any:
             return el
 
         if hasattr(el, 'xpath'):
-            return el.xpath(item_xpath)
+            return xpath(el, item_xpath)
         elif isinstance(el, (dict, list)):
             return Dict.select(item_xpath.split('/'), self)
         return el
@@ -494,12 +711,15 @@ def handle_attr(self, key: str, func):
         except Exception as e:
             # If we are here, we have probably a real parsing issue
             self.logger.warning('Attribute %s (in %s:%s) raises %s', key, self._class_file, self._class_line, repr(e))
-            if not self.skip_optional_fields_errors or key not in self.obj._fields or self.obj._fields[key].mandatory:
+            if (
+                not self.skip_optional_fields_errors
+                or self.obj._get_field_index(key) is None  # not a field, or deleted
+                or self.obj._fields[key].mandatory
+            ):
                 raise
             else:
                 value = FetchError
-        logger = getLogger('woob.browser.b2filters')
-        logger.log(DEBUG_FILTERS, "%s.%s = %r" % (self._random_id, key, value))
+        _filters_logger.log(DEBUG_FILTERS, "%s.%s = %r", self._random_id, key, value)
         setattr(self.obj, key, value)
 
 
@@ -544,26 +764,65 @@ class ItemElementFromAbstractPage(metaclass=MetaAbstractItemElement):
     """Don't use this class, import woob_modules.other_module.etc instead"""
 
 
+class _ColumnError:
+    # Error raised by a filter on the cell of a row, raised again when the
+    # field of this row is parsed.
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _filter_column(function, values):
+    # Apply a filter function to each value of a column, keeping errors.
+    column = []
+    for value in values:
+        if not isinstance(value, _ColumnError):
+            try:
+                value = function(value)
+            except Exception as error:
+                value = _ColumnError(error)
+        column.append(value)
+    return column
+
+
 class TableElement(ListElement):
     head_xpath = None
     cleaner = CleanText
 
+    column_batch: bool = False
+    """Whether to parse fields column by column.
+
+    The rows of the table are walked once to find the cells of each column,
+    and fields of items which are a chain of filters on a :class:`TableCell`
+    are parsed for the whole column at once, filter after filter. Objects
+    are then built row by row as usual, with these values, and other fields
+    are parsed for each item.
+
+    It is not used when items are streamed, nor when filters are debugged
+    or highlight elements.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self._cols = {}
+        self._row_cells = {}
+        self._table_rows = None
+        self._table_cells = {}
+        # values of every row for the fields parsed by column, per item class
+        self._column_batches = {}
 
         columns = {}
-        for attrname in dir(self):
-            m = re.match('col_(.*)', attrname)
-            if m:
-                cols = getattr(self, attrname)
-                if not isinstance(cols, (list,tuple)):
-                    cols = [cols]
-                columns[m.group(1)] = [s.lower() if isinstance(s, str) else s for s in cols]
+        for name, attrname in self.get_plan().columns:
+            cols = getattr(self, attrname)
+            if not isinstance(cols, (list,tuple)):
+                cols = [cols]
+            columns[name] = [s.lower() if isinstance(s, str) else s for s in cols]
 
         colnum = 0
-        for el in self.el.xpath(self.head_xpath):
+        for el in xpath(self.el, self.head_xpath):
             title = self.cleaner.clean(el)
             for name, titles in columns.items():
                 if name in self._cols:
@@ -579,6 +838,161 @@ def __init__(self, *args, **kwargs):
     def get_colnum(self, name):
         return self._cols.get(name, None)
 
+    def get_row_cells(self, row, cells_xpath):
+        """
+        Get the cells of a row.
+
+        They are looked for once per row, instead of once per column, and
+        kept until the cells of another row are asked for.
+
+        :param row: element of the row
+        :param cells_xpath: xpath of the cells in the row
+        :type cells_xpath: :class:`str`
+        :rtype: :class:`list`
+        """
+        try:
+            cached_row, cells = self._row_cells[cells_xpath]
+        except KeyError:
+            pass
+        else:
+            if cached_row is row:
+                return cells
+
+        cells = xpath(row, cells_xpath)
+        self._row_cells[cells_xpath] = (row, cells)
+        return cells
+
+    def iter_items(self):
+        if not self.column_batch or self.stream or self.record_tag is not None or not self._compiled_filters:
+            yield from super().iter_items()
+            return
+
+        self._table_rows = list(self.find_elements())
+        for index, row in enumerate(self._table_rows):
+            for item in self.build_items(row):
+                item._batch_values = self.get_column_values(type(item), index)
+                yield item
+
+    def get_column_values(self, klass, index):
+        """
+        Get values of the fields parsed by column, for an item of a row.
+
+        :param klass: class of the item
+        :param index: index of the row in the table
+        :type index: :class:`int`
+        :rtype: :class:`dict`
+        """
+        columns = self._column_batches.get(klass)
+        if columns is None:
+            columns = self._column_batches[klass] = self.parse_columns(klass)
+        return {key: values[index] for key, values in columns.items()}
+
+    def parse_columns(self, klass):
+        """
+        Parse the fields of an item class which only depend on a cell, for
+        all the rows of the table.
+
+        :param klass: class of the items
+        :return: values of each row, by name of field
+        :rtype: :class:`dict`
+        """
+        columns = {}
+        if not issubclass(klass, ItemElement) or klass.item_xpath is not None or hasattr(klass, 'reroot_xpath'):
+            # cells are looked for in another element than the row
+            return columns
+
+        for key in klass._attrs:
+            column_filter = self.get_column_filter(getattr(klass, 'obj_%s' % key, None))
+            if column_filter is None:
+                continue
+
+            cells_xpath, colnum, functions = column_filter
+            values = self.get_column_cells(cells_xpath, colnum)
+            for function in functions:
+                values = _filter_column(function, values)
+            columns[key] = values
+
+        return columns
+
+    def get_column_filter(self, func):
+        """
+        Get how to parse a field by column, or None if it has to be parsed
+        for each item.
+
+        :return: xpath of the cells of a row, index of the column, and the
+                 filter functions to apply to the cell
+        :rtype: :class:`tuple`
+        """
+        functions = []
+        while isinstance(func, Filter):
+            klass = type(func)
+            if klass.__call__ is not Filter.__call__ or klass.select is not Filter.select:
+                return None
+            functions.append(_undebugged(func.filter))
+            func = func.selector
+
+        if (
+            not isinstance(func, TableCell)
+            or type(func).__call__ is not TableCell.__call__
+            or type(func).get_row_cells is not TableCell.get_row_cells
+        ):
+            return None
+
+        cells_xpath = func.ROW_CELLS_XPATHS.get(func.td)
+        if cells_xpath is None:
+            return None
+
+        for name in func.names:
+            colnum = self.get_colnum(name)
+            if colnum is not None:
+                break
+        else:
+            # let the filter fail or give its default for each item
+            return None
+
+        functions.reverse()
+        return cells_xpath, colnum, functions
+
+    def get_column_cells(self, cells_xpath, colnum):
+        """
+        Get the cell of a column in each row, as selected by
+        :class:`TableCell`.
+
+        :param cells_xpath: xpath of the cells in a row
+        :type cells_xpath: :class:`str`
+        :param colnum: index of the column
+        :type colnum: :class:`int`
+        :rtype: :class:`list`
+        """
+        rows = self._table_cells.get(cells_xpath)
+        if rows is None:
+            rows = self._table_cells[cells_xpath] = []
+            for row in self._table_rows:
+                # index of the first column of each cell, honoring colspan
+                cells = xpath(row, cells_xpath)
+                starts = []
+                error = None
+                current_col = 0
+                for cell in cells:
+                    starts.append(current_col)
+                    try:
+                        current_col += int(cell.attrib.get('colspan', 1))
+                    except ValueError as exc:
+                        error = _ColumnError(exc)
+                        break
+                rows.append((cells, starts, error))
+
+        column = []
+        for cells, starts, error in rows:
+            index = bisect_left(starts, colnum)
+            if index < len(starts) and index <= colnum:
+                column.append([cells[index]])
+            elif error is not None:
+                column.append(error)
+            else:
+                column.append([])
+        return column
+
 
 class DictElement(ListElement):
     def find_elements(self):
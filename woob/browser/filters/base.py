@@ -19,6 +19,7 @@
 
 import lxml.html
 
+from woob.browser.xpath import xpath
 from woob.exceptions import ParseError
 from woob.tools.log import getLogger, DEBUG_FILTERS
 from woob.tools.misc import NO_DEFAULT as _NO_DEFAULT, NoDefaultType
@@ -70,6 +71,39 @@ def default_or_raise(self, exception):
         else:
             raise exception
 
+    def compile(self):
+        """
+        Get a function evaluating this filter on an item.
+
+        The function is called as ``function(item, obj, key)``, where ``obj``
+        and ``key`` are the element and the name of the field the filter is
+        evaluated for. It returns the same value as calling the filter, but
+        filters it is made of don't log debug information nor highlight the
+        selected HTML elements, so it should only be used when both are
+        disabled.
+
+        The function is built once and reused, so the filter should not be
+        changed anymore once it has been compiled.
+        """
+        compiled = self.__dict__.get('_compiled')
+        if compiled is None:
+            compiled = self._compiled = self._compile()
+        return compiled
+
+    def _compile(self):
+        """
+        Build the function returned by :meth:`compile`.
+
+        Filters which can be evaluated without going through
+        :meth:`__call__` override it.
+        """
+        def evaluate(item, obj, key):
+            self._key = key
+            self._obj = obj
+            return self(item)
+
+        return evaluate
+
     def highlight_el(self, el, item=None):
         obj = self._obj or item
         try:
@@ -136,10 +170,42 @@ def wrapper(self, value):
             res = function(self, value)
             return res
 
+        # used by compiled filters, which don't log anything
+        wrapper.undebugged = function
         return wrapper
     return decorator
 
 
+def _undebugged(method):
+    """
+    Get a bound method without the wrapper added by :func:`debug`, if any.
+    """
+    function = getattr(getattr(method, '__func__', None), 'undebugged', None)
+    if function is None:
+        return method
+    return function.__get__(method.__self__)
+
+
+def _compile_selector(selector):
+    """
+    Get a function evaluating a selector as :meth:`Filter.select` does,
+    without highlighting the selected elements.
+    """
+    if isinstance(selector, str):
+        def select(item, obj, key):
+            return xpath(item, selector)
+    elif isinstance(selector, _Filter):
+        select = selector.compile()
+    elif callable(selector):
+        def select(item, obj, key):
+            return selector(item)
+    else:
+        def select(item, obj, key):
+            return selector
+
+    return select
+
+
 class Filter(_Filter):
     """
     Class used to filter on a HTML element given as call parameter to return
@@ -165,7 +231,7 @@ def __init__(self, selector=None, default=_NO_DEFAULT):
 
     def select(self, selector, item):
         if isinstance(selector, str):
-            ret = item.xpath(selector)
+            ret = xpath(item, selector)
         elif isinstance(selector, _Filter):
             selector._key = self._key
             selector._obj = self._obj
@@ -187,6 +253,20 @@ def select(self, selector, item):
     def __call__(self, item):
         return self.filter(self.select(self.selector, item))
 
+    def _compile(self):
+        cls = type(self)
+        if cls.__call__ is not Filter.__call__ or cls.select is not Filter.select:
+            # evaluated in its own way
+            return super()._compile()
+
+        select = _compile_selector(self.selector)
+        filter = _undebugged(self.filter)
+
+        def evaluate(item, obj, key):
+            return filter(select(item, obj, key))
+
+        return evaluate
+
     @debug()
     def filter(self, value):
         """
@@ -22,6 +22,7 @@
 
 import lxml.html as html
 
+from woob.browser.xpath import xpath
 from woob.tools.html import html2text
 
 from .base import (
@@ -284,25 +285,62 @@ def __init__(self, *names, **kwargs):
         else:
             self.td = './td[%s]'
 
+    # xpath of all the cells of a row, for the xpath of one of them
+    ROW_CELLS_XPATHS = {
+        './td[%s]': './td',
+        '(./th | ./td)[%s]': '(./th | ./td)',
+    }
+
+    def get_row_cells(self, item):
+        """
+        Get all the cells of the row, or None if they have to be looked for
+        one at a time.
+        """
+        cells_xpath = self.ROW_CELLS_XPATHS.get(self.td)
+        if cells_xpath is None:
+            return None
+
+        get_row_cells = getattr(item.parent, 'get_row_cells', None)
+        if get_row_cells is None:
+            return xpath(item, cells_xpath)
+        return get_row_cells(item.el, cells_xpath)
+
     def __call__(self, item):
+        cells = self.get_row_cells(item)
+
         # New behavior, handling colspans > 1
         for name in self.names:
             col_idx = item.parent.get_colnum(name)
-            if col_idx is not None:
-                current_col = 0
-                for td_idx in range(col_idx + 1):
-                    ret = item.xpath(self.td % (td_idx + 1))
-                    if col_idx <= current_col:
-                        for el in ret:
-                            self.highlight_el(el, item)
-                        return ret
+            if col_idx is None:
+                continue
 
-                    if not ret:
-                        # There might no be no TD at all
-                        # ColumnNotFound seems for case when corresponding header is not found
-                        # Thus for compat return empty
-                        return []
-
-                    current_col += int(ret[0].attrib.get('colspan', 1))
+            current_col = 0
+            if cells is not None:
+                for cell in cells[:col_idx + 1]:
+                    if col_idx <= current_col:
+                        self.highlight_el(cell, item)
+                        return [cell]
+
+                    current_col += int(cell.attrib.get('colspan', 1))
+
+                if len(cells) <= col_idx:
+                    # There might no be no TD at all
+                    return []
+                continue
+
+            for td_idx in range(col_idx + 1):
+                ret = xpath(item, self.td % (td_idx + 1))
+                if col_idx <= current_col:
+                    for el in ret:
+                        self.highlight_el(el, item)
+                    return ret
+
+                if not ret:
+                    # There might no be no TD at all
+                    # ColumnNotFound seems for case when corresponding header is not found
+                    # Thus for compat return empty
+                    return []
+
+                current_col += int(ret[0].attrib.get('colspan', 1))
 
         return self.default_or_raise(ColumnNotFound('Unable to find column %s' % ' or '.join(self.names)))
@@ -19,7 +19,7 @@
 
 from typing import Callable, Any
 
-from .base import _Filter, _NO_DEFAULT, Filter, debug, ItemNotFound
+from .base import _Filter, _NO_DEFAULT, Filter, debug, ItemNotFound, _undebugged
 
 
 __all__ = ['Dict']
@@ -82,6 +82,19 @@ def filter(self, value):
 
         return value
 
+    def _compile(self):
+        cls = type(self)
+        if cls.__call__ is not Filter.__call__ or cls.select.__func__ is not Dict.select.__func__:
+            return super()._compile()
+
+        select = self.select
+        filter = _undebugged(self.filter)
+
+        def evaluate(item, obj, key):
+            return filter(select(self.selector, item))
+
+        return evaluate
+
     @classmethod
     def select(cls, selector, item, obj=None, key=None):
         if isinstance(item, (dict, list)):
@@ -34,10 +34,12 @@
 import unidecode
 
 from woob.browser.url import URL
+from woob.browser.xpath import xpath
 from woob.capabilities.base import Currency as BaseCurrency
 from woob.capabilities.base import empty
+from woob.tools.lrudict import LRUCache
 
-from .base import _NO_DEFAULT, Filter, FilterError, ItemNotFound, _Filter, debug
+from .base import _NO_DEFAULT, Filter, FilterError, ItemNotFound, _Filter, _compile_selector, _undebugged, debug
 
 __all__ = [
     'Filter', 'FilterError', 'RegexpError', 'FormatError',
@@ -210,6 +212,9 @@ def filter(self, el):
         return result
 
 
+_SPACES_RE = re.compile(r'\s+', flags=re.UNICODE)
+
+
 class CleanText(Filter):
     """
     Get a cleaned text from an element.
@@ -281,20 +286,26 @@ def clean(cls, txt, children=True, newlines=True, normalize='NFC', transliterate
         """
         if isinstance(txt, LXMLElement):
             if children:
-                txt = list(txt.itertext())
+                txt = txt.itertext()
             else:
-                txt = list(txt.xpath('./text()'))
+                txt = xpath(txt, './text()')
             txt = ' '.join(txt)  # 'foo   bar '
         elif not isinstance(txt, str):
             txt = ' '.join(txt.itertext())
 
         if newlines:
-            txt = re.compile(r'\s+', flags=re.UNICODE).sub(' ', txt)  # 'foo bar '
+            txt = _SPACES_RE.sub(' ', txt)  # 'foo bar '
         else:
             # normalize newlines and clean what is inside
-            txt = '\n'.join([cls.clean(l) for l in txt.splitlines()])
+            txt = '\n'.join([_SPACES_RE.sub(' ', line).strip() for line in txt.splitlines()])
+            # lines used to be cleaned one by one, with the default normalization
+            normalize = normalize or 'NFC'
 
         txt = txt.strip()
+        if txt.isascii():
+            # normalization and transliteration don't change ASCII text
+            return txt
+
         # normalize to a standard Unicode form
         if normalize:
             txt = unicodedata.normalize(normalize, txt)
@@ -732,33 +743,80 @@ def __init__(self, selector=None, default=_NO_DEFAULT, translations=None,
         if isinstance(tzinfo, str):
             tzinfo = gettz(tzinfo)
         self.tzinfo = tzinfo
+        self.memo = LRUCache(max_entries=self.memo_size, thread_safe=True) if strict and self.memo_size else None
 
     _default_date_1 = datetime.datetime(2100, 10, 10, 1, 1, 1)
     _default_date_2 = datetime.datetime(2120, 12, 12, 2, 2, 2)
 
+    memo_size = 256
+    """Number of recently parsed strings remembered, in strict mode.
+
+    Results of the non-strict mode are not remembered, as they depend on
+    the current date.
+    """
+
+    @classmethod
+    def _get_default_fields(cls):
+        # Components which are taken from defaults when missing, and would
+        # make strict parsing fail.
+        fields = cls.__dict__.get('_default_fields')
+        if fields is None:
+            fields = cls._default_fields = tuple(
+                field for field in ('year', 'month', 'day', 'hour', 'minute', 'second', 'microsecond')
+                if getattr(cls._default_date_1, field) != getattr(cls._default_date_2, field)
+            )
+        return fields
+
+    def parse_strict(self, txt):
+        """
+        Parse a date, and check all of its components are present.
+
+        :raises: :class:`FilterError` if the date is not complete
+        """
+        parse1 = self.parse_func(txt, default=self._default_date_1, **self.kwargs)
+
+        # A component taken from the default date is equal to it. When no
+        # component is, the date is complete and parsing it with another
+        # default date is useless.
+        for field in self._get_default_fields():
+            if getattr(parse1, field, None) == getattr(self._default_date_1, field):
+                parse2 = self.parse_func(txt, default=self._default_date_2, **self.kwargs)
+                if parse1 != parse2:
+                    raise FilterError('Date is not complete')
+                break
+
+        return parse1
+
     @debug()
     def filter(self, txt):
         if empty(txt) or txt == '':
             return self.default_or_raise(FormatError('Unable to parse %r' % txt))
+
+        memo_key = txt if self.memo is not None and isinstance(txt, str) else None
+        if memo_key is not None:
+            try:
+                return self.memo[memo_key]
+            except KeyError:
+                pass
+
         try:
             if self.translations:
                 for search, repl in self.translations:
                     txt = search.sub(repl, txt)
             if self.strict:
-                parse1 = self.parse_func(txt, default=self._default_date_1, **self.kwargs)
-                parse2 = self.parse_func(txt, default=self._default_date_2, **self.kwargs)
-                if parse1 != parse2:
-                    raise FilterError('Date is not complete')
+                parse1 = self.parse_strict(txt)
             else:
                 parse1 = self.parse_func(txt, **self.kwargs)
 
             if parse1.tzinfo is None and self.tzinfo:
                 parse1 = parse1.replace(tzinfo=self.tzinfo)
-
-            return parse1
         except (ValueError, TypeError) as e:
             return self.default_or_raise(FormatError('Unable to parse %r: %s' % (txt, e)))
 
+        if memo_key is not None:
+            self.memo[memo_key] = parse1
+        return parse1
+
 
 class FromTimestamp(Filter):
     """Parse a timestamp into a datetime."""
@@ -863,6 +921,19 @@ def __call__(self, item):
         values = [self.select(selector, item) for selector in self.selector]
         return self.filter(tuple(values))
 
+    def _compile(self):
+        cls = type(self)
+        if cls.__call__ is not MultiFilter.__call__ or cls.select is not Filter.select:
+            return super()._compile()
+
+        selects = [_compile_selector(selector) for selector in self.selector]
+        filter = _undebugged(self.filter)
+
+        def evaluate(item, obj, key):
+            return filter(tuple([select(item, obj, key) for select in selects]))
+
+        return evaluate
+
     def filter(self, values):
         raise NotImplementedError()
 
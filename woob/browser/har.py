@@ -23,6 +23,7 @@
 from threading import Lock
 from urllib.parse import urlparse, parse_qsl
 
+from woob.browser.url import request_fingerprint
 from woob.tools.json import json
 from woob.tools.log import getLogger
 from woob import __version__ as woob_version
@@ -96,6 +97,8 @@ def _build_har_request(request, http_version):
             # for chromium
             'bodySize': -1,
             'headersSize': -1,
+            # non-standard key, to find identical requests when deduplicating or replaying
+            '_fingerprint': request_fingerprint(request),
         }
 
         if request.body is not None:
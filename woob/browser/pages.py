@@ -25,7 +25,7 @@
     Dict, Callable, List, Any, Iterator, Type, ClassVar, TYPE_CHECKING
 )
 from collections import OrderedDict
-from functools import wraps
+from functools import lru_cache, wraps
 from io import BytesIO, StringIO
 from urllib.parse import urljoin
 from ast import literal_eval
@@ -574,6 +574,17 @@ def build_doc(self, content: bytes) -> lxml.etree._Element:
         parser = lxml.etree.XMLParser(encoding=self.encoding, resolve_entities=False)
         return lxml.etree.parse(BytesIO(content), parser)
 
+    def build_pull_parser(self, tag: str) -> lxml.etree.XMLPullParser:
+        """
+        Build a parser fed with chunks of the response, giving the elements
+        with the given tag once they are complete.
+
+        It is used by :class:`RecordsPage`.
+        """
+        return lxml.etree.XMLPullParser(
+            events=('end',), tag=tag, encoding=self.encoding, resolve_entities=False,
+        )
+
 
 class RawPage(Page):
     """
@@ -584,6 +595,93 @@ def build_doc(self, content: bytes) -> bytes:
         return content
 
 
+_XML_SPACES_RE = re.compile(r'[ \t\r\n]+')
+
+# define_xpath_functions() implementation which has set up the global namespace
+_xpath_functions_definer = None
+
+
+def _xpath_lower_case(context, args):
+    return ' '.join([s.lower() for s in args])
+
+
+def _xpath_replace(context, args, old, new):
+    return ' '.join([s.replace(old, new) for s in args])
+
+
+def _xpath_has_class(context, *classes):
+    """
+    This lxml extension allows to select by CSS class more easily
+
+    >>> ns = lxml.etree.FunctionNamespace(None)
+    >>> ns['has-class'] = _xpath_has_class
+    >>> root = lxml.etree.fromstring('''
+    ... <a>
+    ...     <b class="one first text">I</b>
+    ...     <b class="two text">LOVE</b>
+    ...     <b class="three text">CSS</b>
+    ... </a>
+    ... ''')
+
+    >>> len(root.xpath('//b[has-class("text")]'))
+    3
+    >>> len(root.xpath('//b[has-class("one")]'))
+    1
+    >>> len(root.xpath('//b[has-class("text", "first")]'))
+    1
+    >>> len(root.xpath('//b[not(has-class("first"))]'))
+    2
+    >>> len(root.xpath('//b[has-class("not-exists")]'))
+    0
+    """
+    try:
+        value = context.context_node.get('class')
+    except AttributeError:
+        # not an element
+        return False
+    if value is None:
+        return False
+
+    # same as contains(concat(' ', normalize-space(@class), ' '), ' class ')
+    value = ' %s ' % _XML_SPACES_RE.sub(' ', value).strip(' ')
+    return all(' %s ' % c in value for c in classes)
+
+
+def _xpath_starts_with(context, text, prefix):
+    if not isinstance(text, list):
+        text = [text]
+    return any(t.startswith(prefix) for t in text)
+
+
+def _xpath_ends_with(context, text, suffix):
+    if not isinstance(text, list):
+        text = [text]
+    return any(t.endswith(suffix) for t in text)
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(pattern):
+    return re.compile(pattern)
+
+
+def _xpath_matches(context, text, pattern):
+    reobj = _compile_regex(pattern)
+    if not isinstance(text, list):
+        text = [text]
+    return any(reobj.search(t) for t in text)
+
+
+def _xpath_first_non_empty(context, *nodes_list):
+    for nodes in nodes_list:
+        if nodes:
+            return nodes
+    return []
+
+
+def _xpath_distinct_values(context, text):
+    return list(set(text))
+
+
 class HTMLPage(Page):
     """
     HTML page.
@@ -650,92 +748,54 @@ def handle_refresh(self):
 
     @classmethod
     def setup_xpath_functions(cls):
+        global _xpath_functions_definer
+
+        # The namespace is global: define functions again only if another
+        # class has defined its own ones since.
+        definer = cls.define_xpath_functions.__func__
+        if definer is _xpath_functions_definer:
+            return
+
         import lxml.html as html
 
         ns = html.etree.FunctionNamespace(None)
         cls.define_xpath_functions(ns)
+        _xpath_functions_definer = definer
 
     @classmethod
     def define_xpath_functions(cls, ns):
         """
         Define XPath functions on the given lxml function namespace.
 
-        This method is called in constructor of :class:`HTMLPage` and can be
-        overloaded by children classes to add extra functions.
-        """
-        ns['lower-case'] = lambda context, args: ' '.join([s.lower() for s in args])
-        ns['replace'] = lambda context, args, old, new: ' '.join([s.replace(old, new) for s in args])
-
-        def has_class(context, *classes):
-            """
-            This lxml extension allows to select by CSS class more easily
-
-            >>> ns = html.etree.FunctionNamespace(None)
-            >>> ns['has-class'] = has_class
-            >>> root = html.etree.fromstring('''
-            ... <a>
-            ...     <b class="one first text">I</b>
-            ...     <b class="two text">LOVE</b>
-            ...     <b class="three text">CSS</b>
-            ... </a>
-            ... ''')
-
-            >>> len(root.xpath('//b[has-class("text")]'))
-            3
-            >>> len(root.xpath('//b[has-class("one")]'))
-            1
-            >>> len(root.xpath('//b[has-class("text", "first")]'))
-            1
-            >>> len(root.xpath('//b[not(has-class("first"))]'))
-            2
-            >>> len(root.xpath('//b[has-class("not-exists")]'))
-            0
-            """
-            expressions = ' and '.join(["contains(concat(' ', normalize-space(@class), ' '), ' {0} ')".format(c) for c in classes])
-            xpath = 'self::*[@class and {0}]'.format(expressions)
-            return bool(context.context_node.xpath(xpath))
-
-        def starts_with(context, text, prefix):
-            if not isinstance(text, list):
-                text = [text]
-            return any(t.startswith(prefix) for t in text)
-
-        def ends_with(context, text, suffix):
-            if not isinstance(text, list):
-                text = [text]
-            return any(t.endswith(suffix) for t in text)
-
-        def matches(context, text, pattern):
-            reobj = re.compile(pattern)
-            if not isinstance(text, list):
-                text = [text]
-            return any(reobj.search(t) for t in text)
-
-        def first_non_empty(context, *nodes_list):
-            for nodes in nodes_list:
-                if nodes:
-                    return nodes
-            return []
-
-        def distinct_values(context, text):
-            return list(set(text))
-
-        ns['has-class'] = has_class
-        ns['starts-with'] = starts_with
-        ns['ends-with'] = ends_with
-        ns['matches'] = matches
-        ns['first-non-empty'] = first_non_empty
-        ns['distinct-values'] = distinct_values
-
-    def build_doc(self, content: bytes) -> lxml.etree._ElementTree:
+        This method is called in constructor of :class:`HTMLPage`, unless the
+        functions are already defined, and can be overloaded by children
+        classes to add extra functions.
         """
-        Method to build the lxml document from response and given encoding.
+        ns['lower-case'] = _xpath_lower_case
+        ns['replace'] = _xpath_replace
+        ns['has-class'] = _xpath_has_class
+        ns['starts-with'] = _xpath_starts_with
+        ns['ends-with'] = _xpath_ends_with
+        ns['matches'] = _xpath_matches
+        ns['first-non-empty'] = _xpath_first_non_empty
+        ns['distinct-values'] = _xpath_distinct_values
+
+    def get_parser_encoding(self) -> str | None:
+        """
+        Get the page encoding in the form expected by the lxml HTML parser.
         """
         encoding = self.encoding
         if encoding == 'latin-1':
             encoding = 'latin1'
         if encoding:
             encoding = encoding.replace('iso8859_', 'iso8859-')
+        return encoding
+
+    def build_doc(self, content: bytes) -> lxml.etree._ElementTree:
+        """
+        Method to build the lxml document from response and given encoding.
+        """
+        encoding = self.get_parser_encoding()
         import lxml.html as html
         parser = html.HTMLParser(encoding=encoding)
         doc = html.parse(BytesIO(content), parser, base_url=self.url)
@@ -745,6 +805,19 @@ def build_doc(self, content: bytes) -> lxml.etree._ElementTree:
 
         return doc
 
+    def build_pull_parser(self, tag: str) -> lxml.etree.HTMLPullParser:
+        """
+        Build a parser fed with chunks of the response, giving the elements
+        with the given tag once they are complete.
+
+        It is used by :class:`RecordsPage`.
+        """
+        encoding = self.get_parser_encoding()
+        import lxml.html as html
+        parser = lxml.etree.HTMLPullParser(events=('end',), tag=tag, encoding=encoding)
+        parser.set_element_class_lookup(html.HtmlElementClassLookup())
+        return parser
+
     def detect_encoding(self) -> str:
         """
         Look for encoding in the document "http-equiv" and "charset" meta nodes.
@@ -916,6 +989,87 @@ class LoggedPage:
     logged: bool = True
 
 
+class RecordsPage:
+    """
+    A page which is parsed while its response is read, record by record,
+    instead of building a document of the whole response.
+
+    It is used with :class:`XMLPage` or :class:`HTMLPage` for very large
+    responses, like exports, which would not fit in memory as a document:
+
+    >>> class ExportPage(RecordsPage, XMLPage):  # doctest: +SKIP
+    ...     @method
+    ...     class iter_operations(ListElement):
+    ...         record_tag = 'operation'
+    ...
+    ...         class item(ItemElement):
+    ...             klass = Transaction
+    ...             obj_label = CleanText('./label')
+
+    The :attr:`doc` attribute is None. Records are got with
+    :meth:`iter_records`, or by a :class:`woob.browser.elements.ListElement`
+    with a :attr:`woob.browser.elements.ListElement.record_tag`. A record is
+    cleared once the next one is asked for, so it can't be used afterwards,
+    and the page can be iterated only once.
+
+    Methods which need the whole document, like :meth:`HTMLPage.get_form`,
+    can't be used, and "Refresh" meta tags are not handled.
+
+    The page should be requested with ``stream=True``, so that the response
+    is not loaded in memory before being parsed.
+    """
+
+    CHUNK_SIZE: ClassVar[int] = 64 * 1024
+    """
+    Size of the chunks of the response given to the parser.
+    """
+
+    @property
+    def data(self) -> None:
+        # the response is only read by iter_records()
+        return None
+
+    def build_doc(self, content: None) -> None:
+        return None
+
+    def detect_encoding(self) -> None:
+        # declarations in the document are handled by the parser
+        return None
+
+    def handle_refresh(self) -> None:
+        # meta tags are not parsed before the records
+        return None
+
+    def iter_records(self, tag: str) -> Iterator[lxml.etree._Element]:
+        """
+        Parse the response, and iterate over the elements with a given tag.
+
+        :param tag: tag of the records, like ``{namespace}name`` for XML
+                    namespaces
+        :type tag: :class:`str`
+        """
+        parser = self.build_pull_parser(tag)
+        absolute_links = getattr(self, 'ABSOLUTE_LINKS', False)
+
+        def records():
+            for _, el in parser.read_events():
+                if absolute_links:
+                    el.make_links_absolute(self.url, handle_failures='ignore')
+                yield el
+
+                # free the record, and the empty ones kept before it
+                el.clear()
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+
+        for chunk in self.response.iter_content(self.CHUNK_SIZE):
+            parser.feed(chunk)
+            yield from records()
+
+        parser.close()
+        yield from records()
+
+
 class AbstractPageError(Exception):
     pass
 
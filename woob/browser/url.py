@@ -18,14 +18,17 @@
 from __future__ import annotations
 
 from functools import wraps
+import hashlib
 import re
-from typing import Callable, Dict, TYPE_CHECKING
-from urllib.parse import unquote
+from typing import Callable, Dict, Iterable, Iterator, List, TYPE_CHECKING
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
 
 import requests
 
 from woob.browser.pages import Page
 from woob.browser.filters.base import _Filter
+from woob.browser.xpath import xpath
+from woob.tools.json import json
 from woob.tools.regex_helper import normalize
 
 if TYPE_CHECKING:
@@ -62,6 +65,8 @@ def __init__(self, *args, base: str = 'BASEURL'):
                 self.klass = arg
 
         self._base = base
+        # compiled regexps, by base URL
+        self._compiled = {}
         self._creation_counter = URL._creation_counter
         URL._creation_counter += 1
 
@@ -249,18 +254,52 @@ def match(
 
         Returns ``None`` if none matches.
         """
+        if not base:
+            try:
+                base = self.get_base_url()
+            except ValueError:
+                # only an error if a relative pattern is reached, see below
+                base = None
+
+        for regex, compiled in zip(self.urls, self.compile(base)):
+            if compiled is None:
+                # raise the error about the missing base
+                self.get_base_url(browser=None, for_pattern=regex)
+
+            m = compiled.match(url)
+            if m:
+                return m
+
+        return None
+
+    def compile(self, base: str | None) -> List[re.Pattern | None]:
+        """
+        Get the compiled regexps of this object, relative ones being joined
+        to the given base URL.
+
+        Relative regexps are None if there is no base URL.
+        """
+        try:
+            return self._compiled[base]
+        except KeyError:
+            pass
+
+        compiled = []
         for regex in self.urls:
             if not ABSOLUTE_URL_PATTERN_RE.match(regex):
-                if not base:
-                    base = self.get_base_url(browser=None, for_pattern=regex)
+                if base is None:
+                    compiled.append(None)
+                    continue
 
                 regex = re.escape(base).rstrip('/') + '/' + regex.lstrip('/')
 
-            m = re.match(regex, url)
-            if m:
-                return m
+            compiled.append(re.compile(regex))
 
-        return None
+        if len(self._compiled) >= 8:
+            # the base URL of the browser changed too many times
+            self._compiled.clear()
+        self._compiled[base] = compiled
+        return compiled
 
     def handle(self, response: requests.Response) -> Page | None:
         """
@@ -289,7 +328,7 @@ def handle(self, response: requests.Response) -> Page | None:
                         return page
                 else:
                     assert isinstance(page.is_here, str)
-                    if page.doc.xpath(page.is_here):
+                    if xpath(page.doc, page.is_here):
                         return page
             else:
                 return page
@@ -386,6 +425,122 @@ def build(self, **kwargs) -> str:
         return super().build(**kwargs)
 
 
+def literal_prefix(regex: str) -> str:
+    r"""Get the literal string any match of a regexp starts with.
+
+    >>> literal_prefix(r'https://example\.org/(?P<id>\d+)\.html')
+    'https://example.org/'
+    >>> literal_prefix(r'/foo/bars?')
+    '/foo/bar'
+    >>> literal_prefix(r'/foo|/bar')
+    ''
+    """
+
+    # an alternation outside of groups can match anything
+    depth = 0
+    in_class = escaped = False
+    for char in regex:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return ''
+
+    prefix = []
+    i = 1 if regex.startswith('^') else 0
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            if i + 1 >= len(regex) or regex[i + 1].isalnum():
+                # character class (\d, \w...) or back reference
+                break
+            char = regex[i + 1]
+            i += 2
+        elif char in '.^$*+?{}[]()|':
+            break
+        else:
+            i += 1
+
+        if i < len(regex) and regex[i] in '*?{':
+            # the character is optional
+            break
+        prefix.append(char)
+
+    return ''.join(prefix)
+
+
+class URLDispatcher:
+    """
+    Index of the :class:`URL` objects of a browser, to find the ones which
+    may handle a response without trying all regexps.
+
+    URLs are indexed by the literal prefix of their regexps, for the current
+    base URLs of the browser.
+
+    :param urls: URL objects, by order of priority
+    :type urls: iterable of :class:`URL`
+    :param browser: browser the URLs belong to
+    :type browser: :class:`woob.browser.browsers.PagesBrowser`
+    """
+
+    def __init__(self, urls: Iterable[URL], browser: Browser):
+        self.urls = [url for url in urls if url.klass is not None]
+        self.key = self.get_key(self.urls, browser)
+
+        # prefix length -> prefix -> URL indexes
+        self.prefixes = {}
+        # indexes of URLs which are always tried
+        self.always = []
+
+        for index, url in enumerate(self.urls):
+            if type(url).match is not URL.match or type(url).handle is not URL.handle:
+                # we can't know what the URL will match
+                self.always.append(index)
+                continue
+
+            base = getattr(browser, url._base, None)
+            compiled = url.compile(base if isinstance(base, str) else None)
+            if any(regex is None for regex in compiled):
+                # let URL.match() raise the error about the missing base
+                self.always.append(index)
+                continue
+
+            for regex in compiled:
+                prefix = literal_prefix(regex.pattern)
+                self.prefixes.setdefault(len(prefix), {}).setdefault(prefix, set()).add(index)
+
+        self.lengths = sorted(self.prefixes)
+
+    @staticmethod
+    def get_key(urls: Iterable[URL], browser: Browser) -> tuple:
+        """
+        Get the values the index depends on, to know if it has to be built again.
+        """
+        return tuple(getattr(browser, base, None) for base in sorted({url._base for url in urls}))
+
+    def candidates(self, url: str) -> Iterator[URL]:
+        """
+        Get URL objects which may match the given url, by order of priority.
+        """
+        indexes = set(self.always)
+        for length in self.lengths:
+            if length > len(url):
+                break
+            indexes.update(self.prefixes[length].get(url[:length], ()))
+
+        for index in sorted(indexes):
+            yield self.urls[index]
+
+
 def normalize_url(url: str) -> str:
     """Normalize URL by lower-casing the domain and other fixes.
 
@@ -412,3 +567,100 @@ def norm_domain(m):
         return ''.join((m.group(1), auth, authsep, host, portsep, port))
 
     return re.sub(r'^(https?://)([^/#?]+)', norm_domain, url)
+
+
+FINGERPRINT_HEADERS = ('Accept', 'Accept-Language', 'Authorization', 'Content-Type')
+"""Headers taken into account by default by :func:`request_fingerprint`."""
+
+
+def _request_body(request) -> bytes:
+    body = getattr(request, 'body', None)
+    if body is None and isinstance(request, requests.Request):
+        # Avoid preparing the request: it would parse the URL again and
+        # would generate a random boundary for multipart bodies.
+        if request.json is not None:
+            body = json.dumps(request.json, sort_keys=True, separators=(',', ':'))
+        elif isinstance(request.data, (dict, list, tuple)):
+            body = urlencode(
+                list(request.data.items()) if isinstance(request.data, dict) else request.data,
+                doseq=True,
+            )
+        elif request.data:
+            body = request.data
+        if request.files:
+            files = request.files.items() if isinstance(request.files, dict) else request.files
+            body = '%s\0%s' % (body or '', sorted(repr(name) for name, _ in files))
+
+    if body is None:
+        return b''
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    if isinstance(body, bytes):
+        return body
+    # file-like or generator bodies are not read, to not consume them
+    return repr(body).encode('utf-8')
+
+
+def request_fingerprint(request, headers: Iterable[str] = FINGERPRINT_HEADERS) -> str:
+    """Compute a canonical fingerprint of a request.
+
+    The fingerprint is a hash of the method, the normalized URL with sorted
+    query parameters and without fragment, a digest of the body, and of the
+    values of the *headers* allowlist. Two requests only differing by the
+    order of their query parameters or headers, or by headers which are not
+    in the allowlist, have the same fingerprint.
+
+    >>> a = requests.Request('GET', 'https://Example.org:443/?b=2&a=1#top')
+    >>> b = requests.Request('get', 'https://example.org/', params={'a': 1, 'b': 2})
+    >>> request_fingerprint(a) == request_fingerprint(b)
+    True
+
+    :param request: request to fingerprint
+    :type request: :class:`requests.Request` or :class:`requests.PreparedRequest`
+    :param headers: names of the headers to take into account
+    :type headers: iterable of :class:`str`
+    :rtype: :class:`str`
+    """
+
+    scheme, netloc, path, query, _ = urlsplit(normalize_url(request.url))
+    query = parse_qsl(query, keep_blank_values=True)
+
+    params = getattr(request, 'params', None)
+    if params:
+        if isinstance(params, (str, bytes)):
+            if isinstance(params, bytes):
+                params = params.decode('utf-8')
+            query += parse_qsl(params, keep_blank_values=True)
+        else:
+            items = params.items() if isinstance(params, dict) else params
+            for key, values in items:
+                if values is None:
+                    continue
+                if isinstance(values, (str, bytes)) or not hasattr(values, '__iter__'):
+                    values = [values]
+                query.extend((str(key), str(value)) for value in values)
+
+    url = urlunsplit((scheme.lower(), netloc, path or '/', urlencode(sorted(query)), ''))
+
+    request_headers = requests.structures.CaseInsensitiveDict(request.headers or {})
+    if isinstance(request, requests.Request) and 'Content-Type' not in request_headers:
+        # set by requests when the request is prepared
+        if request.json is not None:
+            request_headers['Content-Type'] = 'application/json'
+        elif request.data and not request.files and isinstance(request.data, (dict, list, tuple)):
+            request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    header_values = sorted(
+        (name.lower(), request_headers[name])
+        for name in headers if name in request_headers
+    )
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update((request.method or 'GET').upper().encode('ascii'))
+    fingerprint.update(b'\0')
+    fingerprint.update(url.encode('utf-8'))
+    fingerprint.update(b'\0')
+    fingerprint.update(hashlib.sha256(_request_body(request)).digest())
+    for name, value in header_values:
+        fingerprint.update(b'\0')
+        fingerprint.update(('%s: %s' % (name, value)).encode('utf-8'))
+    return fingerprint.hexdigest()
@@ -0,0 +1,121 @@
+# Copyright(C) 2023 woob project
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import local
+
+from lxml import etree
+
+from woob.tools.lrudict import LRUCache
+
+__all__ = ['XPATH_CACHE_SIZE', 'compile_xpath', 'get_xpath_cache', 'xpath']
+
+
+XPATH_CACHE_SIZE = 1024
+"""Maximum number of compiled XPath expressions kept by each thread."""
+
+# An lxml XPath evaluator can only run one evaluation at a time, so each
+# thread has its own cache, to evaluate expressions in parallel.
+_thread_state = local()
+
+
+def get_xpath_cache():
+    """
+    Get the compiled XPath expressions of the current thread, by expression
+    and namespaces.
+
+    Its statistics can be got with ``get_xpath_cache().info()``.
+
+    :rtype: :class:`woob.tools.lrudict.LRUCache`
+    """
+    try:
+        return _thread_state.cache
+    except AttributeError:
+        cache = _thread_state.cache = LRUCache(max_entries=XPATH_CACHE_SIZE)
+        # ids of the evaluators which are running
+        _thread_state.running = set()
+        return cache
+
+
+def compile_xpath(expression, namespaces=None, smart_strings=True):
+    """
+    Get a compiled XPath expression, from the cache of the current thread
+    if it has already been compiled.
+
+    Extension functions registered globally, like the ones of
+    :class:`woob.browser.pages.HTMLPage`, can be used.
+
+    :param expression: XPath expression
+    :type expression: :class:`str`
+    :param namespaces: prefixes of namespaces used in the expression
+    :type namespaces: :class:`dict`
+    :param smart_strings: whether to return strings knowing their parent element
+    :type smart_strings: :class:`bool`
+    :rtype: :class:`lxml.etree.XPath`
+    :raises: :class:`lxml.etree.XPathSyntaxError` if the expression is invalid
+    """
+    cache = get_xpath_cache()
+    key = (expression, tuple(sorted(namespaces.items())) if namespaces else None, smart_strings)
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+
+    compiled = etree.XPath(expression, namespaces=namespaces, smart_strings=smart_strings)
+    cache[key] = compiled
+    return compiled
+
+
+def xpath(el, expression, namespaces=None, smart_strings=True, **variables):
+    """
+    Evaluate an XPath expression on an element, compiling it only once.
+
+    It behaves as ``el.xpath(expression)``. Objects which are not lxml
+    elements or trees are asked to evaluate the expression themselves.
+
+    :param el: element or document
+    :type el: :class:`lxml.etree._Element`
+    :param expression: XPath expression
+    :type expression: :class:`str`
+    :param namespaces: prefixes of namespaces used in the expression
+    :type namespaces: :class:`dict`
+    :param variables: values of variables used in the expression
+    """
+    if isinstance(el, (etree._Element, etree._ElementTree)):
+        try:
+            compiled = compile_xpath(expression, namespaces, smart_strings)
+        except etree.XPathSyntaxError:
+            # let lxml raise the usual XPathEvalError below
+            pass
+        else:
+            running = _thread_state.running
+            if id(compiled) in running:
+                # evaluated again by an extension function, while the cached
+                # evaluator is locked by the outer evaluation
+                compiled = etree.XPath(expression, namespaces=namespaces, smart_strings=smart_strings)
+                return compiled(el, **variables)
+
+            running.add(id(compiled))
+            try:
+                return compiled(el, **variables)
+            finally:
+                running.discard(id(compiled))
+
+    if namespaces is not None:
+        variables['namespaces'] = namespaces
+    if not smart_strings:
+        variables['smart_strings'] = smart_strings
+    return el.xpath(expression, **variables)
@@ -17,11 +17,12 @@
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, Type, Any, Tuple, TypeVar, overload
+from typing import Dict, Iterable, Iterator, Type, Any, Tuple, TypeVar, overload, Callable, List
 
 from collections import OrderedDict, deque
 import warnings
 import re
+import datetime
 from decimal import Decimal
 from copy import deepcopy, copy
 
@@ -32,8 +33,8 @@
     'UserError', 'FieldNotFound', 'NotAvailable', 'FetchError', 'NotLoaded',
     'Capability', 'Field', 'IntField', 'DecimalField', 'FloatField',
     'StringField', 'BytesField', 'BoolField', 'Enum', 'EnumField', 'empty',
-    'BaseObject', 'find_object', 'find_object_any_match', 'strict_find_object',
-    'capability_to_string',
+    'BaseObject', 'ObjectBatch', 'iter_batches', 'find_object',
+    'find_object_any_match', 'strict_find_object', 'capability_to_string',
 ]
 
 
@@ -407,6 +408,55 @@ def convert(self, value):
         """
         return value
 
+    def get_types(self) -> Tuple[type, ...]:
+        """
+        Get the accepted types, with names of types resolved to classes.
+
+        They are resolved again until all of them are found.
+        """
+        actual_types = self.__dict__.get('_actual_types')
+        if actual_types is None:
+            actual_types = _resolve_types(self.types)
+            if all(not isinstance(v, str) or _resolve_types((v,)) for v in self.types):
+                self._actual_types = actual_types
+        return actual_types
+
+    def check_value(self, name: str, value: Any, stacklevel: int = 2) -> Any:
+        """
+        Convert a value of the field if needed, and check its type.
+
+        :param name: name of the field
+        :param value: value to check
+        :param stacklevel: stack level of the conversion warning, from the
+                           caller of this method
+        :raises: :class:`ValueError` if the value is not of an accepted type
+        """
+        if empty(value):
+            return value
+
+        try:
+            # Try to convert value to the wanted one.
+            nvalue = self.convert(value)
+        except (TypeError, ValueError, ArithmeticError):
+            # error during conversion, it will probably not
+            # match the wanted following types, so we'll
+            # raise ValueError.
+            pass
+        else:
+            # If the value was converted
+            if nvalue is not value:
+                warnings.warn('Value %s was converted from %s to %s' %
+                              (name, type(value), type(nvalue)),
+                              ConversionWarning, stacklevel=stacklevel + 1)
+            value = nvalue
+
+        actual_types = self.get_types()
+        if not isinstance(value, actual_types) and not empty(value):
+            raise ValueError(
+                'Value for "%s" needs to be of type %r, not %r' % (
+                    name, actual_types, type(value)))
+        return value
+
 
 class IntField(Field):
     """
@@ -497,6 +547,22 @@ def convert(self, value):
         return value
 
 
+# default values which instances can share
+_IMMUTABLE_TYPES = (
+    type(None), bool, int, float, complex, str, bytes, Decimal, EmptyType,
+    datetime.date, datetime.time, datetime.timedelta,
+)
+
+
+class _DeletedType:
+    def __repr__(self):
+        return 'Deleted'
+
+
+# value of a field deleted from an object
+_Deleted = _DeletedType()
+
+
 class _BaseObjectMeta(type):
     def __new__(cls, name, bases, attrs):
         fields = [(field_name, attrs.pop(field_name)) for field_name, obj in list(attrs.items()) if isinstance(obj, Field)]
@@ -509,6 +575,14 @@ def __new__(cls, name, bases, attrs):
             new_class._fields = deepcopy(new_class._fields)
         new_class._fields.update(fields)
 
+        # Fields are described once by the class, objects only store their
+        # values, in the same order.
+        new_class._fields_index = {name: index for index, name in enumerate(new_class._fields)}
+        new_class._fields_defaults = tuple(field.value for field in new_class._fields.values())
+        new_class._fields_defaults_copied = not all(
+            isinstance(value, _IMMUTABLE_TYPES) for value in new_class._fields_defaults
+        )
+
         if new_class.__doc__ is None:
             new_class.__doc__ = ''
         for name, field in new_class._fields.items():
@@ -546,6 +620,9 @@ class Transfer(BaseObject):
     id: str | None = None
     backend: str | None = None
     _fields: Dict[str, Field] = {}
+    _fields_index: Dict[str, int] = {}
+    _fields_defaults: Tuple[Any, ...] = ()
+    _fields_defaults_copied: bool = False
 
     # XXX remove it?
     url = StringField('url')
@@ -556,11 +633,29 @@ def __init__(
         url: str | NotLoadedType | NotAvailableType = NotLoaded,
         backend=None
     ):
+        self._init_values()
         self.id = id or ''
         self.backend = backend
-        self._fields = deepcopy(self._fields)
         self.__setattr__('url', url)
 
+    def _init_values(self):
+        defaults = self._fields_defaults
+        if self._fields_defaults_copied:
+            defaults = deepcopy(defaults)
+        object.__setattr__(self, '_values', list(defaults))
+
+    def _get_values(self) -> list:
+        """
+        Get the values of fields, by position, setting them to defaults if
+        the object has not been initialized, like when unpickling it or when
+        a subclass doesn't call :meth:`BaseObject.__init__`.
+        """
+        try:
+            return self.__dict__['_values']
+        except KeyError:
+            self._init_values()
+            return self.__dict__['_values']
+
     @property
     def fullid(self) -> str:
         """
@@ -585,9 +680,7 @@ def __iscomplete__(self) -> bool:
 
     def copy(self) -> BaseObject:
         obj = copy(self)
-        obj._fields = copy(self._fields)
-        for k in obj._fields:
-            obj._fields[k] = copy(obj._fields[k])
+        object.__setattr__(obj, '_values', list(self._get_values()))
         return obj
 
     def __deepcopy__(self, memo) -> BaseObject:
@@ -615,8 +708,9 @@ def iter_fields(self) -> Iterable[Tuple[str, Any]]:
 
         if hasattr(self, 'id') and self.id is not None:
             yield 'id', self.id
-        for name, field in self._fields.items():
-            yield name, field.value
+        for name, value in zip(self._fields, self._get_values()):
+            if value is not _Deleted:
+                yield name, value
 
     def __eq__(self, obj) -> bool:
         if isinstance(obj, BaseObject):
@@ -624,52 +718,56 @@ def __eq__(self, obj) -> bool:
         else:
             return False
 
+    def _get_field_index(self, name: str) -> int | None:
+        """
+        Get the position of the value of a field, if it has not been deleted.
+        """
+        index = self._fields_index.get(name)
+        if index is None:
+            return None
+
+        if self._get_values()[index] is _Deleted:
+            return None
+        return index
+
     def __getattr__(self, name: str) -> Any:
-        if self._fields is not None and name in self._fields:
-            return self._fields[name].value
+        index = self._get_field_index(name)
+        if index is not None:
+            return self._get_values()[index]
         else:
             raise AttributeError("'%s' object has no attribute '%s'" % (
                 self.__class__.__name__, name))
 
+    @classmethod
+    def _is_class_attribute(cls, name: str) -> bool:
+        """
+        Get whether an attribute is defined by the class or one of its
+        bases, so that it can be set on objects without being a field.
+        """
+        # like dir(cls), but without building the list of all names, and
+        # seeing attributes added to the classes afterwards
+        return any(name in klass.__dict__ for klass in cls.__mro__)
+
     def __setattr__(self, name: str, value: Any):
-        try:
-            attr = (self._fields or {})[name]
-        except KeyError:
-            if name not in dir(self) and not name.startswith('_'):
+        index = self._get_field_index(name)
+        if index is None:
+            if (
+                not name.startswith('_')
+                and name not in self.__dict__
+                and not self._is_class_attribute(name)
+            ):
                 warnings.warn('Creating a non-field attribute %s. Please prefix it with _' % name,
                               AttributeCreationWarning, stacklevel=2)
             object.__setattr__(self, name, value)
         else:
-            if not empty(value):
-                try:
-                    # Try to convert value to the wanted one.
-                    nvalue = attr.convert(value)
-                except (TypeError, ValueError, ArithmeticError):
-                    # error during conversion, it will probably not
-                    # match the wanted following types, so we'll
-                    # raise ValueError.
-                    pass
-                else:
-                    # If the value was converted
-                    if nvalue is not value:
-                        warnings.warn('Value %s was converted from %s to %s' %
-                                      (name, type(value), type(nvalue)),
-                                      ConversionWarning, stacklevel=2)
-                    value = nvalue
-
-            actual_types = _resolve_types(attr.types)
-
-            if not isinstance(value, actual_types) and not empty(value):
-                raise ValueError(
-                    'Value for "%s" needs to be of type %r, not %r' % (
-                        name, actual_types, type(value)))
-            attr.value = value
+            self._get_values()[index] = self._fields[name].check_value(name, value, stacklevel=2)
 
     def __delattr__(self, name: str):
-        try:
-            self._fields.pop(name)
-        except KeyError:
+        index = self._get_field_index(name)
+        if index is None:
             object.__delattr__(self, name)
+        else:
+            self._get_values()[index] = _Deleted
 
     def to_dict(self) -> Dict[str, Any]:
         def iter_decorate(d):
@@ -683,7 +781,7 @@ def iter_decorate(d):
 
     def __getstate__(self) -> Dict[str, Any]:
         d = self.to_dict()
-        d.update((k, v) for k, v in self.__dict__.items() if k != '_fields')
+        d.update((k, v) for k, v in self.__dict__.items() if k != '_values')
         return d
 
     @classmethod
@@ -695,13 +793,280 @@ def from_dict(cls, values: Dict[str, Any], backend: str | None = None):
 
         return self
 
+    @classmethod
+    def from_values(cls, values: Dict[str, Any], validate: bool = True):
+        """
+        Build an object from values of its fields and attributes.
+
+        It gives the same object as setting attributes one by one, but
+        fields are looked for once, and values of fields can be trusted.
+
+        :param values: values, by name of field or attribute (like ``id``)
+        :type values: :class:`dict`
+        :param validate: whether values of fields are converted and checked
+                         as when setting them, or trusted, for example
+                         because they come from another object
+        :type validate: :class:`bool`
+        :raises: :class:`ValueError` if a value is not of an accepted type
+        """
+        self = cls()
+        fields = cls._fields
+        fields_index = cls._fields_index
+        field_values = self._get_values()
+
+        for name, value in values.items():
+            index = fields_index.get(name)
+            if index is None:
+                setattr(self, name, value)
+                continue
+
+            if validate:
+                value = fields[name].check_value(name, value, stacklevel=2)
+            field_values[index] = value
+
+        return self
+
     def __setstate__(self, state: Dict[str, Any]):
-        self._fields = deepcopy(self._fields)  # because yaml does not call __init__
+        self._init_values()  # because yaml does not call __init__
         for k in state:
             setattr(self, k, state[k])
 
     def __dir__(self):
-        return list(super(BaseObject, self).__dir__()) + list(self._fields.keys())
+        return list(super(BaseObject, self).__dir__()) + [
+            name for name in self._fields if self._get_field_index(name) is not None
+        ]
+
+
+class ObjectBatch:
+    """
+    Objects of one class, stored by columns of values instead of objects.
+
+    It takes less memory than a list of objects, and filtering, sorting or
+    grouping objects on values of their fields don't build any object:
+
+    >>> batch = ObjectBatch(Transaction, backend.iter_history(account))  # doctest: +SKIP
+    >>> debits = batch.filter('amount', lambda amount: amount < 0)  # doctest: +SKIP
+    >>> by_date = debits.sorted('date', reverse=True).group_by('date')  # doctest: +SKIP
+
+    Objects are built again when iterating on the batch, or getting one by
+    index. As with :meth:`BaseObject.copy`, they are shallow copies of the
+    objects which were added to it: mutable values of fields and attributes,
+    like lists or dicts, are shared with these objects and the batch.
+
+    :param klass: class of the objects
+    :type klass: :class:`BaseObject`
+    :param objects: objects to add to the batch
+    """
+
+    def __init__(self, klass: Type[BaseObject], objects: Iterable[BaseObject] = ()):
+        self.klass = klass
+        # columns of fields, ordered as values of objects
+        self.fields = OrderedDict((name, []) for name in klass._fields)
+        self.ids = []
+        self.backends = []
+        # other attributes of each object, or None
+        self.attributes = []
+
+        self.extend(objects)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return '<%s of %d %s>' % (type(self).__name__, len(self), self.klass.__name__)
+
+    def append(self, obj: BaseObject):
+        """
+        Add an object at the end of the batch.
+
+        :raises: :class:`TypeError` if the object is not of the batch class
+        """
+        if type(obj) is not self.klass:
+            raise TypeError('%r is not a %s object' % (obj, self.klass.__name__))
+
+        values = obj.__dict__.get('_values')
+        if values is None:
+            values = obj._fields_defaults
+
+        for column, value in zip(self.fields.values(), values):
+            column.append(value)
+
+        attributes = {
+            name: value for name, value in obj.__dict__.items()
+            if name not in ('_values', 'id', 'backend')
+        }
+        self.ids.append(obj.id)
+        self.backends.append(obj.backend)
+        self.attributes.append(attributes or None)
+
+    def extend(self, objects: Iterable[BaseObject]):
+        """
+        Add objects, or the objects of another batch, at the end of the batch.
+        """
+        if isinstance(objects, ObjectBatch):
+            if objects.klass is not self.klass:
+                raise TypeError('%r is not a batch of %s objects' % (objects, self.klass.__name__))
+
+            for name, column in self.fields.items():
+                column.extend(objects.fields[name])
+            self.ids.extend(objects.ids)
+            self.backends.extend(objects.backends)
+            self.attributes.extend(objects.attributes)
+            return
+
+        for obj in objects:
+            self.append(obj)
+
+    @classmethod
+    def from_dicts(cls, klass: Type[BaseObject], dicts: Iterable[Dict[str, Any]]) -> ObjectBatch:
+        """
+        Build a batch from values of objects, as given by :meth:`to_dicts`.
+
+        Values are converted and checked as by
+        :meth:`BaseObject.from_values`.
+        """
+        return cls(klass, (klass.from_values(values) for values in dicts))
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Get the values of a field of all the objects.
+
+        :param name: name of the field, or ``id`` or ``backend``
+        :rtype: :class:`list`
+        """
+        if name == 'id':
+            return self.ids
+        if name == 'backend':
+            return self.backends
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise FieldNotFound(self.klass, name)
+
+    def _build(self, index: int) -> BaseObject:
+        obj = self.klass.__new__(self.klass)
+        attributes = self.attributes[index]
+        if attributes:
+            obj.__dict__.update(attributes)
+        obj.__dict__['id'] = self.ids[index]
+        obj.__dict__['backend'] = self.backends[index]
+        obj.__dict__['_values'] = [column[index] for column in self.fields.values()]
+        return obj
+
+    def __getitem__(self, index: int | slice) -> BaseObject | ObjectBatch:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return self._build(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[BaseObject]:
+        for index in range(len(self)):
+            yield self._build(index)
+
+    def to_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate on values of the objects, as given by
+        :meth:`BaseObject.to_dict`, without building them.
+        """
+        if self.klass.to_dict is not BaseObject.to_dict or self.klass.iter_fields is not BaseObject.iter_fields:
+            # values are not the ones of fields
+            for obj in self:
+                yield obj.to_dict()
+            return
+
+        names = list(self.fields)
+        for index, values in enumerate(zip(*self.fields.values())):
+            d = OrderedDict()
+            if self.ids[index] is not None:
+                if self.backends[index] is not None:
+                    d['id'] = '%s@%s' % (self.ids[index], self.backends[index])
+                else:
+                    d['id'] = self.ids[index]
+            d.update((name, value) for name, value in zip(names, values) if value is not _Deleted)
+            yield d
+
+    def take(self, indexes: Iterable[int]) -> ObjectBatch:
+        """
+        Get a batch of the objects at the given positions, in this order.
+        """
+        indexes = list(indexes)
+        batch = ObjectBatch(self.klass)
+        for name, column in self.fields.items():
+            batch.fields[name] = [column[index] for index in indexes]
+        batch.ids = [self.ids[index] for index in indexes]
+        batch.backends = [self.backends[index] for index in indexes]
+        batch.attributes = [self.attributes[index] for index in indexes]
+        return batch
+
+    def filter(self, name: str, predicate: Callable[[Any], Any]) -> ObjectBatch:
+        """
+        Get a batch of the objects for which a predicate on the value of a
+        field is true.
+
+        :param name: name of the field
+        :param predicate: function called with the value of the field
+        """
+        return self.take(index for index, value in enumerate(self.column(name)) if predicate(value))
+
+    def sorted(
+        self, *names: str, key: Callable[..., Any] | None = None, reverse: bool = False
+    ) -> ObjectBatch:
+        """
+        Get a batch of the objects sorted on values of fields.
+
+        The sort is stable, like :func:`sorted`.
+
+        :param names: names of fields to sort on
+        :param key: function called with the values of these fields, to get
+                    the key to sort on, instead of the values themselves
+        :param reverse: sort in descending order
+        """
+        columns = [self.column(name) for name in names]
+        if key is None:
+            if len(columns) == 1:
+                keys = columns[0]
+            else:
+                keys = list(zip(*columns))
+        else:
+            keys = [key(*values) for values in zip(*columns)]
+
+        return self.take(sorted(range(len(self)), key=keys.__getitem__, reverse=reverse))
+
+    def group_by(self, name: str) -> Dict[Any, ObjectBatch]:
+        """
+        Group objects by values of a field.
+
+        :param name: name of the field
+        :return: batches by value, in order of first appearance
+        """
+        groups = OrderedDict()
+        for index, value in enumerate(self.column(name)):
+            groups.setdefault(value, []).append(index)
+        return OrderedDict((value, self.take(indexes)) for value, indexes in groups.items())
+
+
+def iter_batches(objects: Iterable[BaseObject], size: int = 1000) -> Iterator[ObjectBatch]:
+    """
+    Put objects in batches, as they are got.
+
+    It can be used on results of
+    :class:`woob.core.bcall.BackendsCall`, or of a method of a module.
+    A new batch is started when the class of objects changes.
+
+    :param objects: objects to put in batches
+    :param size: maximal number of objects of each batch
+    :type size: :class:`int`
+    """
+    batch = None
+    for obj in objects:
+        if batch is not None and (type(obj) is not batch.klass or len(batch) >= size):
+            yield batch
+            batch = None
+        if batch is None:
+            batch = ObjectBatch(type(obj))
+        batch.append(obj)
+
+    if batch is not None:
+        yield batch
 
 
 def _resolve_types(types):
@@ -16,16 +16,20 @@
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
 
+import asyncio
+from concurrent.futures import CancelledError
 from copy import copy
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import queue
+import time
 
 from woob.capabilities.base import BaseObject
+from woob.core.metrics import CallStats
 from woob.tools.misc import get_backtrace
 from woob.tools.log import getLogger
 
 
-__all__ = ['BackendsCall', 'CallErrors']
+__all__ = ['AsyncBackendsCall', 'BackendsCall', 'CallErrors']
 
 
 class CallErrors(Exception):
@@ -41,56 +45,123 @@ def __iter__(self):
         return self.errors.__iter__()
 
 
-class BackendsCall:
-    def __init__(self, backends, function, *args, **kwargs):
+class BaseBackendsCall:
+    """
+    Base class to run a function on several backends, in threads.
+
+    Subclasses define how results are given to the reader, with
+    :func:`put_response` and :func:`backend_finished`.
+    """
+
+    def __init__(self):
+        self.logger = getLogger(__name__)
+
+        self.errors = []
+        self.tasks = queue.Queue()
+        self.stop_event = Event()
+        self.threads = []
+        self.pool = None
+        self.metrics = None
+        self.call_stats = {}
+
+    def start(self, backends, function, args, kwargs, pool=None, metrics=None):
         """
+        Start calls on backends.
+
         :param backends: List of backends to call
         :type backends: list[:class:`Module`]
         :param function: backends' method name, or callable object.
         :type function: :class:`str` or :class:`callable`
+        :param pool: pool of threads used to run calls; if None, a thread
+                     is started for each backend
+        :type pool: :class:`woob.core.pool.WorkerPool`
+        :param metrics: sink receiving statistics of each backend call
+        :type metrics: :class:`woob.core.metrics.IMetricsSink`
         """
-        self.logger = getLogger(__name__)
+        self.pool = pool
+        self.metrics = metrics
 
-        self.responses = queue.Queue()
-        self.errors = []
-        self.tasks = queue.Queue()
-        self.stop_event = Event()
-        self.threads = []
+        function_name = function if isinstance(function, str) else getattr(function, '__name__', repr(function))
+        for backend in backends:
+            self.call_stats[backend.name] = CallStats(backend.name, getattr(backend, 'NAME', None), function_name)
 
         for backend in backends:
-            t = Thread(target=self.backend_process, args=(function, args, kwargs))
-            t.start()
-            self.threads.append(t)
             self.tasks.put(backend)
+            if pool is None:
+                t = Thread(target=self.backend_process, args=(backend, function, args, kwargs))
+                t.start()
+                self.threads.append(t)
+            else:
+                pool.submit(backend, self.backend_process, backend, function, args, kwargs)
+
+    def put_response(self, backend, response):
+        """Give a result of a backend to the reader."""
+        raise NotImplementedError()
+
+    def backend_finished(self, backend):
+        """Tell the reader that a backend task is over."""
+        raise NotImplementedError()
+
+    def is_stopped(self, backend):
+        """Return True if the results of this backend are not wanted anymore."""
+        return self.stop_event.is_set()
+
+    def stats(self):
+        """
+        Get statistics of calls on each backend.
+
+        Statistics of a running call are updated as it goes.
+
+        :rtype: dict[:class:`str`, :class:`woob.core.metrics.CallStats`]
+        """
+        return dict(self.call_stats)
+
+    def add_error(self, backend, error, backtrace):
+        """Store an error raised by a backend."""
+        self.errors.append((backend, error, backtrace))
+        self.call_stats[backend.name].errors += 1
 
     def store_result(self, backend, result):
         """Store the result when a backend task finished."""
         if result is None:
             return
 
+        stats = self.call_stats[backend.name]
+        stats.items += 1
+        if stats.first_result is None:
+            stats.first_result = time.monotonic()
+
         if isinstance(result, BaseObject):
             result.backend = backend.name
-        self.responses.put(result)
+        self.put_response(backend, result)
 
-    def backend_process(self, function, args, kwargs):
+    def backend_process(self, backend, function, args, kwargs):
         """
         Internal method to run a method of a backend.
 
         As this method may be blocking, it should be run on its own thread.
         """
-        backend = self.tasks.get()
-        with backend:
-            try:
+        stats = self.call_stats[backend.name]
+        stats.started = time.monotonic()
+        requests_count = self._get_requests_count(backend)
+        try:
+            if self.is_stopped(backend):
+                # Call has been stopped before this task was run.
+                return
+
+            with backend:
                 # Call method on backend
                 try:
                     self.logger.debug('%s: Calling function %s', backend, function)
-                    if callable(function):
+                    if self.pool is not None:
+                        result = self.pool.call(backend, function, args, kwargs)
+                    elif callable(function):
                         result = function(backend, *args, **kwargs)
                     else:
                         result = getattr(backend, function)(*args, **kwargs)
                 except Exception as error:
                     self.logger.debug('%s: Called function %s raised an error: %r', backend, function, error)
-                    self.errors.append((backend, error, get_backtrace(error)))
+                    self.add_error(backend, error, get_backtrace(error))
                 else:
                     self.logger.debug('%s: Called function %s returned: %r', backend, function, result)
 
@@ -99,24 +170,102 @@ def backend_process(self, function, args, kwargs):
                         try:
                             for subresult in result:
                                 self.store_result(backend, subresult)
-                                if self.stop_event.is_set():
+                                if self.is_stopped(backend):
                                     break
                         except Exception as error:
-                            self.errors.append((backend, error, get_backtrace(error)))
+                            self.add_error(backend, error, get_backtrace(error))
+                        finally:
+                            # Release the worker process of the results
+                            # of a pool, as soon as they are not read.
+                            if hasattr(result, 'close'):
+                                result.close()
                     else:
                         self.store_result(backend, result)
-            finally:
-                self.tasks.task_done()
+        finally:
+            stats.finished = time.monotonic()
+            stats.requests = max(self._get_requests_count(backend) - requests_count, 0)
+            if self.metrics is not None:
+                try:
+                    self.metrics.emit(stats)
+                except Exception as error:
+                    self.logger.warning('Unable to emit statistics of %s: %r', backend, error)
 
-    def _callback_thread_run(self, callback, errback, finishback):
-        while not self.stop_event.is_set() and (self.tasks.unfinished_tasks or not self.responses.empty()):
-            try:
-                response = self.responses.get(timeout=0.1)
-            except queue.Empty:
-                continue
+            self.backend_finished(backend)
+            self.tasks.task_done()
+
+    def _get_requests_count(self, backend):
+        # Do not use the browser property, to not create a browser.
+        return getattr(getattr(backend, '_browser', None), 'requests_count', 0)
+
+    def wait(self):
+        """Wait until all tasks are finished."""
+        self.tasks.join()
+
+        if self.errors:
+            raise CallErrors(self.errors)
+
+    def stop(self, wait=False):
+        """
+        Stop all tasks.
+
+        :param wait: If True, wait until all tasks stopped.
+        :type wait: bool
+        """
+
+        self.stop_event.set()
+
+        if wait:
+            self.wait()
+
+
+class BackendsCall(BaseBackendsCall):
+    # Put in responses by a backend task once it is over.
+    FINISHED = object()
+    # Put in responses to wake up readers when the call is stopped.
+    STOPPED = object()
+
+    def __init__(self, backends, function, *args, pool=None, metrics=None, **kwargs):
+        """
+        :param backends: List of backends to call
+        :type backends: list[:class:`Module`]
+        :param function: backends' method name, or callable object.
+        :type function: :class:`str` or :class:`callable`
+        :param pool: pool of threads used to run calls; if None, a thread
+                     is started for each backend
+        :type pool: :class:`woob.core.pool.WorkerPool`
+        :param metrics: sink receiving statistics of each backend call
+        :type metrics: :class:`woob.core.metrics.IMetricsSink`
+        """
+        super().__init__()
+
+        self.responses = queue.Queue()
+        # Number of backends whose end has not been read from responses yet.
+        self.remaining = len(backends)
+
+        self.start(backends, function, args, kwargs, pool, metrics)
+
+    def put_response(self, backend, response):
+        self.responses.put(response)
+
+    def backend_finished(self, backend):
+        self.responses.put(self.FINISHED)
+
+    def _iter_responses(self):
+        # Block until a result arrives, and stop as soon as the last
+        # backend has finished or the call has been stopped.
+        while self.remaining and not self.stop_event.is_set():
+            response = self.responses.get()
+            if response is self.FINISHED:
+                self.remaining -= 1
+            elif response is self.STOPPED:
+                break
             else:
-                if callback:
-                    callback(response)
+                yield response
+
+    def _callback_thread_run(self, callback, errback, finishback):
+        for response in self._iter_responses():
+            if callback:
+                callback(response)
 
         # Raise errors
         while errback and self.errors:
@@ -143,14 +292,6 @@ def finishback()
         thread.start()
         return thread
 
-    def wait(self):
-        """Wait until all tasks are finished."""
-        for thread in self.threads:
-            thread.join()
-
-        if self.errors:
-            raise CallErrors(self.errors)
-
     def stop(self, wait=False):
         """
         Stop all tasks.
@@ -160,20 +301,184 @@ def stop(self, wait=False):
         """
 
         self.stop_event.set()
+        self.responses.put(self.STOPPED)
 
         if wait:
             self.wait()
 
     def __iter__(self):
         try:
-            while not self.stop_event.is_set() and (self.tasks.unfinished_tasks or not self.responses.empty()):
-                try:
-                    yield self.responses.get(timeout=0.1)
-                except queue.Empty:
-                    continue
+            yield from self._iter_responses()
         except:
             self.stop()
             raise
 
         if self.errors:
             raise CallErrors(self.errors)
+
+
+class AsyncBackendsCall(BaseBackendsCall):
+    """
+    Call a function on backends, and read results with ``async for``.
+
+    Backends are still run in threads (of the pool if one is given), but
+    results are given to the event loop through a bounded
+    :class:`asyncio.Queue`: when the reader is slower than the backends,
+    the backends wait for it.
+
+    Calls are started when the iteration begins, from the running event
+    loop. Leaving the iteration, or cancelling the task which iterates,
+    stops the call.
+
+    :param backends: List of backends to call
+    :type backends: list[:class:`Module`]
+    :param function: backends' method name, or callable object.
+    :type function: :class:`str` or :class:`callable`
+    :param pool: pool of threads used to run calls; if None, a thread
+                 is started for each backend
+    :type pool: :class:`woob.core.pool.WorkerPool`
+    :param timeout: maximum time in seconds given to each backend, from the
+                    start of its task; results coming later are ignored
+                    and an :class:`asyncio.TimeoutError` is reported for it
+    :type timeout: :class:`float`
+    :param maxsize: maximum number of results waiting to be read
+    :type maxsize: :class:`int`
+    :param metrics: sink receiving statistics of each backend call
+    :type metrics: :class:`woob.core.metrics.IMetricsSink`
+    """
+
+    # Put in responses by a backend task once it is over.
+    FINISHED = object()
+    # Put in responses to wake up the reader when a backend timed out.
+    WAKEUP = object()
+
+    def __init__(self, backends, function, *args, pool=None, timeout=None, maxsize=100, metrics=None, **kwargs):
+        super().__init__()
+
+        self.call = (backends, function, args, kwargs, pool, metrics)
+        self.timeout = timeout
+        self.maxsize = maxsize
+
+        self.loop = None
+        self.responses = None
+        # Number of backends whose end has not been read from responses yet.
+        self.remaining = len(backends)
+        self.finished = set()
+        self.timed_out = set()
+        self.timers = {}
+        # Futures of results being put in responses by backend threads.
+        self.pending = set()
+        self.lock = Lock()
+
+    def _put(self, item):
+        # Block the backend thread until the reader has room for item.
+        with self.lock:
+            if self.stop_event.is_set():
+                return
+
+            try:
+                future = asyncio.run_coroutine_threadsafe(self.responses.put(item), self.loop)
+            except RuntimeError:
+                # Event loop is closed.
+                return
+            self.pending.add(future)
+
+        try:
+            future.result()
+        except CancelledError:
+            pass
+        finally:
+            with self.lock:
+                self.pending.discard(future)
+
+    def put_response(self, backend, response):
+        self._put((backend, response))
+
+    def backend_finished(self, backend):
+        self._put((backend, self.FINISHED))
+
+    def is_stopped(self, backend):
+        return self.stop_event.is_set() or backend in self.timed_out
+
+    def backend_process(self, backend, function, args, kwargs):
+        if self.timeout is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._start_timer, backend)
+            except RuntimeError:
+                # Event loop is closed.
+                pass
+
+        super().backend_process(backend, function, args, kwargs)
+
+    def _start_timer(self, backend):
+        if backend not in self.finished:
+            self.timers[backend] = self.loop.call_later(self.timeout, self._backend_timeout, backend)
+
+    def _backend_timeout(self, backend):
+        self.timers.pop(backend, None)
+        if backend in self.finished:
+            return
+
+        self.logger.debug('%s: Call timed out after %s seconds', backend, self.timeout)
+        self.timed_out.add(backend)
+        self.add_error(backend, asyncio.TimeoutError('Call timed out after %s seconds' % self.timeout), '')
+        self._finish(backend)
+        try:
+            self.responses.put_nowait((backend, self.WAKEUP))
+        except asyncio.QueueFull:
+            # The reader is not waiting.
+            pass
+
+    def _finish(self, backend):
+        self.finished.add(backend)
+        self.remaining -= 1
+        timer = self.timers.pop(backend, None)
+        if timer is not None:
+            timer.cancel()
+
+    def stop(self, wait=False):
+        """
+        Stop all tasks.
+
+        Backends threads waiting for the reader are released.
+
+        :param wait: If True, wait until all tasks stopped.
+        :type wait: bool
+        """
+        with self.lock:
+            self.stop_event.set()
+            pending = list(self.pending)
+
+        for future in pending:
+            future.cancel()
+
+        if wait:
+            self.wait()
+
+    async def __aiter__(self):
+        if self.loop is not None:
+            raise RuntimeError('Calls on backends can only be iterated once')
+
+        self.loop = asyncio.get_running_loop()
+        self.responses = asyncio.Queue(self.maxsize)
+        backends, function, args, kwargs, pool, metrics = self.call
+        self.start(backends, function, args, kwargs, pool, metrics)
+
+        try:
+            while self.remaining:
+                backend, response = await self.responses.get()
+                if response is self.FINISHED:
+                    if backend not in self.finished:
+                        self._finish(backend)
+                elif response is not self.WAKEUP and backend not in self.timed_out:
+                    yield response
+        finally:
+            # Also release threads of timed out backends which are still
+            # waiting to put a result.
+            self.stop()
+            for timer in self.timers.values():
+                timer.cancel()
+            self.timers.clear()
+
+        if self.errors:
+            raise CallErrors(self.errors)
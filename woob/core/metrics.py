@@ -0,0 +1,185 @@
+# Copyright(C) 2023 Romain Bignon
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+from threading import Lock
+import time
+
+from woob.tools.config.util import replace
+from woob.tools.json import json
+
+
+__all__ = ['CallStats', 'IMetricsSink', 'JsonLinesMetricsSink', 'PrometheusMetricsSink']
+
+
+class CallStats:
+    """
+    Statistics of a call on a backend.
+
+    Times are measured with :func:`time.monotonic`.
+
+    :param backend: name of backend
+    :type backend: :class:`str`
+    :param module: name of module
+    :type module: :class:`str`
+    :param function: name of called function
+    :type function: :class:`str`
+    """
+
+    def __init__(self, backend, module, function):
+        self.backend = backend
+        self.module = module
+        self.function = function
+        self.started = None
+        self.first_result = None
+        self.finished = None
+        self.items = 0
+        self.errors = 0
+        self.requests = 0
+
+    def __repr__(self):
+        return '<CallStats backend=%r function=%r items=%d errors=%d requests=%d wall_time=%r>' % (
+            self.backend, self.function, self.items, self.errors, self.requests, self.wall_time
+        )
+
+    @property
+    def time_to_first_result(self):
+        """Seconds between the start of the call and its first result, or None."""
+        if self.started is None or self.first_result is None:
+            return None
+        return self.first_result - self.started
+
+    @property
+    def wall_time(self):
+        """Seconds spent by the call, up to now if it is not finished, or None."""
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+    def to_dict(self):
+        return {
+            'backend': self.backend,
+            'module': self.module,
+            'function': self.function,
+            'time_to_first_result': self.time_to_first_result,
+            'wall_time': self.wall_time,
+            'items': self.items,
+            'errors': self.errors,
+            'requests': self.requests,
+        }
+
+
+class IMetricsSink:
+    """Interface of a sink receiving statistics of calls on backends."""
+
+    def emit(self, stats):
+        """
+        Emit statistics of a finished call on a backend.
+
+        It may be called from several threads at the same time.
+
+        :param stats: statistics of the call
+        :type stats: :class:`CallStats`
+        """
+        raise NotImplementedError()
+
+
+class JsonLinesMetricsSink(IMetricsSink):
+    """
+    Append statistics of every call, as a JSON object per line.
+
+    :param path: path of the file
+    :type path: :class:`str`
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+
+    def emit(self, stats):
+        d = stats.to_dict()
+        d['timestamp'] = time.time()
+        line = json.dumps(d)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class PrometheusMetricsSink(IMetricsSink):
+    """
+    Keep counters of calls per backend, and write them in the Prometheus
+    text format, for example to be read by the textfile collector of the
+    node exporter.
+
+    The file is rewritten atomically after every call.
+
+    :param path: path of the file
+    :type path: :class:`str`
+    :param prefix: prefix of metrics names
+    :type prefix: :class:`str`
+    """
+
+    METRICS = (
+        ('calls_total', 'counter', 'Number of calls on the backend.'),
+        ('items_total', 'counter', 'Number of results returned by the backend.'),
+        ('errors_total', 'counter', 'Number of errors raised by the backend.'),
+        ('requests_total', 'counter', 'Number of HTTP requests sent by the backend.'),
+        ('wall_seconds_total', 'counter', 'Time spent in calls on the backend.'),
+        ('time_to_first_result_seconds', 'gauge', 'Time to get the first result of the last call.'),
+    )
+
+    def __init__(self, path, prefix='woob_backend_'):
+        self.path = path
+        self.prefix = prefix
+        self.lock = Lock()
+        self.values = {}
+
+    def emit(self, stats):
+        with self.lock:
+            key = (stats.backend, stats.module)
+            values = self.values.setdefault(key, dict.fromkeys((name for name, _, _ in self.METRICS), 0))
+            values['calls_total'] += 1
+            values['items_total'] += stats.items
+            values['errors_total'] += stats.errors
+            values['requests_total'] += stats.requests
+            values['wall_seconds_total'] += stats.wall_time or 0
+            if stats.time_to_first_result is not None:
+                values['time_to_first_result_seconds'] = stats.time_to_first_result
+
+            self.write()
+
+    def _escape(self, value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def write(self):
+        lines = []
+        for name, kind, doc in self.METRICS:
+            lines.append('# HELP %s%s %s' % (self.prefix, name, doc))
+            lines.append('# TYPE %s%s %s' % (self.prefix, name, kind))
+            for (backend, module), values in sorted(self.values.items()):
+                lines.append('%s%s{backend="%s",module="%s"} %s' % (
+                    self.prefix, name, self._escape(backend), self._escape(module or ''), values[name]
+                ))
+
+        # write in a temporary file to avoid partial reads
+        f = tempfile.NamedTemporaryFile(
+            mode='w', dir=os.path.dirname(os.path.abspath(self.path)), delete=False, encoding='utf-8'
+        )
+        with f:
+            f.write('\n'.join(lines) + '\n')
+        replace(f.name, self.path)
@@ -0,0 +1,516 @@
+# Copyright(C) 2010-2023 Romain Bignon
+#
+# This file is part of woob.
+#
+# woob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# woob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with woob. If not, see <http://www.gnu.org/licenses/>.
+
+from collections import deque
+from copy import deepcopy
+import multiprocessing
+import os
+import pickle
+from threading import Condition, Lock, Thread, local
+
+from woob.tools.log import getLogger
+from woob.tools.misc import get_backtrace
+from woob.tools.storage import StandardStorage
+from woob.tools.value import ValueBackendPassword
+from woob.tools.config.yamlconfig import YamlConfig
+
+
+__all__ = ['WorkerPool', 'ProcessPool']
+
+
+class WorkerPool:
+    """
+    Pool of threads used to run calls on backends.
+
+    Threads are started lazily, up to *max_workers*, and are reused between
+    calls. Tasks which can't be run immediately are queued, in submission
+    order.
+
+    A concurrency cap can be set per module, so that a lot of backends of
+    the same module are not run all together against the same website.
+
+    :param max_workers: maximum number of threads
+    :type max_workers: :class:`int`
+    :param module_limits: maximum number of concurrent tasks per module name
+    :type module_limits: :class:`dict`
+    :param default_module_limit: cap for modules which are not in *module_limits*
+                                 (None means no limit)
+    :type default_module_limit: :class:`int`
+    """
+
+    DEFAULT_MAX_WORKERS = 32
+
+    def __init__(self, max_workers=None, module_limits=None, default_module_limit=None):
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0')
+
+        self.logger = getLogger('%s.pool' % __name__)
+        self.max_workers = max_workers
+        self.module_limits = dict(module_limits or {})
+        self.default_module_limit = default_module_limit
+
+        self.cond = Condition()
+        self.pending = deque()
+        self.running = {}
+        self.workers = []
+        self.idle = 0
+        self.shutdown_requested = False
+        self.local = local()
+
+    def get_module_limit(self, module_name):
+        """
+        Get the maximum number of concurrent tasks for a module.
+
+        :param module_name: name of module
+        :type module_name: :class:`str`
+        :rtype: :class:`int` or None
+        """
+        return self.module_limits.get(module_name, self.default_module_limit)
+
+    def submit(self, backend, function, *args):
+        """
+        Queue a task to run on a backend.
+
+        The task will be run as soon as a thread is available and the
+        concurrency cap of the backend's module is not reached.
+
+        :param backend: backend concerned by the task
+        :type backend: :class:`woob.tools.backend.Module`
+        :param function: function to call
+        :type function: callable
+        :param args: arguments to give to function
+        """
+        if getattr(self.local, 'in_worker', False):
+            # Task submitted from a task of this pool: running it in the pool
+            # may deadlock if every worker is waiting on a nested call.
+            thread = Thread(target=function, args=args, daemon=True)
+            thread.start()
+            return
+
+        with self.cond:
+            if self.shutdown_requested:
+                raise RuntimeError('Unable to submit a task on a pool which is shut down')
+
+            self.pending.append((getattr(backend, 'NAME', None), function, args))
+            if len(self.pending) > self.idle and len(self.workers) < self.max_workers:
+                thread = Thread(target=self._worker_run, daemon=True)
+                self.workers.append(thread)
+                thread.start()
+            self.cond.notify_all()
+
+    def call(self, backend, function, args, kwargs):
+        """
+        Call a function on a backend.
+
+        It is run by a task of this pool, with the backend locked.
+
+        :param backend: backend to call
+        :type backend: :class:`woob.tools.backend.Module`
+        :param function: backend's method name, or callable object
+        :type function: :class:`str` or :class:`callable`
+        :returns: what the function returns
+        """
+        if callable(function):
+            return function(backend, *args, **kwargs)
+        return getattr(backend, function)(*args, **kwargs)
+
+    def _pop_task(self):
+        # Get the first queued task whose module has not reached its cap.
+        for i, task in enumerate(self.pending):
+            module_name = task[0]
+            limit = self.get_module_limit(module_name)
+            if limit is None or self.running.get(module_name, 0) < limit:
+                del self.pending[i]
+                self.running[module_name] = self.running.get(module_name, 0) + 1
+                return task
+
+        return None
+
+    def _worker_run(self):
+        self.local.in_worker = True
+        while True:
+            with self.cond:
+                task = self._pop_task()
+                while task is None:
+                    if self.shutdown_requested:
+                        return
+
+                    self.idle += 1
+                    self.cond.wait()
+                    self.idle -= 1
+                    task = self._pop_task()
+
+            module_name, function, args = task
+            try:
+                function(*args)
+            except Exception:
+                # Tasks are expected to handle their own errors.
+                self.logger.error('Unhandled error in pool task: %s', get_backtrace())
+            finally:
+                with self.cond:
+                    self.running[module_name] -= 1
+                    self.cond.notify_all()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the pool.
+
+        Queued tasks are still run, but no new task can be submitted.
+
+        :param wait: if True, wait until every thread is finished
+        :type wait: :class:`bool`
+        """
+        with self.cond:
+            self.shutdown_requested = True
+            self.cond.notify_all()
+            workers = list(self.workers)
+
+        if wait:
+            for thread in workers:
+                thread.join()
+
+
+class RemoteTraceback(Exception):
+    """
+    Traceback of an error raised in a worker process, set as the cause of
+    the error re-raised in the parent process.
+    """
+
+    def __init__(self, tb):
+        super().__init__(tb)
+        self.tb = tb
+
+    def __str__(self):
+        return '\n"""\n%s"""' % self.tb
+
+
+class _MemoryConfig(YamlConfig):
+    # Configuration which is never read from or written to disk.
+
+    def load(self, default={}):
+        pass
+
+    def save(self):
+        pass
+
+
+class _MemoryStorage(StandardStorage):
+    # Storage of a backend in a worker process, filled from the snapshot of
+    # its storage in the parent process.
+
+    def __init__(self):
+        self.config = _MemoryConfig(None)
+
+
+def _dump_error(error):
+    # Get a picklable version of an exception and its backtrace.
+    backtrace = get_backtrace(error)
+    try:
+        pickle.dumps(error)
+    except Exception:
+        error = Exception(repr(error))
+    return error, backtrace
+
+
+class _WorkerState:
+    # State of a worker process: backends created from the parent ones.
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.woobs = {}
+        self.backends = {}
+        self.storages = {}
+
+    def get_backend(self, spec):
+        # Local import, as woob.core.woob imports this module.
+        from woob.core.woob import WoobBase
+
+        name = spec['name']
+        if name not in self.backends:
+            woob = self.woobs.get(spec['modules_path'])
+            if woob is None:
+                woob = self.woobs[spec['modules_path']] = WoobBase(spec['modules_path'])
+
+            storage = _MemoryStorage()
+            storage.set('backends', name, spec['storage'])
+            self.backends[name] = woob.build_backend(spec['module'], spec['params'], storage, name)
+            self.storages[name] = deepcopy(spec['storage'])
+
+        return self.backends[name]
+
+    def get_storage(self, backend):
+        # Get the storage of the backend if it has changed since last call.
+        if backend._browser is not None:
+            backend.dump_state()
+
+        storage = backend.storage.get()
+        if storage == self.storages.get(backend.name):
+            return None
+
+        self.storages[backend.name] = deepcopy(storage)
+        return storage
+
+    def stopped(self):
+        # Check if the parent asked to stop the current call.
+        while self.conn.poll():
+            if self.conn.recv()[0] == 'stop':
+                return True
+        return False
+
+    def call(self, spec, function, args, kwargs):
+        backend = None
+        try:
+            backend = self.get_backend(spec)
+            result = getattr(backend, function)(*args, **kwargs)
+            if hasattr(result, '__iter__') and not isinstance(result, (bytes, str)):
+                self.conn.send(('iter',))
+                for subresult in result:
+                    self.conn.send(('item', subresult))
+                    if self.stopped():
+                        break
+                self.conn.send(('end', self.get_storage(backend)))
+            else:
+                self.conn.send(('value', result, self.get_storage(backend)))
+        except Exception as error:
+            storage = None
+            if backend is not None:
+                try:
+                    storage = self.get_storage(backend)
+                except Exception:
+                    pass
+            self.conn.send(('error',) + _dump_error(error) + (storage,))
+
+    def deinit(self):
+        for backend in self.backends.values():
+            with backend:
+                backend.deinit()
+
+
+def _worker_main(conn):
+    # Entry point of a worker process.
+    state = _WorkerState(conn)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+
+            if message[0] == 'call':
+                state.call(*message[1:])
+            elif message[0] == 'quit':
+                break
+    finally:
+        state.deinit()
+
+
+class _RemoteResults:
+    # Iterator on results sent by a worker process. The worker is locked
+    # until the end of results has been read or the iterator is closed, so
+    # callers have to close it explicitly when they stop reading it.
+
+    def __init__(self, worker, backend):
+        self.worker = worker
+        self.backend = backend
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.done:
+            raise StopIteration()
+
+        try:
+            message = self.worker.conn.recv()
+        except BaseException:
+            self._finish()
+            raise
+
+        if message[0] == 'item':
+            return message[1]
+
+        self._finish()
+        if message[0] == 'error':
+            self.worker.raise_error(self.backend, *message[1:])
+        self.worker.update_storage(self.backend, message[1])
+        raise StopIteration()
+
+    def _finish(self):
+        self.done = True
+        self.worker.lock.release()
+
+    def close(self):
+        """Stop the call in the worker process, and skip remaining results."""
+        if self.done:
+            return
+
+        try:
+            self.worker.conn.send(('stop',))
+            message = self.worker.conn.recv()
+            while message[0] == 'item':
+                message = self.worker.conn.recv()
+            self.worker.update_storage(self.backend, message[-1])
+        finally:
+            self._finish()
+
+
+class _ProcessWorker:
+    # Parent side of a worker process. Only one call is run at a time.
+
+    def __init__(self, context):
+        self.lock = Lock()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.loaded = set()
+
+    def get_spec(self, backend):
+        spec = {'name': backend.name}
+        if backend.name in self.loaded:
+            return spec
+
+        params = dict(backend._private_config)
+        for key, value in backend.config.items():
+            if value.transient or isinstance(value, ValueBackendPassword):
+                params[key] = value.get()
+            else:
+                params[key] = value.dump()
+
+        module = backend.woob.modules_loader.get_or_load_module(backend.NAME)
+        spec.update({
+            'module': backend.NAME,
+            'modules_path': os.path.dirname(module.path),
+            'params': params,
+            'storage': backend.storage.get() or {},
+        })
+        return spec
+
+    def update_storage(self, backend, storage):
+        if storage is None or not backend.storage.storage:
+            return
+
+        backend.storage.storage.set('backends', backend.name, storage)
+        backend.storage.save()
+
+    def raise_error(self, backend, error, backtrace, storage):
+        self.update_storage(backend, storage)
+        error.__cause__ = RemoteTraceback(backtrace)
+        raise error
+
+    def call(self, backend, function, args, kwargs):
+        self.lock.acquire()
+        try:
+            spec = self.get_spec(backend)
+            self.conn.send(('call', spec, function, args, kwargs))
+            self.loaded.add(backend.name)
+
+            message = self.conn.recv()
+        except BaseException:
+            self.lock.release()
+            raise
+
+        if message[0] == 'iter':
+            return _RemoteResults(self, backend)
+
+        self.lock.release()
+        if message[0] == 'error':
+            self.raise_error(backend, *message[1:])
+
+        result, storage = message[1:]
+        self.update_storage(backend, storage)
+        return result
+
+    def close(self):
+        try:
+            self.conn.send(('quit',))
+        except OSError:
+            pass
+        self.conn.close()
+
+
+class ProcessPool(WorkerPool):
+    """
+    Pool which runs backends in worker processes, for CPU heavy modules.
+
+    Calls are dispatched by threads of the parent process, as with
+    :class:`WorkerPool`, but each backend is pinned to one worker process,
+    where it is re-created from its configuration and storage at its first
+    call. The method is then run there and results are pickled and sent
+    back as they come. So a backend keeps its browser state between calls,
+    and its storage is synchronized back to the parent after each call.
+
+    A worker process runs one call at a time. Calls with a callable instead
+    of a method name are run in the parent process.
+
+    :param processes: number of worker processes (default is the number of CPUs)
+    :type processes: :class:`int`
+    :param max_workers: maximum number of threads
+    :type max_workers: :class:`int`
+    :param module_limits: maximum number of concurrent tasks per module name
+    :type module_limits: :class:`dict`
+    :param default_module_limit: cap for modules which are not in *module_limits*
+    :type default_module_limit: :class:`int`
+    """
+
+    def __init__(self, processes=None, max_workers=None, module_limits=None, default_module_limit=None):
+        super().__init__(max_workers, module_limits, default_module_limit)
+
+        self.processes = processes or os.cpu_count() or 1
+        # Forking a process with threads is unsafe.
+        self.context = multiprocessing.get_context('spawn')
+        self.process_workers = []
+        self.assignments = {}
+        self.assign_lock = Lock()
+
+    def get_process_worker(self, backend):
+        """
+        Get the worker process on which a backend is pinned.
+
+        :param backend: backend
+        :type backend: :class:`woob.tools.backend.Module`
+        """
+        with self.assign_lock:
+            if backend.name not in self.assignments:
+                index = len(self.assignments) % self.processes
+                if index == len(self.process_workers):
+                    self.process_workers.append(_ProcessWorker(self.context))
+                self.assignments[backend.name] = self.process_workers[index]
+
+            return self.assignments[backend.name]
+
+    def call(self, backend, function, args, kwargs):
+        if callable(function):
+            return super().call(backend, function, args, kwargs)
+
+        return self.get_process_worker(backend).call(backend, function, args, kwargs)
+
+    def shutdown(self, wait=True):
+        super().shutdown(wait)
+
+        with self.assign_lock:
+            process_workers = list(self.process_workers)
+            self.process_workers = []
+            self.assignments = {}
+
+        for worker in process_workers:
+            worker.close()
+            if wait:
+                worker.process.join()
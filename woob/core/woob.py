@@ -27,8 +27,10 @@
 from woob import __version__
 from woob.capabilities.base import Capability
 from woob.core.backendscfg import BackendsConfig
-from woob.core.bcall import BackendsCall
+from woob.core.bcall import AsyncBackendsCall, BackendsCall
+from woob.core.metrics import IMetricsSink
 from woob.core.modules import ModulesLoader, RepositoryModulesLoader
+from woob.core.pool import WorkerPool
 from woob.core.repositories import Repositories, IProgress, PrintProgress
 from woob.core.requests import RequestsManager
 from woob.core.scheduler import IScheduler, Scheduler
@@ -67,6 +69,11 @@ class WoobBase:
     :type storage: :class:`woob.tools.storage.IStorage`
     :param scheduler: what scheduler to use; default is :class:`woob.core.scheduler.Scheduler`
     :type scheduler: :class:`woob.core.scheduler.IScheduler`
+    :param pool: pool of threads used to call backends; default is a
+                 :class:`woob.core.pool.WorkerPool` owned by this object
+    :type pool: :class:`woob.core.pool.WorkerPool`
+    :param metrics: sink receiving statistics of every call on a backend
+    :type metrics: :class:`woob.core.metrics.IMetricsSink`
     """
 
     @classproperty
@@ -77,7 +84,9 @@ def VERSION(self):
     def __init__(self,
                  modules_path: str | None = None,
                  storage: IStorage | None = None,
-                 scheduler: IScheduler | None = None):
+                 scheduler: IScheduler | None = None,
+                 pool: WorkerPool | None = None,
+                 metrics: IMetricsSink | None = None):
         self.logger = getLogger('woob')
         self.backend_instances: Dict[str, Module] = {}
         self.requests = RequestsManager()
@@ -89,6 +98,10 @@ def __init__(self,
             scheduler = Scheduler()
         self.scheduler = scheduler
 
+        self.own_pool = pool is None
+        self._pool = pool
+        self.metrics = metrics
+
         self.storage = storage
 
     def __deinit__(self):
@@ -100,6 +113,21 @@ def deinit(self):
         properly unload all correctly.
         """
         self.unload_backends()
+        if self.own_pool and self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @property
+    def pool(self) -> WorkerPool:
+        """
+        Pool of threads used to call backends.
+
+        If no pool has been given, the pool owned by this object is created
+        on first use, and created again if it is used after :meth:`deinit`.
+        """
+        if self._pool is None:
+            self._pool = WorkerPool()
+        return self._pool
 
     def build_modules_loader(self) -> ModulesLoader:
         """
@@ -264,27 +292,9 @@ def caller(*args, **kwargs):
             return self.do(name, *args, **kwargs)
         return caller
 
-    def do(self, function: Callable | str, *args, **kwargs) -> BackendsCall:
-        r"""
-        Do calls on loaded backends with specified arguments, in separated
-        threads.
-
-        This function has two modes:
-
-        - If *function* is a string, it calls the method with this name on
-          each backends with the specified arguments;
-        - If *function* is a callable, it calls it in a separated thread with
-          the locked backend instance at first arguments, and \*args and
-          \*\*kwargs.
-
-        :param function: backend's method name, or a callable object
-        :type function: :class:`str`
-        :param backends: list of backends to iterate on
-        :type backends: list[:class:`str`]
-        :param caps: iterate on backends which implement this caps
-        :type caps: list[:class:`woob.capabilities.base.Capability`]
-        :rtype: A :class:`woob.core.bcall.BackendsCall` object (iterable)
-        """
+    def _pop_call_backends(self, kwargs: dict) -> List[Module]:
+        # Select backends to call from the 'backends' and 'caps' arguments
+        # of do() and ado(), and remove them from kwargs.
         backends = list(self.backend_instances.values())
         _backends = kwargs.pop('backends', None)
         if _backends is not None:
@@ -313,11 +323,75 @@ def do(self, function: Callable | str, *args, **kwargs) -> BackendsCall:
             caps = kwargs.pop('caps')
             backends = [backend for backend in backends if backend.has_caps(caps)]
 
+        return backends
+
+    def do(self, function: Callable | str, *args, **kwargs) -> BackendsCall:
+        r"""
+        Do calls on loaded backends with specified arguments, in threads
+        of :attr:`pool`.
+
+        This function has two modes:
+
+        - If *function* is a string, it calls the method with this name on
+          each backends with the specified arguments;
+        - If *function* is a callable, it calls it in a separated thread with
+          the locked backend instance at first arguments, and \*args and
+          \*\*kwargs.
+
+        :param function: backend's method name, or a callable object
+        :type function: :class:`str`
+        :param backends: list of backends to iterate on
+        :type backends: list[:class:`str`]
+        :param caps: iterate on backends which implement this caps
+        :type caps: list[:class:`woob.capabilities.base.Capability`]
+        :rtype: A :class:`woob.core.bcall.BackendsCall` object (iterable)
+        """
+        backends = self._pop_call_backends(kwargs)
+
         # The return value MUST BE the BackendsCall instance. Please never iterate
         # here on this object, because caller might want to use other methods, like
         # wait() on callback_thread().
         # Thanks a lot.
-        return BackendsCall(backends, function, *args, **kwargs)
+        return BackendsCall(backends, function, *args, pool=self.pool, metrics=self.metrics, **kwargs)
+
+    def ado(
+        self,
+        function: Callable | str,
+        *args,
+        timeout: float | None = None,
+        maxsize: int = 100,
+        **kwargs
+    ) -> AsyncBackendsCall:
+        r"""
+        Do calls on loaded backends, and read results from asyncio with an
+        ``async for`` loop::
+
+            async for account in woob.ado('iter_accounts', caps=CapBank):
+                ...
+
+        Backends are called in threads of :attr:`pool`, when the iteration
+        begins. Results are given to the event loop through a bounded queue,
+        so backends wait when the reader is slower than them. Leaving the
+        loop or cancelling the task stops the calls.
+
+        :param function: backend's method name, or a callable object
+        :type function: :class:`str`
+        :param timeout: maximum time in seconds given to each backend
+        :type timeout: :class:`float`
+        :param maxsize: maximum number of results waiting to be read
+        :type maxsize: :class:`int`
+        :param backends: list of backends to iterate on
+        :type backends: list[:class:`str`]
+        :param caps: iterate on backends which implement this caps
+        :type caps: list[:class:`woob.capabilities.base.Capability`]
+        :rtype: A :class:`woob.core.bcall.AsyncBackendsCall` object (async iterable)
+        """
+        backends = self._pop_call_backends(kwargs)
+
+        return AsyncBackendsCall(
+            backends, function, *args,
+            pool=self.pool, timeout=timeout, maxsize=maxsize, metrics=self.metrics, **kwargs
+        )
 
     def schedule(self, interval: int, function: Callable, *args) -> int | None:
         """
@@ -384,6 +458,10 @@ class Woob(WoobBase):
     :type backends_filename: str
     :param storage: provide a storage where backends can save data
     :type storage: :class:`woob.tools.storage.IStorage`
+    :param pool: pool of threads used to call backends
+    :type pool: :class:`woob.core.pool.WorkerPool`
+    :param metrics: sink receiving statistics of every call on a backend
+    :type metrics: :class:`woob.core.metrics.IMetricsSink`
     """
     BACKENDS_FILENAME = 'backends'
 
@@ -393,7 +471,9 @@ def __init__(
         datadir: str | None = None,
         backends_filename: str | None = None,
         scheduler: IScheduler | None = None,
-        storage: IStorage | None = None
+        storage: IStorage | None = None,
+        pool: WorkerPool | None = None,
+        metrics: IMetricsSink | None = None
     ):
         # Create WORKDIR
         xdg_config = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
@@ -434,7 +514,7 @@ def __init__(
             backends_filename = os.path.join(self.workdir, backends_filename)
         self.backends_config: BackendsConfig = BackendsConfig(backends_filename)
 
-        super().__init__(modules_path=None, scheduler=scheduler, storage=storage)
+        super().__init__(modules_path=None, scheduler=scheduler, storage=storage, pool=pool, metrics=metrics)
 
     def build_modules_loader(self) -> RepositoryModulesLoader:
         """
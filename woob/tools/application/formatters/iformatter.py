@@ -157,6 +157,23 @@ def output(self, formatted):
                 else:
                     self.print_lines += 1
 
+    def write(self, text):
+        """
+        Write text as is, to output objects as soon as they are formatted.
+
+        Unlike :meth:`output`, no line separator is added, and the output is
+        not paged, as the text may be a part of a line. The caller has to
+        make sure the output is terminated, usually in :meth:`flush`, which
+        is called after each command even if it fails.
+        """
+        if self.outfile != sys.stdout:
+            encoding = guess_encoding(sys.stdout)
+            with open(self.outfile, "a+", encoding=encoding, errors='replace') as outfile:
+                outfile.write(text)
+        else:
+            self.outfile.write(text)
+            self.outfile.flush()
+
     def start_format(self, **kwargs):
         pass
 
@@ -175,6 +192,11 @@ def format(self, obj, selected_fields=None, alias=None):
         :param alias: an alias to use instead of the object's ID
         :type alias: str
         """
+        if isinstance(obj, BaseObject) and type(self).format_obj is IFormatter.format_obj:
+            # the object is only formatted as a dict, so select fields on its
+            # values instead of copying it to delete the other ones.
+            obj = obj.to_dict()
+
         if isinstance(obj, BaseObject):
             if selected_fields:  # can be an empty list (nothing to do), or None (return all fields)
                 obj = obj.copy()
@@ -190,16 +212,17 @@ def format(self, obj, selected_fields=None, alias=None):
             formatted = self.format_obj(obj, alias)
         else:
             try:
-                obj = OrderedDict(obj)
+                items = obj.items()
+            except AttributeError:
+                items = obj
+            try:
+                if selected_fields:
+                    obj = OrderedDict((name, value) for name, value in items if name in selected_fields)
+                else:
+                    obj = OrderedDict(items)
             except ValueError:
                 raise TypeError('Please give a BaseObject or a dict')
 
-            if selected_fields:
-                obj = obj.copy()
-                for name, value in list(obj.items()):
-                    if name not in selected_fields:
-                        obj.pop(name)
-
             if self.MANDATORY_FIELDS:
                 missing_fields = set(self.MANDATORY_FIELDS) - set(obj)
                 if missing_fields:
@@ -26,20 +26,32 @@
 class JsonFormatter(IFormatter):
     """
     Formats the whole list as a single JSON list object.
+
+    Items are written as soon as they are formatted, so the list is never
+    kept in memory.
     """
 
     def __init__(self):
         super(JsonFormatter, self).__init__()
-        self.queue = []
+        self.started = False
 
     def flush(self):
-        self.output(json.dumps(self.queue, cls=WoobEncoder))
+        if self.started:
+            self.output(']')
+        else:
+            self.output('[]')
+        self.started = False
+
+    def write_item(self, item):
+        separator = ', ' if self.started else '['
+        self.started = True
+        self.write(separator + json.dumps(item, cls=WoobEncoder))
 
     def format_dict(self, item):
-        self.queue.append(item)
+        self.write_item(item)
 
     def format_collection(self, collection, only):
-        self.queue.append(collection.to_dict())
+        self.write_item(collection.to_dict())
 
 
 class JsonLineFormatter(IFormatter):
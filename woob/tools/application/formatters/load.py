@@ -24,7 +24,7 @@ class FormatterLoadError(Exception):
 
 
 class FormattersLoader:
-    BUILTINS = ['htmltable', 'multiline', 'simple', 'table', 'csv', 'json', 'json_line']
+    BUILTINS = ['htmltable', 'multiline', 'simple', 'table', 'stream_table', 'csv', 'json', 'json_line']
 
     def __init__(self):
         self.formatters = {}
@@ -57,6 +57,9 @@ def load_builtin_formatter(self, name):
         elif name == 'table':
             from .table import TableFormatter
             return TableFormatter
+        elif name == 'stream_table':
+            from .table import StreamTableFormatter
+            return StreamTableFormatter
         elif name == 'simple':
             from .simple import SimpleFormatter
             return SimpleFormatter
@@ -30,19 +30,32 @@
 from .iformatter import IFormatter
 
 
-__all__ = ['TableFormatter', 'HTMLTableFormatter']
+__all__ = ['TableFormatter', 'HTMLTableFormatter', 'StreamTableFormatter']
 
 
 class TableFormatter(IFormatter):
     HTML = False
 
+    # When set, rows are printed as they arrive once this number of rows has
+    # been received, with columns sized on these first rows, instead of
+    # keeping every row until the table is flushed.
+    STREAM_WINDOW = None
+
     def __init__(self):
         super(TableFormatter, self).__init__()
         self.queue = []
         self.keys = None
         self.header = None
+        self.stream_columns = None
+        self.stream_count = 0
 
     def flush(self):
+        if self.stream_columns is not None:
+            self.output(self.get_stream_border('bottom'))
+            self.stream_columns = None
+            self.stream_count = 0
+            return
+
         s = self.get_formatted_table()
         if s is not None:
             self.output(s)
@@ -105,7 +118,98 @@ def format_cell(self, cell):
     def format_dict(self, item):
         if self.keys is None:
             self.keys = list(item.keys())
+
+        if self.stream_columns is not None:
+            self.output(self.get_stream_row(item))
+            return
+
         self.queue.append(item)
+        if self.STREAM_WINDOW and not self.HTML and len(self.queue) >= self.STREAM_WINDOW:
+            self.output(self.start_stream())
+
+    def start_stream(self):
+        """
+        Compute columns on the queued rows, and return the beginning of the
+        table with these rows.
+        """
+        keys = list(self.keys)
+        if self.interactive:
+            keys.insert(0, '#')
+
+        self.stream_columns = []
+        for key in keys:
+            # Do not display columns when all values of the first rows are
+            # NotLoaded or NotAvailable
+            if key != '#' and all(empty(line.get(key)) for line in self.queue):
+                continue
+
+            header = key.capitalize().replace('_', ' ')
+            if key == '#':
+                # widened by get_stream_row() when numbers get longer
+                width = len(str(len(self.queue)))
+            else:
+                width = max(len(self.get_stream_cell(line.get(key))) for line in self.queue)
+            self.stream_columns.append((key, header, max(width, len(header))))
+
+        lines = []
+        if self.display_header and self.header:
+            lines.append(self.header)
+        lines.append(self.get_stream_head())
+        lines.extend(self.get_stream_row(line) for line in self.queue)
+        self.queue = []
+
+        return '\n'.join(lines)
+
+    def get_stream_head(self):
+        return '\n'.join((
+            self.get_stream_border('top'),
+            self.get_stream_line(header for key, header, width in self.stream_columns),
+            self.get_stream_border('middle'),
+        ))
+
+    def get_stream_cell(self, cell):
+        return str(self.format_cell(cell)).replace('\n', ' ')
+
+    def get_stream_row(self, item):
+        self.stream_count += 1
+        number = str(self.stream_count)
+
+        lines = []
+        for index, (key, header, width) in enumerate(self.stream_columns):
+            if key == '#' and len(number) > width:
+                # close the table and start a new one with a wider column,
+                # to keep borders aligned
+                lines.append(self.get_stream_border('bottom'))
+                self.stream_columns[index] = (key, header, len(number))
+                lines.append(self.get_stream_head())
+
+        lines.append(self.get_stream_line(
+            number if key == '#' else self.get_stream_cell(item.get(key))
+            for key, header, width in self.stream_columns
+        ))
+        return '\n'.join(lines)
+
+    def get_stream_line(self, cells):
+        vertical = '│' if SINGLE_BORDER is not None else '|'
+        values = []
+        for cell, (key, header, width) in zip(cells, self.stream_columns):
+            if len(cell) > width:
+                # columns are sized on the first rows, cut longer values
+                cell = cell[:width - 1] + '…'
+            values.append(' %s ' % cell.ljust(width))
+        return vertical + vertical.join(values) + vertical
+
+    def get_stream_border(self, position):
+        if SINGLE_BORDER is None:
+            left, junction, right, horizontal = '+', '+', '+', '-'
+        else:
+            left, junction, right = {
+                'top': '┌┬┐',
+                'middle': '├┼┤',
+                'bottom': '└┴┘',
+            }[position]
+            horizontal = '─'
+        return left + junction.join(horizontal * (width + 2) for key, header, width in self.stream_columns) + right
 
     def set_header(self, string):
         self.header = string
@@ -113,3 +217,12 @@ def set_header(self, string):
 
 class HTMLTableFormatter(TableFormatter):
     HTML = True
+
+
+class StreamTableFormatter(TableFormatter):
+    """
+    Table printed as soon as its first rows are received, to start rendering
+    large listings immediately, and keep only these first rows in memory.
+    """
+
+    STREAM_WINDOW = 50
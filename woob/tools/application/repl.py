@@ -536,26 +536,29 @@ def onecmd(self, line):
         try:
             try:
                 return super().onecmd(line)
-            except CallErrors as e:
-                return self.bcall_errors_handler(e)
-            except BackendNotGiven as e:
-                print('Error: %s' % str(e), file=self.stderr)
-                return os.EX_DATAERR
-            except NotEnoughArguments as e:
-                print('Error: not enough arguments. %s' % str(e), file=self.stderr)
-                return os.EX_USAGE
-            except TooManyArguments as e:
-                print('Error: too many arguments. %s' % str(e), file=self.stderr)
-                return os.EX_USAGE
-            except ArgSyntaxError as e:
-                print('Error: invalid arguments. %s' % str(e), file=self.stderr)
-                return os.EX_USAGE
-            except (KeyboardInterrupt, EOFError):
-                # ^C during a command process doesn't exit application.
-                print('\nAborted.')
-                return signal.SIGINT + 128
-        finally:
-            self.flush()
+            finally:
+                # Close the output of the formatter even if the command has
+                # been interrupted, before any error message, as formatters
+                # like JSON ones write results as they come.
+                self.flush()
+        except CallErrors as e:
+            return self.bcall_errors_handler(e)
+        except BackendNotGiven as e:
+            print('Error: %s' % str(e), file=self.stderr)
+            return os.EX_DATAERR
+        except NotEnoughArguments as e:
+            print('Error: not enough arguments. %s' % str(e), file=self.stderr)
+            return os.EX_USAGE
+        except TooManyArguments as e:
+            print('Error: too many arguments. %s' % str(e), file=self.stderr)
+            return os.EX_USAGE
+        except ArgSyntaxError as e:
+            print('Error: invalid arguments. %s' % str(e), file=self.stderr)
+            return os.EX_USAGE
+        except (KeyboardInterrupt, EOFError):
+            # ^C during a command process doesn't exit application.
+            print('\nAborted.')
+            return signal.SIGINT + 128
 
     def emptyline(self):
         """
@@ -25,6 +25,7 @@
 from woob.browser.filters.standard import Filter, CleanText, CleanDecimal
 from woob.capabilities import NotAvailable, NotLoaded
 from woob.capabilities.bank import Transaction, Account
+from woob.capabilities.base import ObjectBatch
 from woob.exceptions import ParseError
 from woob.tools.date import new_datetime
 from woob.tools.log import getLogger
@@ -291,17 +292,43 @@ def decimal_amount(klass, text):
         return Decimal(amnt) if amnt else Decimal('0')
 
 
+def _transaction_sort_key(date, rdate):
+    return (date, new_datetime(rdate) if rdate else datetime.datetime.min)
+
+
 def sorted_transactions(iterable):
-    """Sort an iterable of transactions in reverse chronological order"""
-    return sorted(iterable, reverse=True, key=lambda tr: (tr.date, new_datetime(tr.rdate) if tr.rdate else datetime.datetime.min))
+    """Sort an iterable of transactions in reverse chronological order
+
+    A :class:`woob.capabilities.base.ObjectBatch` of transactions is sorted
+    on its columns, and a sorted batch is returned.
+    """
+    if isinstance(iterable, ObjectBatch):
+        return iterable.sorted('date', 'rdate', key=_transaction_sort_key, reverse=True)
+    return sorted(iterable, reverse=True, key=lambda tr: _transaction_sort_key(tr.date, tr.rdate))
 
 
 def merge_iterators(*iterables):
     """Merge transactions iterators keeping sort order.
 
     Each iterator must already be sorted in reverse chronological order.
+    Batches of transactions (:class:`woob.capabilities.base.ObjectBatch`)
+    are merged on their columns.
     """
 
+    if iterables and all(isinstance(it, ObjectBatch) for it in iterables):
+        merged = ObjectBatch(iterables[0].klass)
+        for batch in iterables:
+            merged.extend(batch)
+        try:
+            # the sort is stable, so ties are kept in order of iterables, as below
+            merged = merged.sorted('date', 'rdate', reverse=True)
+        except TypeError:
+            # missing dates can't be compared, but may never be below
+            pass
+        else:
+            yield from merged
+            return
+
     def keyfunc(kv):
         return (kv[1].date, kv[1].rdate)
 
@@ -383,8 +383,16 @@ class SpanishParser(dateutil.parser.parserinfo):
     ]
 
 
+_french_parser = None
+
+
 def parse_french_date(date, **kwargs):
-    return dateutil.parser.parse(date, parserinfo=FrenchParser(), **kwargs)
+    global _french_parser
+
+    # building the parser info is costly, do it only once
+    if _french_parser is None:
+        _french_parser = dateutil.parser.parser(FrenchParser())
+    return _french_parser.parse(date, **kwargs)
 
 
 WEEK   = {'MONDAY': 0,
@@ -15,22 +15,30 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with woob. If not, see <http://www.gnu.org/licenses/>.
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from collections.abc import MutableMapping
+from contextlib import nullcontext
+from functools import wraps
+import sys
+from threading import RLock
+import time
 
-__all__ = ['LimitedLRUDict', 'LRUDict']
+__all__ = [
+    'CacheInfo', 'LFUCache', 'LimitedLRUDict', 'LRUCache', 'LRUDict',
+    'cached',
+]
 
 
 class LRUDict(OrderedDict):
     """dict to store items in the order the keys were last added/fetched."""
 
     def __setitem__(self, key, value):
-        if key in self:
-            del self[key]
         super(LRUDict, self).__setitem__(key, value)
+        self.move_to_end(key)
 
     def __getitem__(self, key):
         value = super(LRUDict, self).__getitem__(key)
-        self[key] = value
+        self.move_to_end(key)
         return value
 
 
@@ -43,3 +51,266 @@ def __setitem__(self, key, value):
         super(LimitedLRUDict, self).__setitem__(key, value)
         if len(self) > self.max_entries:
             self.popitem(last=False)
+
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'entries', 'size'))
+"""Statistics of a cache, returned by :meth:`LRUCache.info`."""
+
+
+class LRUCache(MutableMapping):
+    """
+    Mapping which keeps at most a given number of entries, or of bytes,
+    and evicts the least recently used ones.
+
+    Reads and writes are O(1). Entries can also expire after a given time.
+
+    :param max_entries: maximum number of entries (None means no limit)
+    :type max_entries: :class:`int`
+    :param max_size: maximum total size of values, as computed by *sizeof*
+                     (None means no limit)
+    :type max_size: :class:`int`
+    :param ttl: time to live in seconds of an entry (None means no limit)
+    :type ttl: :class:`float`
+    :param sizeof: function computing the size of a value, in bytes
+    :type sizeof: callable
+    :param thread_safe: protect the cache with a lock, to share it between threads
+    :type thread_safe: :class:`bool`
+    """
+
+    def __init__(self, max_entries=None, max_size=None, ttl=None, sizeof=sys.getsizeof, thread_safe=False):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.thread_safe = thread_safe
+        self.lock = RLock() if thread_safe else nullcontext()
+
+        # key -> [value, size, expiration time]
+        self.data = OrderedDict()
+        self.size = 0
+        """Total size of stored values (only computed when max_size is set)"""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _touch(self, key):
+        self.data.move_to_end(key)
+
+    def _insert(self, key):
+        pass
+
+    def _remove(self, key):
+        self.size -= self.data.pop(key)[1]
+
+    def _victim(self):
+        return next(iter(self.data))
+
+    def _is_expired(self, item):
+        return item[2] is not None and item[2] <= time.monotonic()
+
+    def _lookup(self, key):
+        # Return the stored item, without updating statistics.
+        item = self.data.get(key)
+        if item is not None and self._is_expired(item):
+            self._remove(key)
+            item = None
+        return item
+
+    def _shrink(self, entries=0, size=0):
+        # Evict entries to leave room for the given number of entries and bytes.
+        while self.data and (
+            (self.max_entries is not None and len(self.data) + entries > self.max_entries)
+            or (self.max_size is not None and self.size + size > self.max_size)
+        ):
+            self._remove(self._victim())
+            self.evictions += 1
+
+    def __getitem__(self, key):
+        with self.lock:
+            item = self._lookup(key)
+            if item is None:
+                self.misses += 1
+                raise KeyError(key)
+            self.hits += 1
+            self._touch(key)
+            return item[0]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        with self.lock:
+            return self._lookup(key) is not None
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            size = self.sizeof(value) if self.max_size is not None else 0
+            expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+            item = self.data.get(key)
+            if self.max_size is not None and size > self.max_size:
+                # would evict everything else
+                if item is not None:
+                    self._remove(key)
+            elif item is not None:
+                self.size += size - item[1]
+                item[:] = value, size, expires
+                self._touch(key)
+                self._shrink()
+            else:
+                self._shrink(1, size)
+                self.size += size
+                self.data[key] = [value, size, expires]
+                self._insert(key)
+
+    def __delitem__(self, key):
+        with self.lock:
+            if self._lookup(key) is None:
+                raise KeyError(key)
+            self._remove(key)
+
+    def __iter__(self):
+        with self.lock:
+            self.expire()
+            return iter(list(self.data))
+
+    def __len__(self):
+        with self.lock:
+            return len(self.data)
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.data):
+                self._remove(key)
+
+    def expire(self):
+        """Remove expired entries."""
+        with self.lock:
+            if self.ttl is None:
+                return
+            for key, item in list(self.data.items()):
+                if self._is_expired(item):
+                    self._remove(key)
+
+    def info(self):
+        """
+        Get statistics of the cache.
+
+        :rtype: :class:`CacheInfo`
+        """
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self.data), self.size)
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.info())
+
+    def __getstate__(self):
+        # locks can't be copied nor pickled
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = RLock() if self.thread_safe else nullcontext()
+
+
+class LFUCache(LRUCache):
+    """
+    Mapping which evicts the least frequently used entries, see
+    :class:`LRUCache` for parameters.
+
+    Between entries used as many times, the least recently used one is
+    evicted first. Reads and writes are O(1).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # key -> number of uses, number of uses -> keys in LRU order
+        self.freqs = {}
+        self.buckets = {}
+        self.min_freq = 0
+
+    def _touch(self, key):
+        freq = self.freqs[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freqs[key] = freq + 1
+        self.buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def _insert(self, key):
+        self.freqs[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_freq = 1
+
+    def _remove(self, key):
+        super()._remove(key)
+        freq = self.freqs.pop(key)
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = min(self.buckets, default=0)
+
+    def _victim(self):
+        return next(iter(self.buckets[self.min_freq]))
+
+
+def cached(cache=None, key=None):
+    """
+    Decorator to store results of a function in a cache.
+
+    >>> @cached(LRUCache(max_entries=2))
+    ... def square(x):
+    ...     return x * x
+    >>> square(3), square(3)
+    (9, 9)
+    >>> square.cache.info()
+    CacheInfo(hits=1, misses=1, evictions=0, entries=1, size=0)
+
+    The function is not called with the lock of the cache held: when a
+    thread-safe cache is used, the function may be called several times
+    concurrently for the same arguments.
+
+    :param cache: cache storing results (by default, an unlimited :class:`LRUCache`)
+    :type cache: :class:`LRUCache`
+    :param key: function computing the key from the arguments of the decorated
+                function (by default, from all arguments, which must be hashable)
+    :type key: callable
+    """
+
+    if cache is None:
+        cache = LRUCache()
+
+    def decorator(func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            if key is not None:
+                k = key(*args, **kwargs)
+            elif kwargs:
+                k = args + (cached,) + tuple(sorted(kwargs.items()))
+            else:
+                k = args
+
+            try:
+                return cache[k]
+            except KeyError:
+                pass
+
+            value = func(*args, **kwargs)
+            cache[k] = value
+            return value
+
+        inner.cache = cache
+        return inner
+
+    return decorator